@@ -1,35 +1,106 @@
-from flask import Flask, jsonify
+import os
+from flask import Flask, Response, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate
 from config import config
+from app.services.hashing import PasswordHasher
+from app.services.admission import AdmissionController
+from app.services.user_cache import UserCache
+from app.services.db_pool import PoolMonitor
+from app.services.db_routing import ReadRouter, RoutingSession
+from app.services.sharding import ShardRouter
+from app.services.metrics import CONTENT_TYPE, Metrics
+from app.services.readiness import ReadinessProbe
+from app.services.password_policy import PasswordPolicy
+from app.services.json_provider import init_json
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 ma = Marshmallow()
 jwt = JWTManager()
-migrate = Migrate()
+password_hasher = PasswordHasher()
+password_policy = PasswordPolicy()
+admission = AdmissionController()
+user_cache = UserCache()
+pool_monitor = PoolMonitor()
+db_router = ReadRouter()
+shard_router = ShardRouter()
+metrics = Metrics()
+readiness = ReadinessProbe()
+
+MIGRATIONS_DIRECTORY = os.path.join(os.path.dirname(__file__), os.pardir, "migrations")
+
+
+def init_migrate(app):
+    """Attach Flask-Migrate, which also registers the `flask db` commands"""
+    from flask_migrate import Migrate
+
+    Migrate(app, db, directory=MIGRATIONS_DIRECTORY)
 
 
 def create_app(config_name="default"):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    init_json(app)
 
+    # These pick the pool class and add the replica and shard binds, so
+    # they must run before the engines are created
+    pool_monitor.init_app(app)
+    db_router.init_app(app)
+    shard_router.init_app(app)
     db.init_app(app)
     ma.init_app(app)
     jwt.init_app(app)
-    migrate.init_app(app, db)
+    # Flask-Migrate imports Alembic, a large share of cold start, and only
+    # the `flask` command line needs it
+    if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+        init_migrate(app)
+    password_hasher.init_app(app)
+    password_policy.init_app(app)
+    admission.init_app(app)
+    user_cache.init_app(app)
+    metrics.init_app(app)
+    readiness.init_app(app)
 
     # Health check endpoint
     @app.route("/health")
     def health_check():
-        return jsonify({"status": "healthy", "database": db.engine.url.database})
+        return jsonify(
+            {
+                "status": "healthy",
+                "database": db.engine.url.database,
+                "admission": admission.stats(),
+                "user_cache": user_cache.stats(),
+                "db_pool": pool_monitor.stats(),
+                "db_routing": db_router.stats(),
+            }
+        )
 
-    with app.app_context():
-        db.create_all()
+    # Liveness: the process serves requests; deliberately checks nothing
+    # else, so a database outage does not get every pod restarted
+    @app.route("/livez")
+    def liveness_probe():
+        return jsonify({"status": "alive"})
+
+    # Readiness: cached result of the background database and schema check
+    @app.route("/readyz")
+    def readiness_probe():
+        ready, report = readiness.status()
+        return jsonify(report), 200 if ready else 503
+
+    # Prometheus scrape endpoint
+    @app.route("/metrics")
+    def metrics_endpoint():
+        return Response(metrics.render(), content_type=CONTENT_TYPE)
 
     # Register blueprints
     from app.views.auth import auth_bp
     app.register_blueprint(auth_bp)
+
+    # Register CLI commands
+    from app.commands.auth import auth_cli
+    from app.commands.shards import shards_cli
+    app.cli.add_command(auth_cli)
+    app.cli.add_command(shards_cli)
     
     return app
@@ -0,0 +1,103 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from app.services.hashing import HashingPolicy, calibrate
+
+auth_cli = AppGroup("auth", help="Authentication maintenance commands.")
+
+
+@auth_cli.command("calibrate-hash")
+@click.option(
+    "--target-ms",
+    type=float,
+    default=50.0,
+    show_default=True,
+    help="Desired password verify time on this machine.",
+)
+@click.option(
+    "--algorithm",
+    type=click.Choice(HashingPolicy.ALGORITHMS),
+    help="Algorithm to calibrate. Defaults to PASSWORD_HASH_ALGORITHM.",
+)
+@click.option("--samples", type=int, default=3, show_default=True)
+def calibrate_hash(target_ms, algorithm, samples):
+    """Measure this machine and suggest password hashing parameters."""
+    algorithm = algorithm or current_app.config["PASSWORD_HASH_ALGORITHM"]
+    policy, elapsed = calibrate(
+        algorithm,
+        target_ms / 1000,
+        samples=samples,
+        argon2_memory_cost=current_app.config["PASSWORD_HASH_ARGON2_MEMORY_COST"],
+    )
+
+    click.echo(
+        f"# {policy.method}: verify takes {elapsed * 1000:.1f} ms "
+        f"(target {target_ms:.1f} ms)"
+    )
+    for key, value in policy.config_items().items():
+        click.echo(f"{key}={value}")
+
+
+@auth_cli.command("build-breach-filter")
+@click.argument("source", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output", type=click.Path(dir_okay=False))
+@click.option(
+    "--false-positive-rate",
+    type=float,
+    default=0.001,
+    show_default=True,
+    help="Share of unbreached passwords the filter will wrongly refuse.",
+)
+@click.option(
+    "--expected-items",
+    type=int,
+    help="Number of entries in SOURCE. Counted with an extra pass if omitted.",
+)
+@click.option(
+    "--plaintext",
+    is_flag=True,
+    help="SOURCE lists passwords rather than SHA-1 hashes.",
+)
+def build_breach_filter(source, output, false_positive_rate, expected_items, plaintext):
+    """
+    Build a breached password filter from SOURCE into OUTPUT.
+
+    SOURCE has one entry per line: a hex SHA-1 hash, optionally followed
+    by ":count" as in the Pwned Passwords downloads, or a password with
+    --plaintext. Point PASSWORD_BREACH_FILTER at OUTPUT to use it.
+    """
+    from app.services.breach_filter import BreachFilter, sha1_digest
+
+    if expected_items is None:
+        with open(source, "rb") as file:
+            expected_items = sum(1 for _ in file)
+
+    skipped = 0
+
+    def digests():
+        nonlocal skipped
+        with open(source, encoding="utf-8", errors="replace") as file:
+            for line in file:
+                line = line.rstrip("\r\n")
+                if plaintext:
+                    if line:
+                        yield sha1_digest(line)
+                    continue
+                try:
+                    digest = bytes.fromhex(line.split(":", 1)[0])
+                except ValueError:
+                    digest = b""
+                if len(digest) == 20:
+                    yield digest
+                else:
+                    skipped += 1
+
+    bits, hashes, added = BreachFilter.build(
+        output, digests(), expected_items, false_positive_rate
+    )
+    click.echo(
+        f"Wrote {added} entries to {output} "
+        f"({bits // 8 / 2**20:.1f} MiB, {hashes} hashes per entry)"
+    )
+    if skipped:
+        click.echo(f"Skipped {skipped} lines that are not SHA-1 hashes")
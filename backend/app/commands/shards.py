@@ -0,0 +1,66 @@
+import click
+from flask.cli import AppGroup
+from app import db, shard_router
+from app.services.sharding import ShardMaintenance
+
+shards_cli = AppGroup("shards", help="Users table sharding commands.")
+
+batch_size_option = click.option(
+    "--batch-size",
+    type=int,
+    default=1000,
+    show_default=True,
+    help="Rows copied or deleted per transaction.",
+)
+settle_option = click.option(
+    "--settle",
+    type=float,
+    help="Seconds to wait for every process to reload the bucket map. "
+    "Defaults to SHARD_MAP_TTL + 1.",
+)
+
+
+def maintenance(**options):
+    if not shard_router.shards:
+        raise click.UsageError("No shards configured; set DATABASE_SHARD_URLS.")
+    return ShardMaintenance(db, shard_router, log=click.echo, **options)
+
+
+@shards_cli.command("init")
+@batch_size_option
+def init(batch_size):
+    """Create the shard tables, bucket map and username/email lookups."""
+    shards = maintenance(batch_size=batch_size)
+    shards.create_tables()
+    click.echo(f"{shards.init_buckets()} buckets added")
+    click.echo(f"{shards.backfill_lookups()} lookup rows added")
+
+
+@shards_cli.command("rebalance")
+@batch_size_option
+@click.option(
+    "--group-size",
+    type=int,
+    default=32,
+    show_default=True,
+    help="Buckets moved together, sharing one write pause.",
+)
+@settle_option
+def rebalance(batch_size, group_size, settle):
+    """Move buckets online until they are spread evenly over the shards."""
+    shards = maintenance(batch_size=batch_size, group_size=group_size, settle=settle)
+    shards.create_tables()
+    shards.init_buckets()
+    click.echo(f"{shards.rebalance()} buckets moved")
+
+
+@shards_cli.command("status")
+def status():
+    """Show buckets and users per node."""
+    shards = maintenance()
+    report = shards.status()
+    moving = report.pop("moving")
+    for key, counts in report.items():
+        click.echo(f"{key}: {counts['buckets']} buckets, {counts['users']} users")
+    if moving:
+        click.echo(f"moving: {', '.join(map(str, moving))}")
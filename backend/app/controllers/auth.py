@@ -1,9 +1,17 @@
 from datetime import timedelta, datetime, timezone
+from functools import cached_property
 import logging
 import secrets
+from flask import current_app
 from flask_jwt_extended import create_access_token  # type: ignore
-from app import db
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from app import db, db_router, password_hasher, shard_router, user_cache
+from app.models.shard import EmailLookup, UsernameLookup
 from app.models.user import User
+from app.services.errors import ServiceUnavailableError
+from app.schemas.compiled import compile_dump
+from app.schemas.user import UserSchema
 from app.schemas.auth import (
     LoginSchema,
     RegisterSchema,
@@ -12,732 +20,210 @@ from app.schemas.auth import (
     PasswordResetSchema,
     PasswordChangeSchema,
     PasswordResetRequestSchema,
+    ProfileUpdateSchema,
 )
 
 
 class AuthController:
-    def __init__(self):
-        self.login_schema = LoginSchema()
-        self.register_schema = RegisterSchema()
-        self.success_schema = AuthSuccessSchema()
-        self.error_schema = AuthErrorSchema()
-        self.password_reset_schema = PasswordResetSchema()
-        self.password_change_schema = PasswordChangeSchema()
-        self.password_reset_request_schema = PasswordResetRequestSchema()
+    # Profile fields embedded in access tokens when JWT_PROFILE_CLAIMS is on
+    # (in UserSchema's order, so a profile built from them dumps the same)
+    PROFILE_CLAIM_FIELDS = ("username", "email", "created_at", "is_active", "role")
+
+    # Global uniqueness indexes kept on the primary while users are sharded
+    LOOKUPS = {"username": UsernameLookup, "email": EmailLookup}
+
+    # Schemas are built on first use rather than when the views module
+    # creates the controller, keeping that work out of cold start
+    @cached_property
+    def login_schema(self):
+        return LoginSchema()
+
+    @cached_property
+    def register_schema(self):
+        return RegisterSchema()
+
+    @cached_property
+    def success_schema(self):
+        return AuthSuccessSchema()
+
+    @cached_property
+    def dump_success(self):
+        """AuthSuccessSchema().dump, generated for its fields"""
+        return compile_dump(self.success_schema)
+
+    @cached_property
+    def dump_user(self):
+        """UserSchema().dump, generated for its fields"""
+        return compile_dump(UserSchema())
+
+    @cached_property
+    def error_schema(self):
+        return AuthErrorSchema()
+
+    @cached_property
+    def password_reset_schema(self):
+        return PasswordResetSchema()
+
+    @cached_property
+    def password_change_schema(self):
+        return PasswordChangeSchema()
+
+    @cached_property
+    def password_reset_request_schema(self):
+        return PasswordResetRequestSchema()
+
+    @cached_property
+    def profile_update_schema(self):
+        return ProfileUpdateSchema()
+
+    def find_user(self, replica=True, **criteria):
+        """
+        Look a user up on a read replica if one is configured and
+        ``replica`` is set. A user the replica has not seen yet (e.g.
+        registered a moment ago) is looked up again on the primary.
+        """
+        if shard_router.shards:
+            return self.find_sharded_user(**criteria)
+        if not replica:
+            return User.query.filter_by(**criteria).first()
+        with db_router.replica_reads():
+            user = User.query.filter_by(**criteria).first()
+        if user is None and db_router.replicas:
+            user = User.query.filter_by(**criteria).first()
+        return user
+
+    def find_sharded_user(self, id=None, **criteria):
+        """
+        Find a user by id, username or email while users are sharded and
+        pin the session to its shard. Usernames and emails are resolved
+        through the lookup tables; users registered before sharding was
+        enabled may not be in them yet while their bucket is on the primary.
+        """
+        if id is None:
+            ((field, value),) = criteria.items()
+            lookup = self.LOOKUPS[field]
+            id = db.session.execute(
+                select(lookup.user_id).where(getattr(lookup, field) == value)
+            ).scalar()
+        if id is None:
+            if not shard_router.has_default_placements(db):
+                return None
+            user = db.session.execute(
+                select(User).filter_by(**criteria),
+                bind_arguments={"bind": db.engines[None]},
+            ).scalar()
+            if user is not None:
+                shard_router.pin(user.id)
+            return user
+
+        shard_router.pin(id)
+        return db.session.get(User, id)
+
+    def consume_token(self, criteria, values):
+        """
+        Update the user matching ``criteria`` in one conditional statement,
+        so a token cannot be used twice; returns the number of rows updated.
+        While users are sharded, the user is located on its shard first.
+        """
+        if shard_router.shards:
+            user_id = shard_router.locate(db, select(User.id).where(*criteria))
+            if user_id is None:
+                return 0
+            shard_router.pin(user_id)
+            criteria = (*criteria, User.id == user_id)
+        result = db.session.execute(
+            update(User)
+            .where(*criteria)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def busy_response(self, message, error):
+        """Response for requests shed because a backing service is saturated"""
+        return (
+            self.error_schema.dump(
+                {"message": message, "errors": {"_error": [str(error)]}}
+            ),
+            503,
+        )
 
     def register(self, data):
         """
         Handle User Registration Process:
         1. Validate input data
-        2. Check for existing users
-        3. Create new user
-        4. Generate JWT token
-        5. Return response
+        2. Create new user; the unique constraints reject duplicates
+        3. Generate JWT token
+        4. Return response
         """
         try:
-            # Check if user already exists
-            if User.query.filter_by(username=data["username"]).first():
-                return (
-                    self.error_schema.dump(
-                        {
-                            "message": "Registration failed",
-                            "errors": {"username": ["Username already exists"]},
-                        }
-                    ),
-                    400,
-                )
-
-            if User.query.filter_by(email=data["email"]).first():
-                return (
-                    self.error_schema.dump(
-                        {
-                            "message": "Registration failed",
-                            "errors": {"email": ["Email already exists"]},
-                        }
-                    ),
-                    400,
-                )
-
             # Create new user
             user = User(username=data["username"], email=data["email"])
             user.set_password(data["password"])
 
-            # Save to database
-            db.session.add(user)
-            db.session.commit()
-
-            # Create access token
-            access_token = create_access_token(
-                identity=user.id, expires_delta=timedelta(days=1)
-            )
-
-            # Return success response
-            return (
-                self.success_schema.dump(
+            # Insert without checking first: the username/email unique
+            # constraints detect duplicates, including concurrent signups.
+            # While sharded, the lookups on the primary enforce them across
+            # shards. They are committed on their own before the user is
+            # written to its shard, and deleted again if that write fails,
+            # so a user never exists without them.
+            if shard_router.shards:
+                db.session.add(UsernameLookup(username=user.username, user_id=user.id))
+                db.session.add(EmailLookup(email=user.email, user_id=user.id))
+                db.session.commit()
+            try:
+                shard_router.pin(user.id)
+                db.session.add(user)
+                db.session.flush()
+
+                # Create access token
+                access_token = self.create_token(user)
+
+                # Dump before commit, which would expire the flushed
+                # attributes and force a reload
+                response = self.dump_success(
                     {
                         "message": "Registration successful",
                         "token": {"access_token": access_token, "token_type": "bearer"},
                         "user": user,
                     }
-                ),
-                201,
-            )
-
-        except Exception as e:
-            db.session.rollback()
-            return (
-                self.error_schema.dump(
-                    {"message": "Registration failed", "errors": {"_error": [str(e)]}}
-                ),
-                500,
-            )
-
-    def login(self, data):
-        """
-        Authenticate a user
-        """
-        try:
-            # Find user
-            user = User.query.filter_by(username=data["username"]).first()
-
-            # Verify password
-            if not user or not user.check_password(data["password"]):
-                return (
-                    self.error_schema.dump(
-                        {
-                            "message": "Login failed",
-                            "errors": {"_error": ["Invalid username or password"]},
-                        }
-                    ),
-                    401,
-                )
-
-            # Check if user is active
-            if not user.is_active:
-                return (
-                    self.error_schema.dump(
-                        {
-                            "message": "Login failed",
-                            "errors": {"_error": ["Account is disabled"]},
-                        }
-                    ),
-                    401,
                 )
-
-            # Create access token
-            access_token = create_access_token(
-                identity=user.id, expires_delta=timedelta(days=1)
-            )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                if shard_router.shards:
+                    self.release_lookups(user.id)
+                raise
 
             # Return success response
-            return (
-                self.success_schema.dump(
-                    {
-                        "message": "Login successful",
-                        "token": {"access_token": access_token, "token_type": "bearer"},
-                        "user": user,
-                    }
-                ),
-                200,
-            )
-
-        except Exception as e:
-            return (
-                self.error_schema.dump(
-                    {"message": "Login failed", "errors": {"_error": [str(e)]}}
-                ),
-                500,
-            )
+            return response, 201
 
-    def request_password_reset(self, email):
-        """
-        Generate password reset token and send reset email
-        """
-        try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
-                return (
-                    self.error_schema.dump(
-                        {
-                            "message": "If email exists, \
-                    reset instructions will be sent"
-                        }
-                    ),
-                    200,
-                )  # Return 200 to prevent email enumeration
-
-            # Generate reset token
-            reset_token = secrets.token_urlsafe(32)
-            user.reset_token = reset_token
-            user.reset_token_expires = datetime.now(timezone.utc) + timedelta(hours=1)
-
-            db.session.commit()
-
-            # In real application, send email here
-            # self.send_reset_email(user.email, reset_token)
-
-            return (
-                self.success_schema.dump(
-                    {"message": "Password reset instructions sent"}
-                ),
-                200,
-            )
-
-        except Exception as e:
+        except IntegrityError as e:
             db.session.rollback()
-            return (
-                self.error_schema.dump(
-                    {
-                        "message": "Failed to process reset request",
-                        "errors": {"_error": [str(e)]},
-                    }
-                ),
-                500,
-            )
-
-    def reset_password(self, token, new_password):
-        """Reset password using reset token"""
-        try:
-            # Debug logging
-            logging.debug(f"Attempting to reset password with token: {token}")
-
-            user = User.query.filter_by(reset_token=token).first()
-            if not user:
-                logging.debug("No user found with this token")
-                return {
-                    "message": "Invalid or expired reset token",
-                    "errors": {"token": ["Invalid or expired token"]},
-                }, 400
-
-            # Debug datetime information
-            current_time = datetime.now(timezone.utc)
-            logging.debug(f"Current time (UTC): {current_time}")
-            logging.debug(f"Token expires at: {user.reset_token_expires}")
-            logging.debug(
-                f"Token expires timezone info: \
-                {user.reset_token_expires.tzinfo}"
-            )
-
-            if not user.is_valid_reset_token():
-                logging.debug("Token validation failed")
-                return {
-                    "message": "Invalid or expired reset token",
-                    "errors": {"token": ["Token has expired"]},
-                }, 400
-
-            # Update password
-            user.set_password(new_password)
-            user.reset_token = None
-            user.reset_token_expires = None
-
-            db.session.commit()
-            logging.debug("Password successfully reset")
-
-            return {"message": "Password successfully reset"}, 200
-
-        except Exception as e:
-            logging.error(f"Error in reset_password: {str(e)}")
-            db.session.rollback()
-            return {
-                "message": "Failed to reset password",
-                "errors": {"_error": [str(e)]},
-            }, 500
-
-    def is_valid_reset_token(self, user):
-        """Helper method to validate reset token"""
-        if not user.reset_token or not user.reset_token_expires:
-            return False
-        return datetime.now(timezone.utc) < user.reset_token_expires
-
-    def change_password(self, user_id, current_password, new_password):
-        """
-        Change password for authenticated user
-        """
-        try:
-            user = db.session.get(User, user_id)
-            if not user:
-                return self.error_schema.dump({"message": "User not found"}), 404
-
-            if not user.check_password(current_password):
+            field = self.duplicate_field(e)
+            if field is None:
                 return (
                     self.error_schema.dump(
                         {
-                            "message": "Current password is incorrect",
-                            "errors": {"current_password": ["Invalid password"]},
+                            "message": "Registration failed",
+                            "errors": {"_error": [str(e)]},
                         }
                     ),
-                    400,
+                    500,
                 )
-
-            user.set_password(new_password)
-            db.session.commit()
-
-            return (
-                self.success_schema.dump({"message": "Password successfully changed"}),
-                200,
-            )
-
-        except Exception as e:
-            db.session.rollback()
             return (
                 self.error_schema.dump(
                     {
-                        "message": "Failed to change password",
-                        "errors": {"_error": [str(e)]},
-                    }
-                ),
-                500,
-            )
-
-    def verify_email(self, token):
-        """
-        Verify user's email address
-        """
-        try:
-            user = User.query.filter_by(email_verification_token=token).first()
-
-            if not user:
-                return (
-                    self.error_schema.dump({"message": "Invalid verification token"}),
-                    400,
-                )
-
-            user.email_verified = True
-            user.email_verification_token = None
-
-            db.session.commit()
-
-            return (
-                self.success_schema.dump({"message": "Email successfully verified"}),
-                200,
-            )
-
-        except Exception as e:
-            db.session.rollback()
-            return (
-                self.error_schema.dump(
-                    {
-                        "message": "Failed to verify email",
-                        "errors": {"_error": [str(e)]},
+                        "message": "Registration failed",
+                        "errors": {field: [f"{field.capitalize()} already exists"]},
                     }
                 ),
-                500,
-            )
-
-    def update_profile(self, user_id, data):
-        """
-        Update user profile information
-        """
-        try:
-            user = db.session.get(User, user_id)
-            if not user:
-                return self.error_schema.dump({"message": "User not found"}), 404
-
-            # Update allowed fields
-            for field in ["username", "email"]:
-                if field in data:
-                    setattr(user, field, data[field])
-
-            db.session.commit()
-
-            return (
-                self.success_schema.dump(
-                    {"message": "Profile updated successfully", "user": user}
-                ),
-                200,
-            )
-
-        except Exception as e:
-            db.session.rollback()
-            return self.error_schema.dump({
-                'message': 'Failed to update profile',
-                'errors': {'_error': [str(e)]}
-            }), 500
-from datetime import timedelta, datetime, timezone
-import logging
-import secrets
-from flask_jwt_extended import create_access_token # type: ignore
-from app import db
-from app.models.user import User
-from app.schemas.auth import (
-    LoginSchema,
-    RegisterSchema,
-    AuthSuccessSchema,
-    AuthErrorSchema,
-    PasswordResetSchema,
-    PasswordChangeSchema,
-    PasswordResetRequestSchema
-)
-
-class AuthController:
-    def __init__(self):
-        self.login_schema = LoginSchema()
-        self.register_schema = RegisterSchema()
-        self.success_schema = AuthSuccessSchema()
-        self.error_schema = AuthErrorSchema()
-        self.password_reset_schema = PasswordResetSchema()
-        self.password_change_schema = PasswordChangeSchema()
-        self.password_reset_request_schema = PasswordResetRequestSchema()
-
-    def register(self, data):
-        """
-        Handle User Registration Process:
-        1. Validate input data
-        2. Check for existing users
-        3. Create new user
-        4. Generate JWT token
-        5. Return response
-        """
-        try:
-            # Check if user already exists
-            if User.query.filter_by(username=data['username']).first():
-                return self.error_schema.dump({
-                    'message': 'Registration failed',
-                    'errors': {'username': ['Username already exists']}
-                }), 400
-
-            if User.query.filter_by(email=data['email']).first():
-                return self.error_schema.dump({
-                    'message': 'Registration failed',
-                    'errors': {'email': ['Email already exists']}
-                }), 400
-
-            # Create new user
-            user = User(
-                username=data['username'],
-                email=data['email']
-            )
-            user.set_password(data['password'])
-
-            # Save to database
-            db.session.add(user)
-            db.session.commit()
-
-            # Create access token
-            access_token = create_access_token(
-                identity=user.id,
-                expires_delta=timedelta(days=1)
+                400,
             )
 
-            # Return success response
-            return self.success_schema.dump({
-                'message': 'Registration successful',
-                'token': {
-                    'access_token': access_token,
-                    'token_type': 'bearer'
-                },
-                'user': user
-            }), 201
-
-        except Exception as e:
-            db.session.rollback()
-            return self.error_schema.dump({
-                'message': 'Registration failed',
-                'errors': {'_error': [str(e)]}
-            }), 500
-    
-    def login(self, data):
-        """
-        Authenticate a user
-        """
-        try:
-            # Find user
-            user = User.query.filter_by(username=data['username']).first()
-
-            # Verify password
-            if not user or not user.check_password(data['password']):
-                return self.error_schema.dump({
-                    'message': 'Login failed',
-                    'errors': {'_error': ['Invalid username or password']}
-                }), 401
-
-            # Check if user is active
-            if not user.is_active:
-                return self.error_schema.dump({
-                    'message': 'Login failed',
-                    'errors': {'_error': ['Account is disabled']}
-                }), 401
-
-            # Create access token
-            access_token = create_access_token(
-                identity=user.id,
-                expires_delta=timedelta(days=1)
-            )
-
-            # Return success response
-            return self.success_schema.dump({
-                'message': 'Login successful',
-                'token': {
-                    'access_token': access_token,
-                    'token_type': 'bearer'
-                },
-                'user': user
-            }), 200
-
-        except Exception as e:
-            return self.error_schema.dump({
-                'message': 'Login failed',
-                'errors': {'_error': [str(e)]}
-            }), 500
-        
-    def request_password_reset(self, email):
-        """
-        Generate password reset token and send reset email
-        """
-        try:
-            user = User.query.filter_by(email=email).first()
-            if not user:
-                return self.error_schema.dump({
-                    'message': 'If email exists, reset instructions will be sent'
-                }), 200  # Return 200 to prevent email enumeration
-
-            # Generate reset token
-            reset_token = secrets.token_urlsafe(32)
-            user.reset_token = reset_token
-            user.reset_token_expires = datetime.now(timezone.utc) + timedelta(hours=1)
-            
-            db.session.commit()
-
-            # In real application, send email here
-            # self.send_reset_email(user.email, reset_token)
-
-            return self.success_schema.dump({
-                'message': 'Password reset instructions sent'
-            }), 200
-
-        except Exception as e:
+        except ServiceUnavailableError as e:
             db.session.rollback()
-            return self.error_schema.dump({
-                'message': 'Failed to process reset request',
-                'errors': {'_error': [str(e)]}
-            }), 500
-
-    def reset_password(self, token, new_password):
-        """Reset password using reset token"""
-        try:
-            # Debug logging
-            logging.debug(f"Attempting to reset password with token: {token}")
-            
-            user = User.query.filter_by(reset_token=token).first()
-            if not user:
-                logging.debug("No user found with this token")
-                return {
-                    'message': 'Invalid or expired reset token',
-                    'errors': {'token': ['Invalid or expired token']}
-                }, 400
-
-            # Debug datetime information
-            current_time = datetime.now(timezone.utc)
-            logging.debug(f"Current time (UTC): {current_time}")
-            logging.debug(f"Token expires at: {user.reset_token_expires}")
-            logging.debug(f"Token expires timezone info: {user.reset_token_expires.tzinfo}")
-
-            if not user.is_valid_reset_token():
-                logging.debug("Token validation failed")
-                return {
-                    'message': 'Invalid or expired reset token',
-                    'errors': {'token': ['Token has expired']}
-                }, 400
-
-            # Update password
-            user.set_password(new_password)
-            user.reset_token = None
-            user.reset_token_expires = None
-            
-            db.session.commit()
-            logging.debug("Password successfully reset")
-
-            return {
-                'message': 'Password successfully reset'
-            }, 200
-
-        except Exception as e:
-            logging.error(f"Error in reset_password: {str(e)}")
-            db.session.rollback()
-            return {
-                'message': 'Failed to reset password',
-                'errors': {'_error': [str(e)]}
-            }, 500
-
-    def is_valid_reset_token(self, user):
-        """Helper method to validate reset token"""
-        if not user.reset_token or not user.reset_token_expires:
-            return False
-        return datetime.now(timezone.utc) < user.reset_token_expires
-
-
-    def change_password(self, user_id, current_password, new_password):
-        """
-        Change password for authenticated user
-        """
-        try:
-            user = db.session.get(User, user_id)
-            if not user:
-                return self.error_schema.dump({
-                    'message': 'User not found'
-                }), 404
-
-            if not user.check_password(current_password):
-                return self.error_schema.dump({
-                    'message': 'Current password is incorrect',
-                    'errors': {'current_password': ['Invalid password']}
-                }), 400
-
-            user.set_password(new_password)
-            db.session.commit()
-
-            return self.success_schema.dump({
-                'message': 'Password successfully changed'
-            }), 200
-
-        except Exception as e:
-            db.session.rollback()
-            return self.error_schema.dump({
-                'message': 'Failed to change password',
-                'errors': {'_error': [str(e)]}
-            }), 500
-
-    def verify_email(self, token):
-        """
-        Verify user's email address
-        """
-        try:
-            user = User.query.filter_by(email_verification_token=token).first()
-            
-            if not user:
-                return self.error_schema.dump({
-                    'message': 'Invalid verification token'
-                }), 400
-
-            user.email_verified = True
-            user.email_verification_token = None
-            
-            db.session.commit()
-
-            return self.success_schema.dump({
-                'message': 'Email successfully verified'
-            }), 200
-
-        except Exception as e:
-            db.session.rollback()
-            return self.error_schema.dump({
-                'message': 'Failed to verify email',
-                'errors': {'_error': [str(e)]}
-            }), 500
-
-    def update_profile(self, user_id, data):
-        """
-        Update user profile information
-        """
-        try:
-            user = db.session.get(User, user_id)
-            if not user:
-                return self.error_schema.dump({
-                    'message': 'User not found'
-                }), 404
-
-            # Update allowed fields
-            for field in ['username', 'email']:
-                if field in data:
-                    setattr(user, field, data[field])
-
-            db.session.commit()
-
-            return self.success_schema.dump({
-                'message': 'Profile updated successfully',
-                'user': user
-            }), 200
-
-        except Exception as e:
-            db.session.rollback()
-            return self.error_schema.dump({
-                'message': 'Failed to update profile',
-                'errors': {'_error': [str(e)]}
-            }), 500
-from datetime import timedelta, datetime, timezone
-import logging
-import secrets
-from flask_jwt_extended import create_access_token  # type: ignore
-from app import db
-from app.models.user import User
-from app.schemas.auth import (
-    LoginSchema,
-    RegisterSchema,
-    AuthSuccessSchema,
-    AuthErrorSchema,
-    PasswordResetSchema,
-    PasswordChangeSchema,
-    PasswordResetRequestSchema,
-)
-
-
-class AuthController:
-    def __init__(self):
-        self.login_schema = LoginSchema()
-        self.register_schema = RegisterSchema()
-        self.success_schema = AuthSuccessSchema()
-        self.error_schema = AuthErrorSchema()
-        self.password_reset_schema = PasswordResetSchema()
-        self.password_change_schema = PasswordChangeSchema()
-        self.password_reset_request_schema = PasswordResetRequestSchema()
-
-    def register(self, data):
-        """
-        Handle User Registration Process:
-        1. Validate input data
-        2. Check for existing users
-        3. Create new user
-        4. Generate JWT token
-        5. Return response
-        """
-        try:
-            # Check if user already exists
-            if User.query.filter_by(username=data["username"]).first():
-                return (
-                    self.error_schema.dump(
-                        {
-                            "message": "Registration failed",
-                            "errors": {"username": ["Username already exists"]},
-                        }
-                    ),
-                    400,
-                )
-
-            if User.query.filter_by(email=data["email"]).first():
-                return (
-                    self.error_schema.dump(
-                        {
-                            "message": "Registration failed",
-                            "errors": {"email": ["Email already exists"]},
-                        }
-                    ),
-                    400,
-                )
-
-            # Create new user
-            user = User(username=data["username"], email=data["email"])
-            user.set_password(data["password"])
-
-            # Save to database
-            db.session.add(user)
-            db.session.commit()
-
-            # Create access token
-            access_token = create_access_token(
-                identity=user.id, expires_delta=timedelta(days=1)
-            )
-
-            # Return success response
-            return (
-                self.success_schema.dump(
-                    {
-                        "message": "Registration successful",
-                        "token": {"access_token": access_token, "token_type": "bearer"},
-                        "user": user,
-                    }
-                ),
-                201,
-            )
+            return self.busy_response("Registration failed", e)
 
         except Exception as e:
             db.session.rollback()
@@ -754,7 +240,7 @@ class AuthController:
         """
         try:
             # Find user
-            user = User.query.filter_by(username=data["username"]).first()
+            user = self.find_user(username=data["username"])
 
             # Verify password
             if not user or not user.check_password(data["password"]):
@@ -780,14 +266,15 @@ class AuthController:
                     401,
                 )
 
+            # Upgrade hashes made under an outdated hashing policy
+            self.rehash_if_outdated(user, data["password"])
+
             # Create access token
-            access_token = create_access_token(
-                identity=user.id, expires_delta=timedelta(days=1)
-            )
+            access_token = self.create_token(user)
 
             # Return success response
             return (
-                self.success_schema.dump(
+                self.dump_success(
                     {
                         "message": "Login successful",
                         "token": {"access_token": access_token, "token_type": "bearer"},
@@ -797,6 +284,9 @@ class AuthController:
                 200,
             )
 
+        except ServiceUnavailableError as e:
+            return self.busy_response("Login failed", e)
+
         except Exception as e:
             return (
                 self.error_schema.dump(
@@ -810,7 +300,7 @@ class AuthController:
         Generate password reset token and send reset email
         """
         try:
-            user = User.query.filter_by(email=email).first()
+            user = self.find_user(email=email, replica=False)
             if not user:
                 return (
                     self.error_schema.dump(
@@ -824,7 +314,7 @@ class AuthController:
 
             # Generate reset token
             reset_token = secrets.token_urlsafe(32)
-            user.reset_token = reset_token
+            user.reset_token = User.hash_token(reset_token)
             user.reset_token_expires = datetime.now(timezone.utc) + timedelta(hours=1)
 
             db.session.commit()
@@ -833,12 +323,14 @@ class AuthController:
             # self.send_reset_email(user.email, reset_token)
 
             return (
-                self.success_schema.dump(
-                    {"message": "Password reset instructions sent"}
-                ),
+                self.dump_success({"message": "Password reset instructions sent"}),
                 200,
             )
 
+        except ServiceUnavailableError as e:
+            db.session.rollback()
+            return self.busy_response("Failed to process reset request", e)
+
         except Exception as e:
             db.session.rollback()
             return (
@@ -854,43 +346,41 @@ class AuthController:
     def reset_password(self, token, new_password):
         """Reset password using reset token"""
         try:
-            # Debug logging
-            logging.debug(f"Attempting to reset password with token: {token}")
-
-            user = User.query.filter_by(reset_token=token).first()
-            if not user:
-                logging.debug("No user found with this token")
-                return {
-                    "message": "Invalid or expired reset token",
-                    "errors": {"token": ["Invalid or expired token"]},
-                }, 400
-
-            # Debug datetime information
-            current_time = datetime.now(timezone.utc)
-            logging.debug(f"Current time (UTC): {current_time}")
-            logging.debug(f"Token expires at: {user.reset_token_expires}")
-            logging.debug(
-                f"Token expires timezone info: \
-                {user.reset_token_expires.tzinfo}"
+            # Hash first: the KDF must not run while the row is locked
+            password_hash = password_hasher.generate(new_password)
+
+            # Check and consume the token in one statement so it cannot be
+            # used twice. reset_token_expires holds naive UTC datetimes.
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            updated = self.consume_token(
+                (
+                    User.reset_token == User.hash_token(token),
+                    User.reset_token_expires > now,
+                ),
+                {
+                    "password_hash": password_hash,
+                    "reset_token": None,
+                    "reset_token_expires": None,
+                },
             )
-
-            if not user.is_valid_reset_token():
-                logging.debug("Token validation failed")
+            if updated != 1:
+                db.session.rollback()
+                logging.debug("Reset token not found or expired")
                 return {
                     "message": "Invalid or expired reset token",
-                    "errors": {"token": ["Token has expired"]},
+                    "errors": {"token": ["Invalid or expired token"]},
                 }, 400
 
-            # Update password
-            user.set_password(new_password)
-            user.reset_token = None
-            user.reset_token_expires = None
-
+            # Credentials are not in the profile snapshot (see UserCache)
             db.session.commit()
             logging.debug("Password successfully reset")
 
             return {"message": "Password successfully reset"}, 200
 
+        except ServiceUnavailableError as e:
+            db.session.rollback()
+            return self.busy_response("Failed to reset password", e)
+
         except Exception as e:
             logging.error(f"Error in reset_password: {str(e)}")
             db.session.rollback()
@@ -899,6 +389,70 @@ class AuthController:
                 "errors": {"_error": [str(e)]},
             }, 500
 
+    def replace_lookup(self, field, old, new, user_id):
+        """Move a sharded user's username or email lookup row to ``new``"""
+        lookup = self.LOOKUPS[field]
+        db.session.execute(delete(lookup).where(getattr(lookup, field) == old))
+        db.session.add(lookup(**{field: new, "user_id": user_id}))
+
+    def release_lookups(self, user_id):
+        """
+        Delete the lookup rows register committed for a user whose shard
+        write failed. Should this fail too, the stray rows only reserve
+        the username and email.
+        """
+        for lookup in self.LOOKUPS.values():
+            db.session.execute(delete(lookup).where(lookup.user_id == user_id))
+        db.session.commit()
+
+    def duplicate_field(self, error):
+        """
+        Name of the unique user field an IntegrityError was raised for.
+        MySQL reports "Duplicate entry '...' for key 'users.email'", SQLite
+        "UNIQUE constraint failed: users.email"; while sharded, the key is
+        the primary key of the field's lookup table.
+        """
+        message = str(error.orig).rsplit("for key", 1)[-1]
+        for field in ("username", "email"):
+            if (
+                f"users.{field}" in message
+                or f"'{field}'" in message
+                or f"{field}_lookups." in message
+            ):
+                return field
+        return None
+
+    def create_token(self, user):
+        """
+        Create an access token for ``user``. With JWT_PROFILE_CLAIMS on, the
+        token also carries a profile snapshot tagged with profile_version.
+        """
+        claims = None
+        if current_app.config["JWT_PROFILE_CLAIMS"]:
+            user_data = self.dump_user(user)
+            profile = {field: user_data[field] for field in self.PROFILE_CLAIM_FIELDS}
+            profile["v"] = user.profile_version
+            claims = {"profile": profile}
+        return create_access_token(
+            identity=user.id,
+            expires_delta=timedelta(days=1),
+            additional_claims=claims,
+        )
+
+    def rehash_if_outdated(self, user, password):
+        """
+        Re-hash a just-verified password if its stored hash does not match
+        the configured hashing policy. Failure only postpones the upgrade.
+        """
+        if not user.password_needs_rehash():
+            return
+        try:
+            user.set_password(password)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.warning(f"Password rehash for user {user.id} deferred: {e}")
+
     def is_valid_reset_token(self, user):
         """Helper method to validate reset token"""
         if not user.reset_token or not user.reset_token_expires:
@@ -910,6 +464,7 @@ class AuthController:
         Change password for authenticated user
         """
         try:
+            shard_router.pin(user_id)
             user = db.session.get(User, user_id)
             if not user:
                 return self.error_schema.dump({"message": "User not found"}), 404
@@ -926,13 +481,18 @@ class AuthController:
                 )
 
             user.set_password(new_password)
+            # Credentials are not in the profile snapshot (see UserCache)
             db.session.commit()
 
             return (
-                self.success_schema.dump({"message": "Password successfully changed"}),
+                self.dump_success({"message": "Password successfully changed"}),
                 200,
             )
 
+        except ServiceUnavailableError as e:
+            db.session.rollback()
+            return self.busy_response("Failed to change password", e)
+
         except Exception as e:
             db.session.rollback()
             return (
@@ -950,24 +510,30 @@ class AuthController:
         Verify user's email address
         """
         try:
-            user = User.query.filter_by(email_verification_token=token).first()
-
-            if not user:
+            # Check and consume the token in one statement
+            updated = self.consume_token(
+                (User.email_verification_token == User.hash_token(token),),
+                {"email_verified": True, "email_verification_token": None},
+            )
+            if updated != 1:
+                db.session.rollback()
                 return (
                     self.error_schema.dump({"message": "Invalid verification token"}),
                     400,
                 )
 
-            user.email_verified = True
-            user.email_verification_token = None
-
+            # email_verified is not in the profile snapshot (see UserCache)
             db.session.commit()
 
             return (
-                self.success_schema.dump({"message": "Email successfully verified"}),
+                self.dump_success({"message": "Email successfully verified"}),
                 200,
             )
 
+        except ServiceUnavailableError as e:
+            db.session.rollback()
+            return self.busy_response("Failed to verify email", e)
+
         except Exception as e:
             db.session.rollback()
             return (
@@ -985,23 +551,38 @@ class AuthController:
         Update user profile information
         """
         try:
+            shard_router.pin(user_id)
             user = db.session.get(User, user_id)
             if not user:
                 return self.error_schema.dump({"message": "User not found"}), 404
 
             # Update allowed fields
+            changed = False
             for field in ["username", "email"]:
-                if field in data:
+                if field in data and data[field] != getattr(user, field):
+                    if shard_router.shards:
+                        self.replace_lookup(
+                            field, getattr(user, field), data[field], user.id
+                        )
                     setattr(user, field, data[field])
+                    changed = True
+            if changed:
+                user.bump_profile_version()
+            profile_version = user.profile_version
 
+            # Dump before commit, which would expire the user and force a
+            # reload
+            response = self.dump_success(
+                {"message": "Profile updated successfully", "user": user}
+            )
             db.session.commit()
+            user_cache.invalidate(user_id, profile_version if changed else None)
 
-            return (
-                self.success_schema.dump(
-                    {"message": "Profile updated successfully", "user": user}
-                ),
-                200,
-            )
+            return response, 200
+
+        except ServiceUnavailableError as e:
+            db.session.rollback()
+            return self.busy_response("Failed to update profile", e)
 
         except Exception as e:
             db.session.rollback()
@@ -1014,26 +595,55 @@ class AuthController:
                 ),
                 500,
             )
-    def get_profile(self, user_id):
-        """Get user profile"""
+
+    def current_profile_version(self, user_id):
+        """
+        Profile version of ``user_id`` as known to the user cache, else
+        read from the primary and remembered there for a while; None if
+        the user does not exist.
+        """
+        version = user_cache.profile_version(user_id)
+        if version is None:
+            shard_router.pin(user_id)
+            version = db.session.execute(
+                select(User.profile_version).where(User.id == user_id)
+            ).scalar()
+            if version is not None:
+                user_cache.remember_version(user_id, version)
+        return version
+
+    def get_profile(self, user_id, claims=None):
+        """
+        Get user profile. ``claims`` is the profile snapshot from the access
+        token; it is used only while its version is the current one.
+        """
         try:
-            user = User.query.filter_by(id=user_id).first()
+            if (
+                claims is not None
+                and current_app.config["JWT_PROFILE_CLAIMS"]
+                # Tokens minted before created_at was a claim lack it
+                and "created_at" in claims
+            ):
+                if self.current_profile_version(user_id) == claims["v"]:
+                    profile = {"id": user_id}
+                    for field in self.PROFILE_CLAIM_FIELDS:
+                        profile[field] = claims[field]
+                    return profile, 200
+
+            profile = user_cache.get(user_id)
+            if profile is not None:
+                return profile, 200
+
+            user = self.find_user(id=user_id)
             if not user:
-                return {
-                    'message': 'User not found'
-                }, 404
+                return {"message": "User not found"}, 404
 
-            return {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'role': user.role,
-                'is_active': user.is_active
-            }, 200
+            # The same dump as the user in auth responses
+            profile = self.dump_user(user)
+            user_cache.put(user_id, profile)
+            return profile, 200
 
         except Exception as e:
             # Log the error for debugging
             print(f"Error in get_profile: {str(e)}")
-            return {
-                'message': 'User not found'
-            }, 404
\ No newline at end of file
+            return {"message": "User not found"}, 404
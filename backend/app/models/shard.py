@@ -0,0 +1,35 @@
+from app import db
+from app.models.types import HexUUID, unicode_ci_string
+
+
+class ShardBucket(db.Model):
+    """
+    Where the users of one hash bucket live while the users table is
+    sharded: a shard bind key, or "default" for the primary's own table.
+    ``moving`` is set while the bucket is copied to another shard; writes
+    to its users are refused until the move completes.
+    """
+
+    __tablename__ = "shard_buckets"
+
+    bucket = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    placement = db.Column(db.String(32), nullable=False)
+    moving = db.Column(db.Boolean, nullable=False, default=False)
+
+
+class UsernameLookup(db.Model):
+    """Global username -> user id index; enforces uniqueness across shards"""
+
+    __tablename__ = "username_lookups"
+
+    username = db.Column(unicode_ci_string(80), primary_key=True)
+    user_id = db.Column(HexUUID(), nullable=False, index=True)
+
+
+class EmailLookup(db.Model):
+    """Global email -> user id index; enforces uniqueness across shards"""
+
+    __tablename__ = "email_lookups"
+
+    email = db.Column(unicode_ci_string(120), primary_key=True)
+    user_id = db.Column(HexUUID(), nullable=False, index=True)
@@ -1,43 +1,74 @@
 # app/models/user.py
+import hashlib
 from datetime import datetime, timezone
-from uuid import uuid4
-from werkzeug.security import generate_password_hash, check_password_hash
-from app import db
+from app import db, password_hasher
+from app.models.types import HexUUID, unicode_ci_string, uuid7
+from app.services.sharding import shard_bucket
+
+
+def utc_now():
+    """
+    The current UTC time as the column stores it: naive and to the second,
+    like MySQL's DATETIME. A user dumped before the row is reloaded (as
+    register does) then shows what later reads return.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
 
 
 class User(db.Model):
     __tablename__ = "users"
+    # Rows live on the shard of their hash bucket when sharding is enabled
+    __table_args__ = {"info": {"sharded": True}}
 
-    # UUID as String for MySQL compatibility
-    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid4().hex)
-    username = db.Column(
-        db.String(80, collation="utf8mb4_unicode_ci"), unique=True, nullable=False
-    )
-    email = db.Column(
-        db.String(120, collation="utf8mb4_unicode_ci"), unique=True, nullable=False
-    )
-    password_hash = db.Column(
-        db.String(255, collation="utf8mb4_unicode_ci"), nullable=False
-    )
-    created_at = db.Column(
-        db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
-    )
+    # Time-ordered UUIDv7 stored as BINARY(16), exposed as a hex string
+    id = db.Column(HexUUID(), primary_key=True, default=lambda: uuid7().hex)
+    username = db.Column(unicode_ci_string(80), unique=True, nullable=False)
+    email = db.Column(unicode_ci_string(120), unique=True, nullable=False)
+    password_hash = db.Column(unicode_ci_string(255), nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=utc_now)
     is_active = db.Column(db.Boolean, default=True)
-    role = db.Column(db.String(20, collation="utf8mb4_unicode_ci"), default="user")
+    role = db.Column(unicode_ci_string(20), default="user")
+    # Bumped whenever profile fields change; lets access tokens that embed
+    # a profile snapshot detect that it is out of date
+    profile_version = db.Column(
+        db.Integer, nullable=False, default=1, server_default="1"
+    )
 
-    # Reset password fields
-    reset_token = db.Column(db.String(100), unique=True)
+    # Reset password fields. Tokens are stored as SHA-256 digests (see
+    # hash_token); the raw token only ever exists in the link sent out.
+    reset_token = db.Column(db.BINARY(32), unique=True)
     reset_token_expires = db.Column(db.DateTime)
 
     # Email verification fields
     email_verified = db.Column(db.Boolean, default=False)
-    email_verification_token = db.Column(db.String(100), unique=True)
+    email_verification_token = db.Column(db.BINARY(32), unique=True)
+
+    # Hash bucket of the id; decides the shard and lets a bucket be moved
+    # between shards with an index range scan
+    shard_bucket = db.Column(db.SmallInteger, index=True)
+
+    def __init__(self, **kwargs):
+        # The id is needed up front to pick the shard the row goes to
+        kwargs.setdefault("id", uuid7().hex)
+        kwargs.setdefault("shard_bucket", shard_bucket(kwargs["id"]))
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def hash_token(token):
+        """Digest under which a reset or verification token is stored"""
+        return hashlib.sha256(token.encode()).digest()
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.generate(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
+
+    def bump_profile_version(self):
+        self.profile_version = (self.profile_version or 1) + 1
 
     def is_valid_reset_token(self):
         if not self.reset_token or not self.reset_token_expires:
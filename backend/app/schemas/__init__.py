@@ -5,6 +5,7 @@ from .auth import (
     PasswordResetRequestSchema,
     PasswordResetSchema,
     PasswordChangeSchema,
+    ProfileUpdateSchema,
     TokenSchema,
     AuthSuccessSchema,
     AuthErrorSchema,
@@ -17,6 +18,7 @@ __all__ = [
     "PasswordResetRequestSchema",
     "PasswordResetSchema",
     "PasswordChangeSchema",
+    "ProfileUpdateSchema",
     "TokenSchema",
     "AuthSuccessSchema",
     "AuthErrorSchema",
@@ -1,4 +1,5 @@
 from marshmallow import Schema, fields, validates, ValidationError, validates_schema
+from app import password_policy
 from app.schemas.user import UserSchema
 
 
@@ -26,29 +27,7 @@ class RegisterSchema(Schema):
 
     @validates("password")
     def validate_password(self, value):
-        errors = []
-        special_chars = '!@#$%^&*(),.?":{}|<>'
-
-        if len(value) < 8:
-            errors.append("Password must be at least 8 characters long")
-
-        if not any(char.isdigit() for char in value):
-            errors.append("Password must contain at least one number")
-
-        if not any(char.isupper() for char in value):
-            errors.append("Password must contain at least one uppercase letter")
-
-        if not any(char.islower() for char in value):
-            errors.append("Password must contain at least one lowercase letter")
-
-        if not any(char in special_chars for char in value):
-            errors.append(
-                f"Password must contain at \
-            least one special character ({special_chars})"
-            )
-
-        if errors:
-            raise ValidationError(errors)
+        password_policy.validate(value)
 
     @validates_schema
     def validate_passwords_match(self, data, **kwargs):
@@ -72,29 +51,7 @@ class PasswordResetSchema(Schema):
 
     @validates("new_password")
     def validate_password(self, value):
-        errors = []
-        special_chars = '!@#$%^&*(),.?":{}|<>'
-
-        if len(value) < 8:
-            errors.append("Password must be at least 8 characters long")
-
-        if not any(char.isdigit() for char in value):
-            errors.append("Password must contain at least one number")
-
-        if not any(char.isupper() for char in value):
-            errors.append("Password must contain at least one uppercase letter")
-
-        if not any(char.islower() for char in value):
-            errors.append("Password must contain at least one lowercase letter")
-
-        if not any(char in special_chars for char in value):
-            errors.append(
-                f"Password must contain at least \
-            one special character ({special_chars})"
-            )
-
-        if errors:
-            raise ValidationError(errors)
+        password_policy.validate(value)
 
     @validates_schema
     def validate_passwords_match(self, data, **kwargs):
@@ -111,29 +68,7 @@ class PasswordChangeSchema(Schema):
 
     @validates("new_password")
     def validate_password(self, value):
-        errors = []
-        special_chars = '!@#$%^&*(),.?":{}|<>'
-
-        if len(value) < 8:
-            errors.append("Password must be at least 8 characters long")
-
-        if not any(char.isdigit() for char in value):
-            errors.append("Password must contain at least one number")
-
-        if not any(char.isupper() for char in value):
-            errors.append("Password must contain at least one uppercase letter")
-
-        if not any(char.islower() for char in value):
-            errors.append("Password must contain at least one lowercase letter")
-
-        if not any(char in special_chars for char in value):
-            errors.append(
-                f"Password must contain at least \
-              one special character ({special_chars})"
-            )
-
-        if errors:
-            raise ValidationError(errors)
+        password_policy.validate(value)
 
     @validates_schema
     def validate_passwords_match(self, data, **kwargs):
@@ -141,6 +76,20 @@ class PasswordChangeSchema(Schema):
             raise ValidationError("Passwords must match", "confirm_password")
 
 
+class ProfileUpdateSchema(Schema):
+    """Schema for a partial profile update; only the fields given change"""
+
+    username = fields.String()
+    email = fields.Email()
+
+    @validates("username")
+    def validate_username(self, value):
+        if len(value) < 3:
+            raise ValidationError("Username must be at least 3 characters long")
+        if len(value) > 80:
+            raise ValidationError("Username must be less than 80 characters")
+
+
 class TokenSchema(Schema):
     """Schema for JWT token response"""
 
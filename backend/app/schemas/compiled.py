@@ -0,0 +1,112 @@
+from datetime import datetime
+from marshmallow import Schema, fields, missing
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+ISO_FORMATS = (None, "iso", "iso8601")
+
+
+def compile_dump(schema):
+    """
+    Return a function that dumps one object exactly as ``schema.dump``
+    does, generated for the schema's fields.
+
+    marshmallow dumps an object by asking each field to fetch and format
+    its value through several layers of generic calls. The generated
+    function reads each value directly and formats the common types
+    (strings, integers, booleans, ISO datetimes, nested schemas) inline,
+    handing any other type or value to the field's own ``_serialize``, so
+    the output is the same. Schemas with dump hooks, a ``many`` schema or
+    an ordered dict class fall back to ``schema.dump``.
+    """
+    if (
+        schema.many
+        or schema._hooks[PRE_DUMP]
+        or schema._hooks[POST_DUMP]
+        or schema.dict_class is not dict
+    ):
+        return schema.dump
+
+    namespace = {
+        "missing": missing,
+        "get_attribute": schema.get_attribute,
+        "datetime": datetime,
+    }
+    # Values are read the way marshmallow's default get_attribute reads
+    # them: by key from dicts, by attribute from objects without
+    # __getitem__, through get_attribute from anything else
+    plain = type(schema).get_attribute is Schema.get_attribute
+    lines = [
+        "def dump(obj):",
+        f"    is_dict = {plain} and obj.__class__ is dict",
+        f"    is_object = {plain} and not hasattr(obj, '__getitem__')",
+        "    ret = {}",
+    ]
+    for index, (attr_name, field) in enumerate(schema.dump_fields.items()):
+        name = f"field_{index}"
+        namespace[name] = field
+        key = field.data_key if field.data_key is not None else attr_name
+
+        if type(field).serialize is not fields.Field.serialize or not (
+            field._CHECK_ATTRIBUTE
+        ):
+            lines += [
+                f"    value = {name}.serialize({attr_name!r}, obj, "
+                "accessor=get_attribute)",
+                "    if value is not missing:",
+                f"        ret[{key!r}] = value",
+            ]
+            continue
+
+        check_key = attr_name if field.attribute is None else field.attribute
+        if "." in check_key or hasattr(dict, check_key):
+            lines.append(f"    value = get_attribute(obj, {check_key!r}, missing)")
+        else:
+            lines.append(
+                f"    value = obj.get({check_key!r}, missing) if is_dict "
+                f"else getattr(obj, {check_key!r}, missing) if is_object "
+                f"else get_attribute(obj, {check_key!r}, missing)"
+            )
+
+        if field.dump_default is not missing:
+            namespace[f"default_{index}"] = field.dump_default
+            default = f"default_{index}"
+            if callable(field.dump_default):
+                default += "()"
+            lines += ["    if value is missing:", f"        value = {default}"]
+            indent = "    "
+        else:
+            lines.append("    if value is not missing:")
+            indent = "        "
+
+        slow = f"{name}._serialize(value, {attr_name!r}, obj)"
+        expression = _inline(field, name, slow, namespace)
+        lines.append(f"{indent}ret[{key!r}] = {expression}")
+    lines.append("    return ret")
+
+    exec(
+        compile("\n".join(lines), f"<dump {type(schema).__name__}>", "exec"), namespace
+    )
+    return namespace["dump"]
+
+
+def _inline(field, name, slow, namespace):
+    """Expression formatting ``value`` for ``field``, falling back to ``slow``"""
+    kind = type(field)
+    if kind in (fields.String, fields.Email):
+        return f"value if value.__class__ is str else {slow}"
+    if kind is fields.Integer and not field.as_string:
+        return f"value if value.__class__ is int else {slow}"
+    if kind is fields.Boolean:
+        return f"value if value.__class__ is bool else {slow}"
+    if kind is fields.DateTime and field.format in ISO_FORMATS:
+        return f"value.isoformat() if value.__class__ is datetime else {slow}"
+    if kind is fields.Nested:
+        nested = f"{name}_dump"
+        if field.schema.many:
+            namespace[nested] = field.schema.dump
+        else:
+            namespace[nested] = compile_dump(field.schema)
+            if field.many:
+                return f"None if value is None else [{nested}(item) for item in value]"
+        return f"None if value is None else {nested}(value)"
+    return slow
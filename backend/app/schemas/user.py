@@ -1,5 +1,5 @@
 from marshmallow import validates, ValidationError
-from app import ma
+from app import ma, password_policy
 from app.models.user import User
 
 
@@ -25,21 +25,4 @@ class UserSchema(ma.SQLAlchemySchema):
 
     @validates("password")
     def validate_password(self, value):
-        if len(value) < 8:
-            raise ValidationError("Password must be at least 8 characters long")
-        if not any(char.isdigit() for char in value):
-            raise ValidationError("Password must contain at least one number")
-        if not any(char.isupper() for char in value):
-            raise ValidationError(
-                "Password must contain at \
-                               least one uppercase letter"
-            )
-        if not any(char.islower() for char in value):
-            raise ValidationError(
-                "Password must contain at \
-                              least one lowercase letter"
-            )
-        if not any(char in '!@#$%^&*(),.?":{}|<>' for char in value):
-            raise ValidationError(
-                "Password must contain at least one special character"
-            )
+        password_policy.validate(value)
@@ -0,0 +1,114 @@
+import threading
+from app.services.system import available_cpus
+
+
+class Budget:
+    """
+    Concurrency budget: at most ``limit`` requests in flight, at most
+    ``queue_size`` more waiting up to ``queue_timeout`` seconds for a slot.
+    Anything beyond that is rejected immediately.
+    """
+
+    def __init__(self, name, limit, queue_size, queue_timeout):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Return True if the caller was admitted and must call release()"""
+        with self._cond:
+            if self.in_flight < self.limit and not self.waiting:
+                return self._admit()
+
+            if self.waiting >= self.queue_size:
+                self.rejected += 1
+                return False
+
+            self.waiting += 1
+            try:
+                has_slot = self._cond.wait_for(
+                    lambda: self.in_flight < self.limit, timeout=self.queue_timeout
+                )
+            finally:
+                self.waiting -= 1
+
+            if not has_slot:
+                self.rejected += 1
+                return False
+            return self._admit()
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "queue_depth": self.waiting,
+                "queue_size": self.queue_size,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+            }
+
+    def _admit(self):
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+
+class AdmissionController:
+    """
+    Per-process admission control with separate budgets, so a flood of
+    hash-heavy requests (login, register, password changes) cannot take
+    every worker thread away from the cheap routes.
+    """
+
+    def __init__(self, app=None):
+        self.budgets = {}
+        self.retry_after = 1
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("AUTH_HASH_CONCURRENCY", 0)
+        app.config.setdefault("AUTH_HASH_QUEUE_SIZE", 16)
+        app.config.setdefault("AUTH_CONCURRENCY", 64)
+        app.config.setdefault("AUTH_QUEUE_SIZE", 64)
+        app.config.setdefault("AUTH_QUEUE_TIMEOUT", 1.0)
+        app.config.setdefault("AUTH_RETRY_AFTER", 1)
+
+        timeout = app.config["AUTH_QUEUE_TIMEOUT"]
+        self.budgets = {
+            "hash": Budget(
+                "hash",
+                app.config["AUTH_HASH_CONCURRENCY"] or available_cpus(),
+                app.config["AUTH_HASH_QUEUE_SIZE"],
+                timeout,
+            ),
+            "default": Budget(
+                "default",
+                app.config["AUTH_CONCURRENCY"],
+                app.config["AUTH_QUEUE_SIZE"],
+                timeout,
+            ),
+        }
+        self.retry_after = app.config["AUTH_RETRY_AFTER"]
+        app.extensions["admission"] = self
+
+    def admit(self, budget):
+        return self.budgets[budget].acquire()
+
+    def release(self, budget):
+        self.budgets[budget].release()
+
+    def stats(self):
+        return {name: budget.stats() for name, budget in self.budgets.items()}
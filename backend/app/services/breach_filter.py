@@ -0,0 +1,92 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+
+# Magic, bit count, hash count, item count
+HEADER = struct.Struct("<8sQII")
+MAGIC = b"CSBLOOM1"
+
+
+def sha1_digest(password):
+    return hashlib.sha1(password.encode("utf-8")).digest()
+
+
+def filter_size(items, false_positive_rate):
+    """``(bits, hashes)`` for ``items`` entries at ``false_positive_rate``"""
+    items = max(1, items)
+    bits = math.ceil(-items * math.log(false_positive_rate) / math.log(2) ** 2)
+    bits = max(64, (bits + 7) // 8 * 8)
+    hashes = max(1, round(bits / items * math.log(2)))
+    return bits, hashes
+
+
+def _positions(digest, bits, hashes):
+    # Double hashing over two 64-bit halves of the SHA-1 digest, which is
+    # already uniformly distributed
+    h1, h2 = struct.unpack_from("<QQ", digest)
+    h2 |= 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+class BreachFilter:
+    """
+    Read-only Bloom filter of SHA-1 password digests, memory-mapped from a
+    file written by ``build``.
+
+    The mapping is shared and read-only, so every worker of a server
+    reads the same page cache pages rather than a private copy of the
+    filter. A lookup touches ``hashes`` bytes and costs a SHA-1 and a few
+    page reads. A hit may be a false positive at the rate the filter was
+    built for; a miss is always right.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is not a breach filter")
+        magic, self.bits, self.hashes, self.items = HEADER.unpack_from(self._map)
+        if magic != MAGIC or len(self._map) < HEADER.size + self.bits // 8:
+            raise ValueError(f"{path} is not a breach filter")
+        if hasattr(self._map, "madvise"):
+            # Lookups land on random pages; read-ahead would only waste cache
+            self._map.madvise(mmap.MADV_RANDOM)
+
+    def __contains__(self, password):
+        return self.contains_digest(sha1_digest(password))
+
+    def contains_digest(self, digest):
+        data = self._map
+        for position in _positions(digest, self.bits, self.hashes):
+            if not data[HEADER.size + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def close(self):
+        self._map.close()
+
+    @staticmethod
+    def build(path, digests, items, false_positive_rate=0.001):
+        """
+        Write a filter of ``digests`` (SHA-1 digests, at most ``items`` of
+        them) to ``path``. The file is filled in place through a writable
+        mapping and renamed over ``path`` when complete, so running
+        servers keep the filter they mapped until they reopen it.
+        """
+        bits, hashes = filter_size(items, false_positive_rate)
+        partial = f"{path}.partial"
+        added = 0
+        with open(partial, "w+b") as file:
+            file.truncate(HEADER.size + bits // 8)
+            with mmap.mmap(file.fileno(), 0) as data:
+                for digest in digests:
+                    for position in _positions(digest, bits, hashes):
+                        data[HEADER.size + (position >> 3)] |= 1 << (position & 7)
+                    added += 1
+                HEADER.pack_into(data, 0, MAGIC, bits, hashes, added)
+                data.flush()
+        os.replace(partial, path)
+        return bits, hashes, added
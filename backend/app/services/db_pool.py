@@ -0,0 +1,107 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from app.services.metrics import Histogram
+
+
+class PoolMetrics:
+    """Counters fed by pool events, plus the checkout wait histogram"""
+
+    EVENTS = ("connect", "checkout", "checkin", "invalidate", "close")
+
+    def __init__(self):
+        self.checkout_wait = Histogram()
+        self.counts = dict.fromkeys(self.EVENTS + ("timeout",), 0)
+        self._lock = threading.Lock()
+
+    def listen(self, pool):
+        for name in self.EVENTS:
+            event.listen(pool, name, self._counter(name))
+
+    def increment(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _counter(self, name):
+        def on_event(*args):
+            self.increment(name)
+
+        return on_event
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # recreate() (on engine.dispose()) hands over the listeners through
+        # _dispatch and the metrics below; register them only once
+        if "_dispatch" not in kwargs:
+            self.metrics = PoolMetrics()
+            self.metrics.listen(self)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.increment("timeout")
+            raise
+        finally:
+            self.metrics.checkout_wait.observe(time.perf_counter() - started)
+
+    def stats(self):
+        with self.metrics._lock:
+            counts = dict(self.metrics.counts)
+        return {
+            "size": self.size(),
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "connects": counts["connect"],
+            "closes": counts["close"],
+            "checkouts": counts["checkout"],
+            "invalidations": counts["invalidate"],
+            "timeouts": counts["timeout"],
+            "checkout_wait_seconds": self.metrics.checkout_wait.snapshot(),
+        }
+
+
+class PoolMonitor:
+    """
+    Puts server database engines on TimedQueuePool and reports their pool
+    state. init_app must run before ``db.init_app`` creates the engines.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Copy: the dict may be shared with the config class
+        options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+        uri = app.config.get("SQLALCHEMY_DATABASE_URI")
+        # SQLite picks pools suited to file vs. memory databases itself
+        if uri and make_url(uri).get_backend_name() != "sqlite":
+            options.setdefault("poolclass", TimedQueuePool)
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+        app.extensions["pool_monitor"] = self
+
+    def stats(self):
+        """Per-bind pool stats; call within an app context"""
+        from app import db
+
+        return {
+            key or "default": engine.pool.stats()
+            for key, engine in db.engines.items()
+            if isinstance(engine.pool, TimedQueuePool)
+        }
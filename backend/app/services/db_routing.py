@@ -0,0 +1,165 @@
+import contextlib
+import itertools
+import logging
+import threading
+import time
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql import Select
+from app.services.sharding import is_sharded
+
+# Keys in Session.info; a session lives for one app context (request)
+REPLICA_READS = "db_router.replica_reads"
+STICK_TO_PRIMARY = "db_router.stick_to_primary"
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs issued inside ``db_router.replica_reads()``
+    to a read replica and everything else to the primary. Once the session
+    has written, it stays on the primary so the rest of the request reads
+    its own writes. With sharding enabled, statements on sharded tables go
+    to the shard picked by ``shard_router.pin()`` instead.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        # Explicit binds and models with their own bind_key are left alone
+        if bind is not None or engine is not self._db.engines.get(None):
+            return engine
+
+        write = self._flushing or getattr(clause, "is_dml", False)
+        if is_sharded(mapper, clause):
+            shard_router = current_app.extensions.get("shard_router")
+            if shard_router is not None and shard_router.shards:
+                return shard_router.engine_for(self, write=write)
+
+        if write:
+            self.info[STICK_TO_PRIMARY] = True
+            return engine
+
+        if (
+            not self.info.get(REPLICA_READS)
+            or self.info.get(STICK_TO_PRIMARY)
+            or not isinstance(clause, Select)
+            or clause._for_update_arg is not None
+        ):
+            return engine
+
+        router = current_app.extensions.get("db_router")
+        replica = router.choose(self._db) if router is not None else None
+        return replica if replica is not None else engine
+
+
+class ReadRouter:
+    """
+    Registers the SQLALCHEMY_REPLICA_URIS as binds and picks a replica,
+    round robin, for reads that may be served by one. A replica lagging
+    more than REPLICA_MAX_LAG seconds behind the primary, or whose lag
+    cannot be determined, is skipped until its next check.
+    """
+
+    def __init__(self, app=None):
+        self.replicas = []
+        self.max_lag = 0
+        self.check_interval = 0
+        self._cycle = iter(())
+        self._lag = {}
+        self._lock = threading.Lock()
+        self.replica_reads_count = 0
+        self.fallbacks = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SQLALCHEMY_REPLICA_URIS", [])
+        app.config.setdefault("REPLICA_MAX_LAG", 5.0)
+        app.config.setdefault("REPLICA_LAG_CHECK_INTERVAL", 5.0)
+
+        # Must run before db.init_app, which creates an engine per bind
+        binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+        self.replicas = []
+        for index, uri in enumerate(app.config["SQLALCHEMY_REPLICA_URIS"]):
+            key = f"replica_{index}"
+            binds[key] = uri
+            self.replicas.append(key)
+        app.config["SQLALCHEMY_BINDS"] = binds
+
+        self.max_lag = app.config["REPLICA_MAX_LAG"]
+        self.check_interval = app.config["REPLICA_LAG_CHECK_INTERVAL"]
+        self._cycle = itertools.cycle(self.replicas)
+        with self._lock:
+            self._lag.clear()
+            self.replica_reads_count = 0
+            self.fallbacks = 0
+        app.extensions["db_router"] = self
+
+    @contextlib.contextmanager
+    def replica_reads(self):
+        """Allow the SELECTs in this block to be served by a replica"""
+        from app import db
+
+        session = db.session()
+        previous = session.info.get(REPLICA_READS, False)
+        session.info[REPLICA_READS] = True
+        try:
+            yield
+        finally:
+            session.info[REPLICA_READS] = previous
+
+    def choose(self, db):
+        """Engine of the next replica within the lag limit, or None"""
+        for _ in self.replicas:
+            key = next(self._cycle)
+            engine = db.engines[key]
+            if self._usable(key, engine):
+                with self._lock:
+                    self.replica_reads_count += 1
+                return engine
+        if self.replicas:
+            with self._lock:
+                self.fallbacks += 1
+        return None
+
+    def measure_lag(self, engine):
+        """Replication lag of ``engine`` in seconds, or None if unknown"""
+        if engine.dialect.name != "mysql":
+            # SQLite stand-ins and the like have no replication to lag
+            return 0.0
+        try:
+            with engine.connect() as connection:
+                status = (
+                    connection.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+                )
+        except Exception as e:
+            logging.warning(f"Replica lag check failed for {engine.url!r}: {e}")
+            return None
+        if status is None or status["Seconds_Behind_Source"] is None:
+            # Not a replica, or replication is stopped
+            return None
+        return float(status["Seconds_Behind_Source"])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "replicas": {
+                    key: {"lag": lag, "usable": lag is not None and lag <= self.max_lag}
+                    for key, (_, lag) in self._lag.items()
+                },
+                "replica_reads": self.replica_reads_count,
+                "primary_fallbacks": self.fallbacks,
+            }
+
+    def _usable(self, key, engine):
+        now = time.monotonic()
+        with self._lock:
+            checked_at, lag = self._lag.get(key, (None, None))
+            stale = checked_at is None or now - checked_at >= self.check_interval
+            if stale:
+                # Claim the check so concurrent requests keep the last value
+                self._lag[key] = (now, lag)
+        if stale:
+            lag = self.measure_lag(engine)
+            with self._lock:
+                self._lag[key] = (now, lag)
+        return lag is not None and lag <= self.max_lag
@@ -0,0 +1,5 @@
+class ServiceUnavailableError(Exception):
+    """
+    A backing resource cannot take the request right now; callers answer
+    503 so the client retries later.
+    """
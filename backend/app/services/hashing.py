@@ -0,0 +1,336 @@
+import os
+import threading
+import time
+from concurrent.futures import BrokenExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.errors import ServiceUnavailableError
+from app.services.metrics import Histogram
+from app.services.system import available_cpus
+
+
+class HashingUnavailableError(ServiceUnavailableError):
+    """Raised when the hashing pool is saturated or a job exceeds its timeout"""
+
+
+class HashingPolicy:
+    """
+    Password hashing algorithm and cost parameters.
+
+    pbkdf2 and scrypt hashes use werkzeug's ``method$salt$hash`` format,
+    argon2id hashes use the PHC string format of argon2-cffi. Both encode
+    their parameters, which is what ``needs_rehash`` compares against.
+    """
+
+    ALGORITHMS = ("pbkdf2", "scrypt", "argon2id")
+
+    def __init__(
+        self,
+        algorithm="scrypt",
+        pbkdf2_iterations=600_000,
+        scrypt_n=2**15,
+        scrypt_r=8,
+        scrypt_p=1,
+        argon2_time_cost=3,
+        argon2_memory_cost=65536,
+        argon2_parallelism=4,
+    ):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unsupported password hash algorithm '{algorithm}'")
+        self.algorithm = algorithm
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.scrypt_n = scrypt_n
+        self.scrypt_r = scrypt_r
+        self.scrypt_p = scrypt_p
+        self.argon2_time_cost = argon2_time_cost
+        self.argon2_memory_cost = argon2_memory_cost
+        self.argon2_parallelism = argon2_parallelism
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            algorithm=config["PASSWORD_HASH_ALGORITHM"],
+            pbkdf2_iterations=config["PASSWORD_HASH_PBKDF2_ITERATIONS"],
+            scrypt_n=config["PASSWORD_HASH_SCRYPT_N"],
+            scrypt_r=config["PASSWORD_HASH_SCRYPT_R"],
+            scrypt_p=config["PASSWORD_HASH_SCRYPT_P"],
+            argon2_time_cost=config["PASSWORD_HASH_ARGON2_TIME_COST"],
+            argon2_memory_cost=config["PASSWORD_HASH_ARGON2_MEMORY_COST"],
+            argon2_parallelism=config["PASSWORD_HASH_ARGON2_PARALLELISM"],
+        )
+
+    @property
+    def method(self):
+        """werkzeug method string, e.g. ``scrypt:32768:8:1``"""
+        if self.algorithm == "pbkdf2":
+            return f"pbkdf2:sha256:{self.pbkdf2_iterations}"
+        if self.algorithm == "scrypt":
+            return f"scrypt:{self.scrypt_n}:{self.scrypt_r}:{self.scrypt_p}"
+        return "argon2id"
+
+    def config_items(self):
+        """Config keys for this policy's algorithm, as set by the environment"""
+        items = {"PASSWORD_HASH_ALGORITHM": self.algorithm}
+        if self.algorithm == "pbkdf2":
+            items["PASSWORD_HASH_PBKDF2_ITERATIONS"] = self.pbkdf2_iterations
+        elif self.algorithm == "scrypt":
+            items["PASSWORD_HASH_SCRYPT_N"] = self.scrypt_n
+            items["PASSWORD_HASH_SCRYPT_R"] = self.scrypt_r
+            items["PASSWORD_HASH_SCRYPT_P"] = self.scrypt_p
+        else:
+            items["PASSWORD_HASH_ARGON2_TIME_COST"] = self.argon2_time_cost
+            items["PASSWORD_HASH_ARGON2_MEMORY_COST"] = self.argon2_memory_cost
+            items["PASSWORD_HASH_ARGON2_PARALLELISM"] = self.argon2_parallelism
+        return items
+
+    def argon2_hasher(self):
+        try:
+            import argon2
+        except ImportError:  # pragma: no cover
+            raise RuntimeError(
+                "PASSWORD_HASH_ALGORITHM=argon2id requires the argon2-cffi package"
+            ) from None
+        return argon2.PasswordHasher(
+            time_cost=self.argon2_time_cost,
+            memory_cost=self.argon2_memory_cost,
+            parallelism=self.argon2_parallelism,
+            type=argon2.Type.ID,
+        )
+
+    def needs_rehash(self, pwhash):
+        """True if ``pwhash`` was made with a different algorithm or cost"""
+        if pwhash.startswith("$argon2"):
+            if self.algorithm != "argon2id":
+                return True
+            return self.argon2_hasher().check_needs_rehash(pwhash)
+        return pwhash.split("$", 1)[0] != self.method
+
+
+def hash_password(password, policy):
+    """Hash ``password`` according to ``policy``"""
+    if policy.algorithm == "argon2id":
+        return policy.argon2_hasher().hash(password)
+    return generate_password_hash(password, method=policy.method)
+
+
+def verify_password(pwhash, password):
+    """Check ``password`` against a hash made by any supported algorithm"""
+    if pwhash.startswith("$argon2"):
+        import argon2
+
+        try:
+            return argon2.PasswordHasher().verify(pwhash, password)
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHash):
+            return False
+    return check_password_hash(pwhash, password)
+
+
+def calibrate(algorithm, target_seconds, samples=3, argon2_memory_cost=65536):
+    """
+    Pick cost parameters for ``algorithm`` whose verify time on this
+    machine is as close as possible to ``target_seconds``.
+
+    Returns ``(policy, measured_seconds)``.
+    """
+
+    def measure(policy):
+        pwhash = hash_password("calibration-Password1!", policy)
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            verify_password(pwhash, "calibration-Password1!")
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    if algorithm == "pbkdf2":
+        # Cost is linear in the iteration count: scale a probe, then refine.
+        iterations = 20_000
+        for _ in range(2):
+            elapsed = measure(HashingPolicy("pbkdf2", pbkdf2_iterations=iterations))
+            iterations = max(
+                1000, int(round(iterations * target_seconds / elapsed, -3))
+            )
+        policy = HashingPolicy("pbkdf2", pbkdf2_iterations=iterations)
+        return policy, measure(policy)
+
+    if algorithm == "scrypt":
+        # N must be a power of two; keep r=8, p=1 and pick the closest N.
+        candidates = []
+        n = 2**10
+        while n <= 2**20:
+            policy = HashingPolicy("scrypt", scrypt_n=n)
+            elapsed = measure(policy)
+            candidates.append((abs(elapsed - target_seconds), policy, elapsed))
+            if elapsed >= target_seconds:
+                break
+            n *= 2
+        _, policy, elapsed = min(candidates, key=lambda c: c[0])
+        return policy, elapsed
+
+    # argon2id: hold memory fixed and raise passes; if one pass is already
+    # too slow, halve memory (down to 8 MiB) instead.
+    memory_cost, time_cost = argon2_memory_cost, 1
+    best = None
+    while True:
+        policy = HashingPolicy(
+            "argon2id", argon2_time_cost=time_cost, argon2_memory_cost=memory_cost
+        )
+        elapsed = measure(policy)
+        if best is None or abs(elapsed - target_seconds) < abs(
+            best[1] - target_seconds
+        ):
+            best = (policy, elapsed)
+        if elapsed > target_seconds and time_cost == 1 and memory_cost > 8192:
+            memory_cost //= 2
+            continue
+        if elapsed >= target_seconds or time_cost >= 10:
+            return best
+        time_cost += 1
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification off the request thread.
+
+    When enabled, jobs are submitted to a process pool so the CPU-bound
+    key derivation does not hold the GIL of the web worker. The number of
+    jobs queued or running is bounded; callers get HashingUnavailableError
+    instead of waiting behind an unbounded backlog. When disabled (the
+    default outside of init_app), hashing runs inline.
+    """
+
+    def __init__(self, app=None):
+        self.policy = HashingPolicy()
+        self.enabled = False
+        self.max_workers = 1
+        self.queue_size = 0
+        self.timeout = None
+        self._executor = None
+        self._executor_pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+        # Wall time per call, queueing included; kept for the process lifetime
+        self.durations = {"generate": Histogram(), "check": Histogram()}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PASSWORD_HASH_POOL_ENABLED", False)
+        app.config.setdefault("PASSWORD_HASH_POOL_WORKERS", 0)
+        app.config.setdefault("PASSWORD_HASH_POOL_QUEUE_SIZE", 32)
+        app.config.setdefault("PASSWORD_HASH_TIMEOUT", 5.0)
+        app.config.setdefault("PASSWORD_HASH_ALGORITHM", "scrypt")
+        app.config.setdefault("PASSWORD_HASH_PBKDF2_ITERATIONS", 600_000)
+        app.config.setdefault("PASSWORD_HASH_SCRYPT_N", 2**15)
+        app.config.setdefault("PASSWORD_HASH_SCRYPT_R", 8)
+        app.config.setdefault("PASSWORD_HASH_SCRYPT_P", 1)
+        app.config.setdefault("PASSWORD_HASH_ARGON2_TIME_COST", 3)
+        app.config.setdefault("PASSWORD_HASH_ARGON2_MEMORY_COST", 65536)
+        app.config.setdefault("PASSWORD_HASH_ARGON2_PARALLELISM", 4)
+
+        self.shutdown()
+        self.policy = HashingPolicy.from_config(app.config)
+        self.enabled = app.config["PASSWORD_HASH_POOL_ENABLED"]
+        self.queue_size = app.config["PASSWORD_HASH_POOL_QUEUE_SIZE"]
+        self.timeout = app.config["PASSWORD_HASH_TIMEOUT"]
+        self.resize(app.config["PASSWORD_HASH_POOL_WORKERS"] or available_cpus())
+        app.extensions["password_hasher"] = self
+
+    def resize(self, max_workers):
+        """
+        Set the pool size. Servers running several worker processes call
+        this after forking so the pools together fit the CPU quota.
+        """
+        self.shutdown()
+        self.max_workers = max(1, max_workers)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_size)
+
+    def generate(self, password):
+        """Return a password hash for ``password`` under the current policy"""
+        return self._timed("generate", hash_password, password, self.policy)
+
+    def check(self, pwhash, password):
+        """Return True if ``password`` matches ``pwhash``"""
+        return self._timed("check", verify_password, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if ``pwhash`` does not match the current policy"""
+        return self.policy.needs_rehash(pwhash)
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+            self._executor_pid = None
+
+    def _get_executor(self):
+        # The pool is created lazily and per process: a pool inherited
+        # across fork() (e.g. from a preloading master) is unusable.
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                # Imported here, with multiprocessing, to keep it out of
+                # cold start
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=_mp_context()
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _discard_executor(self, executor):
+        # A pool whose child died (e.g. OOM-killed) fails every later job;
+        # drop it so the next call builds a new one
+        with self._lock:
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self._executor_pid = None
+
+    def _timed(self, operation, func, *args):
+        started = time.perf_counter()
+        try:
+            return self._run(func, *args)
+        finally:
+            self.durations[operation].observe(time.perf_counter() - started)
+
+    def _run(self, func, *args):
+        if not self.enabled:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise HashingUnavailableError("Password hashing queue is full")
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(func, *args)
+        except BrokenExecutor:
+            self._slots.release()
+            self._discard_executor(executor)
+            raise HashingUnavailableError("Password hashing pool failed")
+        except Exception:
+            self._slots.release()
+            raise
+
+        # Release the slot when the job actually finishes, not when we stop
+        # waiting for it, so timed-out jobs still count against the bound.
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingUnavailableError("Password hashing timed out")
+        except BrokenExecutor:
+            self._discard_executor(executor)
+            raise HashingUnavailableError("Password hashing pool failed")
+
+
+def _mp_context():
+    import multiprocessing
+
+    # Forking a threaded web worker is unsafe; prefer a fresh interpreter.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
@@ -0,0 +1,87 @@
+import re
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+PROVIDERS = ("auto", "orjson", "stdlib")
+
+# Where a number can start, a float orjson writes differently from the
+# stdlib's repr(): 1e16 for 1e+16, 0.00005 for 5e-05
+_FLOAT_NOTATION = re.compile(rb"[:,\[]-?(?:\d+(?:\.\d+)?e|0\.0000)")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask's JSON provider with orjson doing the work, for ``jsonify`` and
+    ``request.get_json``.
+
+    Output is byte for byte what the stdlib provider writes: sorted keys,
+    compact separators, UUIDs as strings, and datetimes, dataclasses and
+    anything else orjson hands back going through the provider's
+    ``default`` (so datetimes stay HTTP dates). Whatever orjson would
+    write differently (non-ASCII text, which the stdlib escapes, floats
+    in exponent notation, integers over 64 bits, non-string keys) and
+    calls with extra json arguments fall back to the stdlib provider, as
+    do bodies orjson refuses to parse. NaN and infinity, which the stdlib
+    writes as invalid JSON, come out as null.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._option = (
+            orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if self.sort_keys:
+            self._option |= orjson.OPT_SORT_KEYS
+
+    def _encode(self, obj):
+        """Compact JSON bytes, or None where the stdlib's would differ"""
+        try:
+            data = orjson.dumps(obj, default=self.default, option=self._option)
+        except TypeError:
+            return None
+        if (self.ensure_ascii and not data.isascii()) or _FLOAT_NOTATION.search(data):
+            return None
+        return data
+
+    def dumps(self, obj, **kwargs):
+        if kwargs == {"separators": (",", ":")}:
+            data = self._encode(obj)
+            if data is not None:
+                return data.decode()
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # The stdlib parser accepts a little more (NaN, integers
+                # over 64 bits) and raises the errors callers expect
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if self.compact or (self.compact is None and not self._app.debug):
+            data = self._encode(self._prepare_response_obj(args, kwargs))
+            if data is not None:
+                return self._app.response_class(data + b"\n", mimetype=self.mimetype)
+        return super().response(*args, **kwargs)
+
+
+def init_json(app):
+    """
+    Install the JSON provider chosen by JSON_PROVIDER: orjson, stdlib, or
+    auto for orjson when it is installed.
+    """
+    app.config.setdefault("JSON_PROVIDER", "auto")
+    choice = app.config["JSON_PROVIDER"]
+    if choice not in PROVIDERS:
+        raise ValueError(f"Unsupported JSON_PROVIDER '{choice}'")
+    if choice == "orjson" and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson requires the orjson package")
+    if choice != "stdlib" and orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,465 @@
+import bisect
+import contextlib
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed upper bounds, reported cumulatively
+    (each bucket counts observations <= its bound) like Prometheus.
+    """
+
+    # Seconds; from a free pooled connection up to a pool timeout
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+
+        buckets, cumulative = {}, 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {"buckets": buckets, "count": cumulative, "sum": total}
+
+
+def family(name, kind, help, labelnames, samples):
+    """
+    A metric family as collected and stored between processes: ``samples``
+    is a list of ``[label values, value]``, where the value of a histogram
+    is a ``Histogram.snapshot()``.
+    """
+    return {
+        "name": name,
+        "type": kind,
+        "help": help,
+        "labelnames": list(labelnames),
+        "samples": [[list(labels), value] for labels, value in samples],
+    }
+
+
+class Counter:
+    """Thread-safe counter per combination of label values"""
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self):
+        with self._lock:
+            samples = list(self._values.items())
+        return family(self.name, "counter", self.help, self.labelnames, samples)
+
+
+class LabelledHistogram:
+    """A Histogram per combination of label values"""
+
+    def __init__(self, name, help, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        histogram = self._histograms.get(labels)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(labels, Histogram(self.buckets))
+        histogram.observe(value)
+
+    def collect(self):
+        with self._lock:
+            histograms = list(self._histograms.items())
+        samples = [(labels, histogram.snapshot()) for labels, histogram in histograms]
+        return family(self.name, "histogram", self.help, self.labelnames, samples)
+
+
+def merge(snapshots, include_gauges=True):
+    """
+    Add up lists of families collected in different processes. Counters
+    and histograms are summed; so are gauges (e.g. connections in use),
+    unless ``include_gauges`` is off.
+    """
+    merged = {}
+    for families in snapshots:
+        for item in families:
+            if item["type"] == "gauge" and not include_gauges:
+                continue
+            target = merged.setdefault(item["name"], dict(item, samples={}))
+            for labels, value in item["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif item["type"] == "histogram":
+                    target["samples"][key] = {
+                        "buckets": {
+                            bound: current["buckets"].get(bound, 0) + count
+                            for bound, count in value["buckets"].items()
+                        },
+                        "count": current["count"] + value["count"],
+                        "sum": current["sum"] + value["sum"],
+                    }
+                else:
+                    target["samples"][key] = current + value
+    return [
+        dict(
+            item, samples=[[list(key), value] for key, value in item["samples"].items()]
+        )
+        for item in merged.values()
+    ]
+
+
+def render(families):
+    """Families in the Prometheus text exposition format"""
+    lines = []
+    for item in sorted(families, key=lambda item: item["name"]):
+        name, labelnames = item["name"], item["labelnames"]
+        lines.append(f"# HELP {name} {item['help']}")
+        lines.append(f"# TYPE {name} {item['type']}")
+        for labels, value in sorted(item["samples"], key=lambda sample: sample[0]):
+            pairs = list(zip(labelnames, labels))
+            if item["type"] != "histogram":
+                lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                continue
+            for bound, count in value["buckets"].items():
+                lines.append(
+                    f"{name}_bucket{_labels(pairs + [('le', bound)])} {_number(count)}"
+                )
+            lines.append(f"{name}_sum{_labels(pairs)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(pairs)} {_number(value['count'])}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _number(value):
+    return repr(float(value))
+
+
+class MultiprocessStore:
+    """
+    Shares metrics between prefork workers through a directory: each
+    process writes its families to ``<pid>.json``, and a scrape of any
+    worker adds up all the files. Counts of exited workers are folded into
+    ``archive.json`` by ``mark_process_dead`` so totals never go backwards
+    when gunicorn recycles a worker; their gauges are dropped.
+    """
+
+    ARCHIVE = "archive.json"
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, families, pid=None):
+        path = os.path.join(self.directory, f"{pid or os.getpid()}.json")
+        self._dump(path, families)
+
+    def read(self):
+        # Shared lock: a worker being archived is counted exactly once
+        with self._locked(fcntl.LOCK_SH):
+            snapshots = [self._load(os.path.join(self.directory, self.ARCHIVE))]
+            for path in glob.glob(os.path.join(self.directory, "[0-9]*.json")):
+                pid = int(os.path.basename(path).split(".")[0])
+                families = self._load(path)
+                if not _alive(pid):
+                    families = merge([families], include_gauges=False)
+                snapshots.append(families)
+        return merge(snapshots)
+
+    def mark_process_dead(self, pid):
+        path = os.path.join(self.directory, f"{pid}.json")
+        with self._locked(fcntl.LOCK_EX):
+            archive = os.path.join(self.directory, self.ARCHIVE)
+            families = merge(
+                [self._load(archive), self._load(path)], include_gauges=False
+            )
+            self._dump(archive, families)
+            if os.path.exists(path):
+                os.remove(path)
+
+    @contextlib.contextmanager
+    def _locked(self, operation):
+        with open(os.path.join(self.directory, "archive.lock"), "a") as lock:
+            fcntl.flock(lock, operation)
+            yield
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            os.remove(path)
+
+    def _dump(self, path, families):
+        # Write then rename, so readers never see a partial file
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(families, file)
+        os.replace(temporary, path)
+
+    def _load(self, path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return []
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Metrics:
+    """
+    Prometheus metrics for the app: request latency, status and SQL
+    statement count per route, SQL statement durations per bind, password
+    hashing durations and pool state, served by ``/metrics``. With
+    SERVER_TIMING on, each response also reports its statement count and
+    database time in a ``Server-Timing`` header.
+
+    With METRICS_MULTIPROC_DIR set, every worker writes its numbers to that
+    directory every METRICS_FLUSH_INTERVAL seconds and a scrape adds up all
+    the workers' files, so it does not matter which worker answers.
+    """
+
+    def __init__(self, app=None):
+        self.requests = Counter(
+            "http_requests_total",
+            "HTTP requests by route and status.",
+            ("method", "route", "status"),
+        )
+        self.request_duration = LabelledHistogram(
+            "http_request_duration_seconds",
+            "HTTP request latency by route.",
+            ("method", "route"),
+        )
+        self.statement_duration = LabelledHistogram(
+            "db_statement_duration_seconds",
+            "SQL statement execution time by bind and statement type.",
+            ("bind", "operation"),
+        )
+        self.request_statements = LabelledHistogram(
+            "http_request_db_statements",
+            "SQL statements issued per request, by route.",
+            ("method", "route"),
+            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34),
+        )
+        self.enabled = False
+        self.server_timing = False
+        self.store = None
+        self.flush_interval = 0
+        self.app = None
+        self._flusher_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("METRICS_MULTIPROC_DIR", None)
+        app.config.setdefault("METRICS_FLUSH_INTERVAL", 5.0)
+        app.config.setdefault("SERVER_TIMING", False)
+
+        self.enabled = app.config["METRICS_ENABLED"]
+        directory = app.config["METRICS_MULTIPROC_DIR"]
+        self.store = MultiprocessStore(directory) if directory else None
+        self.flush_interval = app.config["METRICS_FLUSH_INTERVAL"]
+        self.server_timing = app.config["SERVER_TIMING"]
+        self.app = app
+        app.extensions["metrics"] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._start_timer)
+        app.after_request(self._record_request)
+        # Engines exist once db.init_app has run
+        from app import db
+
+        with app.app_context():
+            for key, engine in db.engines.items():
+                self.instrument_engine(engine, key or "default")
+
+    def instrument_engine(self, engine, bind):
+        from sqlalchemy import event
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+        def after_cursor_execute(conn, cursor, statement, *args):
+            elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+            self.statement_duration.observe(elapsed, bind, _operation(statement))
+            # Per-request totals; events run on the request's thread
+            if has_request_context() and "db_statements" in g:
+                g.db_statements += 1
+                g.db_time += elapsed
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+    def collect(self):
+        """This process's families; call within an app context"""
+        families = [
+            self.requests.collect(),
+            self.request_duration.collect(),
+            self.request_statements.collect(),
+            self.statement_duration.collect(),
+        ]
+        hasher = current_app.extensions.get("password_hasher")
+        if hasher is not None:
+            families.append(
+                family(
+                    "password_hash_duration_seconds",
+                    "histogram",
+                    "Password hash and verify time, including queueing.",
+                    ("operation",),
+                    [
+                        ((operation,), histogram.snapshot())
+                        for operation, histogram in hasher.durations.items()
+                    ],
+                )
+            )
+        pool_monitor = current_app.extensions.get("pool_monitor")
+        if pool_monitor is not None:
+            families.extend(_pool_families(pool_monitor.stats()))
+        return families
+
+    def render(self):
+        """Metrics of all workers (or this process) in the text format"""
+        families = self.collect()
+        if self.store is not None:
+            self.store.write(families)
+            families = self.store.read()
+        return render(families)
+
+    def flush(self):
+        if self.store is not None:
+            with self.app.app_context():
+                self.store.write(self.collect())
+
+    def _start_timer(self):
+        g.metrics_started = time.perf_counter()
+        g.db_statements, g.db_time = 0, 0.0
+        self._ensure_flusher()
+
+    def _record_request(self, response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        statements, db_time = g.pop("db_statements"), g.pop("db_time")
+
+        if request.endpoint != "metrics_endpoint":
+            route = request.url_rule.rule if request.url_rule else "<unmatched>"
+            self.requests.inc(request.method, route, str(response.status_code))
+            self.request_duration.observe(elapsed, request.method, route)
+            self.request_statements.observe(statements, request.method, route)
+        if self.server_timing:
+            response.headers.add(
+                "Server-Timing",
+                f'db;dur={db_time * 1000:.2f};desc="{statements} statements", '
+                f"app;dur={elapsed * 1000:.2f}",
+            )
+        return response
+
+    def _ensure_flusher(self):
+        # One background writer per process; a thread inherited across
+        # fork() does not run in the child
+        if self.store is None or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                self.app.logger.warning(f"Metrics flush failed: {e}")
+
+
+def _operation(statement):
+    words = statement.lstrip().split(None, 1)
+    operation = words[0].lower() if words else ""
+    return (
+        operation if operation in ("select", "insert", "update", "delete") else "other"
+    )
+
+
+def _pool_families(stats):
+    gauges = {"size": [], "in_use": [], "idle": [], "overflow": []}
+    events, waits = [], []
+    for bind, pool in stats.items():
+        for name, samples in gauges.items():
+            samples.append(((bind,), pool[name]))
+        for event in ("connects", "closes", "checkouts", "invalidations", "timeouts"):
+            events.append(((bind, event), pool[event]))
+        waits.append(((bind,), pool["checkout_wait_seconds"]))
+    return [
+        family(
+            f"db_pool_{name}", "gauge", f"Pool connections: {name}.", ("bind",), samples
+        )
+        for name, samples in gauges.items()
+    ] + [
+        family(
+            "db_pool_events_total",
+            "counter",
+            "Pool connection events.",
+            ("bind", "event"),
+            events,
+        ),
+        family(
+            "db_pool_checkout_wait_seconds",
+            "histogram",
+            "Time spent waiting for a pooled connection.",
+            ("bind",),
+            waits,
+        ),
+    ]
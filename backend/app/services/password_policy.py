@@ -0,0 +1,132 @@
+from marshmallow import ValidationError
+
+DIGIT, UPPER, LOWER, SPECIAL = 1, 2, 4, 8
+
+
+class PasswordPolicy:
+    """
+    Password strength rules shared by every schema that accepts a new
+    password, configured from the PASSWORD_* settings.
+
+    The rules are compiled into a character-class table for ASCII, so a
+    check is a single pass over the password's distinct characters that
+    collects every violation at once rather than one scan per rule.
+
+    With PASSWORD_BREACH_FILTER set, passwords found in that breached
+    password filter (see ``flask auth build-breach-filter``) are refused
+    as well.
+    """
+
+    DEFAULT_SPECIAL_CHARACTERS = '!@#$%^&*(),.?":{}|<>'
+
+    def __init__(self, app=None):
+        self.breach_filter = None
+        self.compile()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PASSWORD_MIN_LENGTH", 8)
+        app.config.setdefault("PASSWORD_REQUIRE_DIGIT", True)
+        app.config.setdefault("PASSWORD_REQUIRE_UPPERCASE", True)
+        app.config.setdefault("PASSWORD_REQUIRE_LOWERCASE", True)
+        app.config.setdefault(
+            "PASSWORD_SPECIAL_CHARACTERS", self.DEFAULT_SPECIAL_CHARACTERS
+        )
+        app.config.setdefault("PASSWORD_BREACH_FILTER", None)
+
+        self.compile(
+            min_length=app.config["PASSWORD_MIN_LENGTH"],
+            require_digit=app.config["PASSWORD_REQUIRE_DIGIT"],
+            require_uppercase=app.config["PASSWORD_REQUIRE_UPPERCASE"],
+            require_lowercase=app.config["PASSWORD_REQUIRE_LOWERCASE"],
+            special_characters=app.config["PASSWORD_SPECIAL_CHARACTERS"],
+        )
+        # Opened here so a preforking server's workers inherit the mapping
+        path = app.config["PASSWORD_BREACH_FILTER"]
+        if path:
+            from app.services.breach_filter import BreachFilter
+
+            self.breach_filter = BreachFilter(path)
+        else:
+            self.breach_filter = None
+        app.extensions["password_policy"] = self
+
+    def compile(
+        self,
+        min_length=8,
+        require_digit=True,
+        require_uppercase=True,
+        require_lowercase=True,
+        special_characters=DEFAULT_SPECIAL_CHARACTERS,
+    ):
+        """
+        Build the character table and the list of ``(class, message)``
+        rules. An empty ``special_characters`` drops the special character
+        rule.
+        """
+        self.min_length = min_length
+        self.special_characters = frozenset(special_characters)
+        self._ascii = {chr(code): self._classify(chr(code)) for code in range(128)}
+
+        rules = []
+        if require_digit:
+            rules.append((DIGIT, "Password must contain at least one number"))
+        if require_uppercase:
+            rules.append((UPPER, "Password must contain at least one uppercase letter"))
+        if require_lowercase:
+            rules.append((LOWER, "Password must contain at least one lowercase letter"))
+        if special_characters:
+            rules.append(
+                (
+                    SPECIAL,
+                    "Password must contain at least one special character "
+                    f"({special_characters})",
+                )
+            )
+        self._rules = rules
+        self._required = 0
+        for required, _ in rules:
+            self._required |= required
+
+    def _classify(self, char):
+        classes = 0
+        if char.isdigit():
+            classes |= DIGIT
+        if char.isupper():
+            classes |= UPPER
+        if char.islower():
+            classes |= LOWER
+        if char in self.special_characters:
+            classes |= SPECIAL
+        return classes
+
+    def violations(self, password):
+        """Messages for every rule ``password`` breaks, in rule order"""
+        errors = []
+        if len(password) < self.min_length:
+            errors.append(
+                f"Password must be at least {self.min_length} characters long"
+            )
+
+        found, required, ascii_classes = 0, self._required, self._ascii
+        for char in set(password):
+            classes = ascii_classes.get(char)
+            found |= self._classify(char) if classes is None else classes
+            if found & required == required:
+                break
+
+        errors.extend(
+            message for classes, message in self._rules if not found & classes
+        )
+        if self.breach_filter is not None and password in self.breach_filter:
+            errors.append(
+                "Password has appeared in a data breach; choose a different one"
+            )
+        return errors
+
+    def validate(self, password):
+        """Raise a ValidationError listing every violation"""
+        errors = self.violations(password)
+        if errors:
+            raise ValidationError(errors)
@@ -0,0 +1,46 @@
+import gc
+from functools import cached_property
+from flask_jwt_extended import create_access_token, decode_token
+from marshmallow import Schema
+from sqlalchemy.orm import configure_mappers
+
+
+def warm_up(app, freeze=True):
+    """
+    Do once, in a preforking server's master, the work each worker would
+    otherwise repeat on its first requests, so the resulting objects live
+    in pages the workers share copy-on-write.
+
+    With ``freeze``, everything allocated so far is then moved to the
+    garbage collector's permanent generation: collections in the workers
+    no longer write to those objects' headers and so stop un-sharing the
+    pages they sit on.
+    """
+    from app import db, schemas
+    from app.controllers.auth import AuthController
+    from app.views.auth import auth_controller
+
+    with app.app_context():
+        configure_mappers()
+
+        # Build the controller's shared schemas and generated dump
+        # functions, and one of every other schema to import and set up
+        # their fields and validators
+        for name, attribute in vars(AuthController).items():
+            if isinstance(attribute, cached_property):
+                getattr(auth_controller, name)
+        for schema in vars(schemas).values():
+            if isinstance(schema, type) and issubclass(schema, Schema):
+                schema()
+
+        app.json.dumps({"warm": True})
+        app.url_map.update()
+        decode_token(create_access_token(identity="warm-up"))
+
+        # Workers must not inherit open connections; each opens its own
+        for engine in db.engines.values():
+            engine.dispose()
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
@@ -0,0 +1,136 @@
+import logging
+import os
+import threading
+import time
+from sqlalchemy import text
+
+
+class ReadinessProbe:
+    """
+    Answers readiness probes from a cached result. A background thread per
+    process pings the database every READINESS_CHECK_INTERVAL seconds and
+    compares its schema revision with the migrations' head, so probes cost
+    a dict copy rather than a query each.
+
+    Not ready means the database did not answer, the schema is not at the
+    head (unless SCHEMA_CHECK is off), or the last check is older than
+    three intervals because the checker stopped.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.interval = 0
+        self._result = None
+        self._checker_pid = None
+        self._expected_heads = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("READINESS_CHECK_INTERVAL", 5.0)
+
+        self.app = app
+        self.interval = app.config["READINESS_CHECK_INTERVAL"]
+        with self._lock:
+            self._result = None
+            self._checker_pid = None
+            # Retires the checker thread started for a previous app
+            self._generation += 1
+        app.extensions["readiness"] = self
+
+    def status(self):
+        """``(ready, report)`` from the latest check"""
+        self._ensure_checker()
+        with self._lock:
+            result = self._result
+        if result is None:
+            # First probe in this process: check inline once
+            result = self.check()
+
+        report = dict(result)
+        report["age"] = round(time.monotonic() - result["checked_at"], 3)
+        del report["checked_at"]
+        if report["age"] > 3 * self.interval:
+            report["ready"] = False
+            report["error"] = "readiness check is stale"
+        return report["ready"], report
+
+    def check(self):
+        """Run the checks now and cache the result"""
+        with self.app.app_context():
+            database, schema = self._check_database()
+            result = {
+                "ready": database["ok"] and schema.get("ok", True),
+                "database": database,
+                "schema": schema,
+                "pool": self._pool_saturation(),
+                "checked_at": time.monotonic(),
+            }
+        with self._lock:
+            self._result = result
+        return result
+
+    def _check_database(self):
+        from app import db
+
+        started = time.perf_counter()
+        try:
+            with db.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                latency = time.perf_counter() - started
+                schema = self._check_schema(connection)
+        except Exception as e:
+            return {"ok": False, "error": str(e)}, {}
+        return {"ok": True, "latency_ms": round(latency * 1000, 2)}, schema
+
+    def _check_schema(self, connection):
+        if self.app.config.get("SCHEMA_CHECK", "fail") == "off":
+            return {}
+        from app.services.schema import current_heads, expected_heads
+
+        if self._expected_heads is None:
+            self._expected_heads = expected_heads()
+        current = current_heads(connection)
+        return {
+            "ok": current == self._expected_heads,
+            "current": sorted(current),
+            "expected": sorted(self._expected_heads),
+        }
+
+    def _pool_saturation(self):
+        """Share of each bind's connections (pool plus overflow) in use"""
+        pool_monitor = self.app.extensions.get("pool_monitor")
+        if pool_monitor is None:
+            return {}
+        saturation = {}
+        for bind, stats in pool_monitor.stats().items():
+            capacity = stats["size"] + max(0, stats["max_overflow"])
+            saturation[bind] = round(stats["in_use"] / capacity, 2) if capacity else 0
+        return saturation
+
+    def _ensure_checker(self):
+        # One checker thread per process; a thread inherited across fork()
+        # does not run in the child
+        if self._checker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._checker_pid == os.getpid():
+                return
+            self._checker_pid = os.getpid()
+            self._result = None
+            generation = self._generation
+        threading.Thread(
+            target=self._check_loop, args=(generation,), daemon=True
+        ).start()
+
+    def _check_loop(self, generation):
+        while True:
+            time.sleep(self.interval)
+            if generation != self._generation:
+                return
+            try:
+                self.check()
+            except Exception as e:
+                logging.warning(f"Readiness check failed: {e}")
@@ -0,0 +1,73 @@
+import logging
+import time
+from sqlalchemy.exc import OperationalError
+
+
+class SchemaVersionError(RuntimeError):
+    """The database is not at the migrations' head revision"""
+
+
+def expected_heads():
+    """Head revisions of the Alembic scripts in the migrations directory"""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    from app import MIGRATIONS_DIRECTORY
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIRECTORY)
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def current_heads(connection):
+    """Revisions recorded in the alembic_version table on ``connection``"""
+    from alembic.runtime.migration import MigrationContext
+
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def database_heads(app):
+    """Revisions recorded in the database's alembic_version table"""
+    from app import db
+
+    with app.app_context():
+        with db.engine.connect() as connection:
+            heads = current_heads(connection)
+        # Keep a preforking master from handing this connection to workers
+        db.engine.dispose()
+    return heads
+
+
+def check_schema(app):
+    """
+    Compare the database revision with the migrations' head once at boot.
+
+    SCHEMA_CHECK selects what happens on a mismatch: "fail" raises
+    SchemaVersionError right away, "wait" polls until the migrations have
+    run (e.g. from another pod or an init container) for up to
+    SCHEMA_CHECK_TIMEOUT seconds, and "off" skips the check.
+    """
+    mode = app.config.get("SCHEMA_CHECK", "fail")
+    if mode == "off":
+        return
+    if mode not in ("fail", "wait"):
+        raise ValueError(f"Unknown SCHEMA_CHECK mode: {mode!r}")
+
+    expected = expected_heads()
+    deadline = time.monotonic() + app.config.get("SCHEMA_CHECK_TIMEOUT", 120)
+    while True:
+        try:
+            current = database_heads(app)
+            problem = f"database is at {sorted(current) or 'no revision'}"
+        except OperationalError as e:
+            current = None
+            problem = f"database is unreachable ({e.orig})"
+
+        if current == expected:
+            return
+        if mode == "fail" or time.monotonic() >= deadline:
+            raise SchemaVersionError(
+                f"Expected schema revision {sorted(expected)}, but the "
+                f"{problem}; run `flask db upgrade`"
+            )
+        logging.warning(f"Waiting for schema revision {sorted(expected)}: {problem}")
+        time.sleep(app.config.get("SCHEMA_CHECK_INTERVAL", 2))
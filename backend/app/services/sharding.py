@@ -0,0 +1,342 @@
+import threading
+import time
+import zlib
+from sqlalchemy import func, select
+from app.services.errors import ServiceUnavailableError
+
+# Fixed number of hash buckets. Buckets, not users, are placed on shards,
+# so resharding moves whole buckets and never rehashes an id.
+SHARD_BUCKETS = 1024
+DEFAULT_PLACEMENT = "default"
+
+# Key in Session.info: bucket of the user the session works on
+SHARD_BUCKET = "shard_router.bucket"
+
+
+def shard_bucket(user_id):
+    """
+    Hash bucket of a user id (hex). Matches ``CRC32(id) % 1024`` on the
+    BINARY(16) column in MySQL.
+    """
+    return zlib.crc32(bytes.fromhex(user_id)) % SHARD_BUCKETS
+
+
+def is_sharded(mapper=None, clause=None):
+    """True if a statement targets a table marked ``info={"sharded": True}``"""
+    table = mapper.local_table if mapper is not None else getattr(clause, "table", None)
+    return table is not None and table.info.get("sharded", False)
+
+
+class ShardRoutingError(RuntimeError):
+    """A sharded table was used before shard_router.pin() chose a shard"""
+
+
+class ShardMovingError(ServiceUnavailableError):
+    """The user's bucket is being moved between shards; writes wait for it"""
+
+
+class ShardRouter:
+    """
+    Registers the SQLALCHEMY_SHARD_URIS as binds ``shard_0``, ``shard_1``,
+    ... and routes statements on sharded tables to the bind their hash
+    bucket is placed on.
+
+    Placement is read from the primary's shard_buckets table and cached
+    for SHARD_MAP_TTL seconds. Buckets without a row live in the primary's
+    own users table, so enabling sharding moves nothing until
+    ``flask shards rebalance`` runs. A session works on one user at a time:
+    ``pin`` picks the bucket for the rest of the session (one request).
+    """
+
+    def __init__(self, app=None):
+        self.shards = []
+        self.map_ttl = 0
+        self._map = {}
+        self._map_loaded_at = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SQLALCHEMY_SHARD_URIS", [])
+        app.config.setdefault("SHARD_MAP_TTL", 5.0)
+
+        # Must run before db.init_app, which creates an engine per bind
+        binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+        self.shards = []
+        for index, uri in enumerate(app.config["SQLALCHEMY_SHARD_URIS"]):
+            key = f"shard_{index}"
+            binds[key] = uri
+            self.shards.append(key)
+        app.config["SQLALCHEMY_BINDS"] = binds
+
+        self.map_ttl = app.config["SHARD_MAP_TTL"]
+        self.invalidate()
+        app.extensions["shard_router"] = self
+
+    def pin(self, user_id):
+        """Send this session's sharded statements to ``user_id``'s shard"""
+        if not self.shards:
+            return
+        from app import db
+
+        db.session().info[SHARD_BUCKET] = shard_bucket(user_id)
+
+    def engine_for(self, session, write=False):
+        """Engine holding the pinned user's bucket"""
+        bucket = session.info.get(SHARD_BUCKET)
+        if bucket is None:
+            raise ShardRoutingError(
+                "No user to route the statement to; call shard_router.pin() first"
+            )
+        placement, moving = self.placements(session._db).get(
+            bucket, (DEFAULT_PLACEMENT, False)
+        )
+        if write and moving:
+            raise ShardMovingError(f"Shard bucket {bucket} is being moved")
+        return self.engine(session._db, placement)
+
+    def engine(self, db, placement):
+        return db.engines[None if placement == DEFAULT_PLACEMENT else placement]
+
+    def placements(self, db):
+        """``{bucket: (placement, moving)}`` for buckets with a row"""
+        now = time.monotonic()
+        with self._lock:
+            if (
+                self._map_loaded_at is not None
+                and now - self._map_loaded_at < self.map_ttl
+            ):
+                return self._map
+
+        from app.models.shard import ShardBucket
+
+        table = ShardBucket.__table__
+        with db.engines[None].connect() as connection:
+            rows = connection.execute(
+                select(table.c.bucket, table.c.placement, table.c.moving)
+            ).all()
+        placements = {bucket: (placement, moving) for bucket, placement, moving in rows}
+        with self._lock:
+            self._map, self._map_loaded_at = placements, now
+        return placements
+
+    def invalidate(self):
+        """Reload the placement map on next use"""
+        with self._lock:
+            self._map = {}
+            self._map_loaded_at = None
+
+    def locate(self, db, statement):
+        """
+        First scalar ``statement`` returns on any node holding users; for
+        lookups by a column other than the id, such as a token digest.
+        """
+        placements = self.placements(db)
+        keys = {placement for placement, _ in placements.values()}
+        if len(placements) < SHARD_BUCKETS:
+            keys.add(DEFAULT_PLACEMENT)
+        # The primary first: it holds every user until buckets are moved
+        for key in sorted(keys, key=lambda key: key != DEFAULT_PLACEMENT):
+            value = db.session.execute(
+                statement, bind_arguments={"bind": self.engine(db, key)}
+            ).scalar()
+            if value is not None:
+                return value
+        return None
+
+    def has_default_placements(self, db):
+        """True while some buckets still live in the primary's users table"""
+        placements = self.placements(db)
+        return len(placements) < SHARD_BUCKETS or any(
+            placement == DEFAULT_PLACEMENT for placement, _ in placements.values()
+        )
+
+    def target(self, bucket):
+        """Shard a bucket belongs on when spread evenly over the shards"""
+        return self.shards[bucket % len(self.shards)]
+
+
+class ShardMaintenance:
+    """
+    Online resharding: creates the shard tables and lookup rows and moves
+    buckets between nodes in batches while the app keeps serving.
+
+    Buckets move in groups of ``group_size`` between the same two nodes. A
+    move copies the group's rows to the target, marks the buckets moving
+    (writes to their users get a 503), waits ``settle`` seconds for every
+    process to see that, copies again to pick up late writes, flips the
+    placement, waits for processes to switch over and finally deletes the
+    source rows. ``settle`` must exceed SHARD_MAP_TTL.
+    """
+
+    def __init__(
+        self, db, router, batch_size=1000, group_size=32, settle=None, log=print
+    ):
+        from app.models.user import User
+
+        self.db = db
+        self.router = router
+        self.batch_size = batch_size
+        self.group_size = group_size
+        self.settle = router.map_ttl + 1 if settle is None else settle
+        self.log = log
+        self.users = User.__table__
+
+    def create_tables(self):
+        for key in self.router.shards:
+            self.users.create(self.db.engines[key], checkfirst=True)
+
+    def init_buckets(self):
+        """Give every bucket a placement row; returns the number added"""
+        from app.models.shard import ShardBucket
+
+        table = ShardBucket.__table__
+        with self.db.engines[None].begin() as connection:
+            existing = set(connection.execute(select(table.c.bucket)).scalars())
+            missing = [
+                {"bucket": bucket, "placement": DEFAULT_PLACEMENT, "moving": False}
+                for bucket in range(SHARD_BUCKETS)
+                if bucket not in existing
+            ]
+            if missing:
+                connection.execute(table.insert(), missing)
+        return len(missing)
+
+    def backfill_lookups(self):
+        """
+        Add username and email lookup rows for users in the primary's
+        users table that registered before sharding was enabled.
+        """
+        from app.models.shard import EmailLookup, UsernameLookup
+
+        added = 0
+        for rows in self._batches(self.db.engines[None]):
+            with self.db.engines[None].begin() as connection:
+                for lookup, column in (
+                    (UsernameLookup.__table__, "username"),
+                    (EmailLookup.__table__, "email"),
+                ):
+                    known = set(
+                        connection.execute(
+                            select(lookup.c.user_id).where(
+                                lookup.c.user_id.in_([row["id"] for row in rows])
+                            )
+                        ).scalars()
+                    )
+                    missing = [
+                        {column: row[column], "user_id": row["id"]}
+                        for row in rows
+                        if row["id"] not in known
+                    ]
+                    if missing:
+                        connection.execute(lookup.insert(), missing)
+                        added += len(missing)
+        return added
+
+    def rebalance(self):
+        """Move every bucket not on its target shard; returns buckets moved"""
+        self.router.invalidate()
+        placements = self.router.placements(self.db)
+        moves = {}
+        for bucket in range(SHARD_BUCKETS):
+            source = placements.get(bucket, (DEFAULT_PLACEMENT, False))[0]
+            target = self.router.target(bucket)
+            if source != target:
+                moves.setdefault((source, target), []).append(bucket)
+
+        for (source, target), buckets in moves.items():
+            for start in range(0, len(buckets), self.group_size):
+                self.move_buckets(
+                    buckets[start : start + self.group_size], source, target
+                )
+        return sum(len(buckets) for buckets in moves.values())
+
+    def move_buckets(self, buckets, source, target):
+        source_engine = self.router.engine(self.db, source)
+        target_engine = self.router.engine(self.db, target)
+
+        copied = self._copy(buckets, source_engine, target_engine)
+        self._set_buckets(buckets, moving=True)
+        time.sleep(self.settle)
+        copied += self._copy(buckets, source_engine, target_engine)
+        self._set_buckets(buckets, placement=target, moving=False)
+        time.sleep(self.settle)
+        deleted = self._delete(buckets, source_engine)
+        self.log(
+            f"buckets {buckets[0]}..{buckets[-1]} ({len(buckets)}): "
+            f"{source} -> {target}, {copied} rows copied, {deleted} deleted"
+        )
+
+    def status(self):
+        """Bucket and user counts per node"""
+        placements = self.router.placements(self.db)
+        status = {}
+        for key in [DEFAULT_PLACEMENT] + self.router.shards:
+            with self.router.engine(self.db, key).connect() as connection:
+                users = connection.execute(
+                    select(func.count()).select_from(self.users)
+                ).scalar()
+            buckets = sum(
+                1
+                for bucket in range(SHARD_BUCKETS)
+                if placements.get(bucket, (DEFAULT_PLACEMENT, False))[0] == key
+            )
+            status[key] = {"buckets": buckets, "users": users}
+        status["moving"] = sorted(
+            bucket for bucket, (_, moving) in placements.items() if moving
+        )
+        return status
+
+    def _set_buckets(self, buckets, **values):
+        from app.models.shard import ShardBucket
+
+        table = ShardBucket.__table__
+        with self.db.engines[None].begin() as connection:
+            connection.execute(
+                table.update().where(table.c.bucket.in_(buckets)).values(**values)
+            )
+        self.router.invalidate()
+
+    def _batches(self, engine, *criteria):
+        """Rows of ``users`` matching ``criteria`` in id order, a batch at a time"""
+        users = self.users
+        last_id = None
+        while True:
+            query = (
+                select(users)
+                .where(*criteria)
+                .order_by(users.c.id)
+                .limit(self.batch_size)
+            )
+            if last_id is not None:
+                query = query.where(users.c.id > last_id)
+            with engine.connect() as connection:
+                rows = connection.execute(query).mappings().all()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
+
+    def _copy(self, buckets, source, target):
+        """Upsert the buckets' rows from ``source`` into ``target``"""
+        users = self.users
+        copied = 0
+        for rows in self._batches(source, users.c.shard_bucket.in_(buckets)):
+            ids = [row["id"] for row in rows]
+            with target.begin() as connection:
+                connection.execute(users.delete().where(users.c.id.in_(ids)))
+                connection.execute(users.insert(), [dict(row) for row in rows])
+            copied += len(rows)
+        return copied
+
+    def _delete(self, buckets, source):
+        users = self.users
+        deleted = 0
+        for rows in self._batches(source, users.c.shard_bucket.in_(buckets)):
+            with source.begin() as connection:
+                connection.execute(
+                    users.delete().where(users.c.id.in_([row["id"] for row in rows]))
+                )
+            deleted += len(rows)
+        return deleted
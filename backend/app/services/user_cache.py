@@ -0,0 +1,239 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class UserCache:
+    """
+    Per-process LRU cache of lightweight user profile snapshots with a TTL.
+
+    Writers call ``invalidate`` after committing a change to a field in
+    the snapshot, which is the UserSchema dump (username, email, role,
+    is_active and so on). Password changes, resets and email verification
+    write no such field and do not invalidate; a field added to the
+    snapshot must be invalidated by every path that writes it.
+
+    With an invalidation channel configured, the invalidation is also
+    broadcast to the other processes and replicas; without one, the TTL
+    bounds how long another process can serve a stale snapshot.
+
+    The cache also remembers the latest profile version announced for a
+    user, or read from the database, so profile snapshots carried in
+    older access tokens can be told apart from current ones.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.max_size = 0
+        self.ttl = 0
+        self.channel = None
+        self._entries = OrderedDict()
+        self._versions = OrderedDict()
+        self.version_ttl = 0
+        self._lock = threading.Lock()
+        self._reset_counters()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("USER_CACHE_ENABLED", True)
+        app.config.setdefault("USER_CACHE_SIZE", 10000)
+        app.config.setdefault("USER_CACHE_TTL", 60)
+        app.config.setdefault("USER_CACHE_INVALIDATION_URL", None)
+        app.config.setdefault("JWT_PROFILE_VERSION_TTL", 86400)
+        app.config.setdefault("JWT_PROFILE_CLAIMS", False)
+
+        self.enabled = app.config["USER_CACHE_ENABLED"]
+        self.max_size = app.config["USER_CACHE_SIZE"]
+        self.ttl = app.config["USER_CACHE_TTL"]
+        # Remember bumps for as long as a token minted before them may live
+        self.version_ttl = app.config["JWT_PROFILE_VERSION_TTL"]
+        self.clear()
+
+        if self.channel is not None:
+            self.channel.close()
+        url = app.config["USER_CACHE_INVALIDATION_URL"]
+        # Profile claims are only checked against versions this process
+        # knows; without broadcasts it would not hear of other processes'
+        # profile changes
+        if app.config["JWT_PROFILE_CLAIMS"] and not url:
+            raise RuntimeError(
+                "JWT_PROFILE_CLAIMS requires USER_CACHE_INVALIDATION_URL"
+            )
+        self.channel = RedisInvalidationChannel(url) if url else None
+        app.extensions["user_cache"] = self
+
+    def get(self, user_id):
+        """Return a copy of the cached snapshot, or None on a miss"""
+        if not self.enabled:
+            return None
+        self._listen()
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return dict(snapshot)
+
+    def put(self, user_id, snapshot):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, dict(snapshot))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id, profile_version=None):
+        """
+        Drop ``user_id`` here and, if configured, in every other process.
+        Pass the new ``profile_version`` when the profile itself changed.
+        """
+        self._discard(user_id, profile_version)
+        if self.channel is not None:
+            self._listen()
+            try:
+                self.channel.publish(user_id, profile_version)
+            except Exception as e:
+                logging.warning(f"User cache invalidation broadcast failed: {e}")
+
+    def profile_version(self, user_id):
+        """Latest profile version known for ``user_id``, or None"""
+        self._listen()
+        with self._lock:
+            entry = self._versions.get(user_id)
+            if entry is None:
+                return None
+            expires_at, version = entry
+            if expires_at <= time.monotonic():
+                del self._versions[user_id]
+                return None
+            return version
+
+    def remember_version(self, user_id, profile_version):
+        """
+        Record a profile version read from the database, for USER_CACHE_TTL
+        seconds. A version announced in the meantime is kept instead.
+        """
+        with self._lock:
+            if user_id in self._versions:
+                return
+            self._versions[user_id] = (time.monotonic() + self.ttl, profile_version)
+            self._trim_versions()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._reset_counters()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _discard(self, user_id, profile_version=None):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.invalidations += 1
+            if profile_version is not None:
+                self._versions[user_id] = (
+                    time.monotonic() + self.version_ttl,
+                    profile_version,
+                )
+                self._versions.move_to_end(user_id)
+                self._trim_versions()
+
+    def _trim_versions(self):
+        while len(self._versions) > self.max_size:
+            self._versions.popitem(last=False)
+
+    def _listen(self):
+        if self.channel is not None:
+            self.channel.subscribe(self._discard)
+
+    def _reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+
+class RedisInvalidationChannel:
+    """
+    Broadcasts invalidated user ids over Redis pub/sub. Each process runs
+    one listener thread, started lazily so it is created after any fork.
+    Messages published by this process are ignored on receipt.
+    """
+
+    CHANNEL = "cloudstore:user-cache:invalidate"
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:  # pragma: no cover
+            raise RuntimeError(
+                "USER_CACHE_INVALIDATION_URL requires the redis package"
+            ) from None
+        self._client = redis.Redis.from_url(url)
+        self._origin = uuid.uuid4().hex
+        self._listener_pid = None
+        self._pubsub = None
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, profile_version=None):
+        version = "" if profile_version is None else profile_version
+        self._client.publish(self.CHANNEL, f"{self._origin}:{user_id}:{version}")
+
+    def subscribe(self, callback):
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            # A fork copies the id; give each process its own origin
+            self._origin = uuid.uuid4().hex
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(self.CHANNEL)
+            threading.Thread(
+                target=self._run, args=(self._pubsub, callback), daemon=True
+            ).start()
+            self._listener_pid = os.getpid()
+
+    def close(self):
+        if self._pubsub is not None and self._listener_pid == os.getpid():
+            self._pubsub.close()
+        self._pubsub = None
+        self._listener_pid = None
+
+    def _run(self, pubsub, callback):
+        try:
+            for message in pubsub.listen():
+                origin, user_id, version = message["data"].decode().split(":")
+                if origin != self._origin:
+                    callback(user_id, int(version) if version else None)
+        except Exception as e:
+            # Entries still expire through the TTL; resubscribe on next use
+            logging.warning(f"User cache invalidation listener stopped: {e}")
+            self._listener_pid = None
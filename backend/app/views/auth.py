@@ -1,75 +1,89 @@
-from flask import Blueprint, request, jsonify
-from marshmallow import ValidationError
-from flask_jwt_extended import jwt_required, get_jwt_identity # type: ignore
+from flask import Blueprint, request, jsonify, g
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt # type: ignore
+from app import admission
 from app.controllers.auth import AuthController
-from app.schemas.auth import LoginSchema, RegisterSchema, PasswordResetSchema, PasswordChangeSchema
+from app.views.parsing import json_body
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/v1/auth')
 auth_controller = AuthController()
 
+# Routes that hash or verify a password and share the "hash" budget
+HASH_HEAVY_ENDPOINTS = {
+    'auth.register',
+    'auth.login',
+    'auth.reset_password',
+    'auth.change_password',
+}
+
+@auth_bp.before_request
+def admit_request():
+    budget = 'hash' if request.endpoint in HASH_HEAVY_ENDPOINTS else 'default'
+    if not admission.admit(budget):
+        return jsonify({
+            'message': 'Service busy',
+            'errors': {'_error': ['Too many concurrent requests, retry later']}
+        }), 503
+    g.admission_budget = budget
+
+@auth_bp.teardown_request
+def release_request(exc):
+    budget = g.pop('admission_budget', None)
+    if budget is not None:
+        admission.release(budget)
+
+@auth_bp.after_request
+def add_retry_after(response):
+    if response.status_code == 503:
+        response.headers.setdefault('Retry-After', str(admission.retry_after))
+    return response
+
 @auth_bp.route('/register', methods=['POST'])
-def register():
-    try:
-        schema = RegisterSchema()
-        data = schema.load(request.get_json())
-        response, status_code = auth_controller.register(data)
-        return jsonify(response), status_code
-    except ValidationError as e:
-        return jsonify({'message': 'Validation error', 'errors': e.messages}), 400
+@json_body(lambda: auth_controller.register_schema)
+def register(data):
+    response, status_code = auth_controller.register(data)
+    return jsonify(response), status_code
 
 @auth_bp.route('/login', methods=['POST'])
-def login():
-    try:
-        schema = LoginSchema()
-        data = schema.load(request.get_json())
-        response, status_code = auth_controller.login(data)
-        return jsonify(response), status_code
-    except ValidationError as e:
-        return jsonify({'message': 'Validation error', 'errors': e.messages}), 400
+@json_body(lambda: auth_controller.login_schema)
+def login(data):
+    response, status_code = auth_controller.login(data)
+    return jsonify(response), status_code
 
 @auth_bp.route('/reset-password', methods=['POST'])
-def reset_password():
-    try:
-        schema = PasswordResetSchema()
-        data = schema.load(request.get_json())
-        response, status_code = auth_controller.reset_password(
-            data['token'], 
-            data['new_password']
-        )
-        return jsonify(response), status_code
-    except ValidationError as e:
-        return jsonify({'message': 'Validation error', 'errors': e.messages}), 400
+@json_body(lambda: auth_controller.password_reset_schema)
+def reset_password(data):
+    response, status_code = auth_controller.reset_password(
+        data['token'], 
+        data['new_password']
+    )
+    return jsonify(response), status_code
 
 @auth_bp.route('/change-password', methods=['POST'])
 @jwt_required()
-def change_password():
-    try:
-        schema = PasswordChangeSchema()
-        data = schema.load(request.get_json())
-        user_id = get_jwt_identity()
-        response, status_code = auth_controller.change_password(
-            user_id,
-            data['current_password'],
-            data['new_password']
-        )
-        return jsonify(response), status_code
-    except ValidationError as e:
-        return jsonify({'message': 'Validation error', 'errors': e.messages}), 400
+@json_body(lambda: auth_controller.password_change_schema)
+def change_password(data):
+    user_id = get_jwt_identity()
+    response, status_code = auth_controller.change_password(
+        user_id,
+        data['current_password'],
+        data['new_password']
+    )
+    return jsonify(response), status_code
 
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     user_id = get_jwt_identity()
-    response, status_code = auth_controller.get_profile(user_id)
+    response, status_code = auth_controller.get_profile(
+        user_id,
+        get_jwt().get('profile')
+    )
     return jsonify(response), status_code
 
 @auth_bp.route('/profile', methods=['PUT'])
 @jwt_required()
-def update_profile():
-    try:
-        user_id = get_jwt_identity()
-        data = request.get_json()
-        response, status_code = auth_controller.update_profile(user_id, data)
-        return jsonify(response), status_code
-    except ValidationError as e:
-        return jsonify({'message': 'Validation error', 'errors': e.messages}), 400
\ No newline at end of file
+@json_body(lambda: auth_controller.profile_update_schema)
+def update_profile(data):
+    user_id = get_jwt_identity()
+    response, status_code = auth_controller.update_profile(user_id, data)
+    return jsonify(response), status_code
@@ -0,0 +1,67 @@
+import functools
+from flask import current_app, jsonify, request
+from marshmallow import ValidationError
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+
+def error_response(message, error, status_code):
+    return jsonify({'message': message, 'errors': {'_error': [error]}}), status_code
+
+
+def load_json(schema):
+    """
+    Load the request's JSON body with ``schema``. Returns ``(data, None)``
+    or ``(None, response)`` for a body refused before or by the schema.
+
+    Bodies over AUTH_MAX_BODY_SIZE bytes, of another content type, that
+    are not valid JSON or not a JSON object are refused without reaching
+    marshmallow.
+    """
+    limit = current_app.config['AUTH_MAX_BODY_SIZE']
+    # Checked against Content-Length up front and enforced while reading
+    # bodies sent without one
+    request.max_content_length = limit
+    if not request.is_json:
+        return None, error_response(
+            'Unsupported media type', 'Expected an application/json body', 415
+        )
+    try:
+        body = request.get_json()
+    except RequestEntityTooLarge:
+        return None, error_response(
+            'Request body too large', f'The limit is {limit} bytes', 413
+        )
+    except BadRequest:
+        return None, error_response('Malformed request body', 'Invalid JSON', 400)
+    if not isinstance(body, dict):
+        return None, error_response(
+            'Malformed request body', 'Expected a JSON object', 400
+        )
+
+    try:
+        return schema.load(body), None
+    except ValidationError as e:
+        return None, (
+            jsonify({'message': 'Validation error', 'errors': e.messages}), 400
+        )
+
+
+def json_body(get_schema):
+    """
+    Pass the request's JSON body, loaded by the schema ``get_schema()``
+    returns, to the view as its first argument; refused bodies get an
+    error response instead. Schemas are shared between requests and
+    threads, which is safe as loading keeps no state on the schema.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            data, response = load_json(get_schema())
+            if response is not None:
+                return response
+            return view(data, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,76 @@
+"""
+JSON encode and decode of typical auth payloads: stdlib vs. orjson provider.
+
+Times ``app.json.response`` (what ``jsonify`` calls) for a login
+response, a profile and a validation error, and ``app.json.loads`` for
+a registration body, through Flask's stdlib provider and the orjson one,
+after checking both produce the same bytes.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:// python -m benchmarks.bench_json --number 100000
+"""
+import argparse
+import timeit
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from app.services.json_provider import OrjsonProvider
+
+USER = {
+    "id": "0190a1b2c3d47e5f8a9b0c1d2e3f4a5b",
+    "username": "bench_user",
+    "email": "bench_user@example.com",
+    "created_at": "2026-01-02T03:04:05",
+    "is_active": True,
+    "role": "user",
+}
+
+RESPONSES = {
+    "login": {
+        "message": "Login successful",
+        "token": {"access_token": "x" * 300, "token_type": "bearer"},
+        "user": USER,
+    },
+    "profile": USER,
+    "error": {
+        "message": "Validation error",
+        "errors": {"password": ["Password must contain at least one number"]},
+    },
+}
+
+REGISTER_BODY = (
+    b'{"username": "bench_user", "email": "bench_user@example.com", '
+    b'"password": "BenchPass123@", "confirm_password": "BenchPass123@"}'
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    stdlib, fast = DefaultJSONProvider(app), OrjsonProvider(app)
+
+    print(f"{'payload':<16}{'stdlib us':>11}{'orjson us':>11}{'speedup':>9}")
+    with app.app_context():
+        cases = {
+            f"{name} (dump)": (
+                lambda provider, payload=payload: provider.response(payload)
+            )
+            for name, payload in RESPONSES.items()
+        }
+        cases["register (load)"] = lambda provider: provider.loads(REGISTER_BODY)
+        for name, payload in RESPONSES.items():
+            assert fast.response(payload).data == stdlib.response(payload).data
+
+        for name, call in cases.items():
+            slow = timeit.timeit(lambda: call(stdlib), number=args.number)
+            quick = timeit.timeit(lambda: call(fast), number=args.number)
+            print(
+                f"{name:<16}{slow / args.number * 1e6:>11.2f}"
+                f"{quick / args.number * 1e6:>11.2f}{slow / quick:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Password rule checks: the compiled policy vs. the per-schema validators.
+
+The schemas used to check each rule with its own ``any(...)`` scan of the
+password, five passes in all. The policy makes one pass over the distinct
+characters and stops once every required class is seen. Both are timed
+on a valid password, a failing one and a long passphrase.
+
+Usage (from backend/):
+    python -m benchmarks.bench_password_policy --number 200000
+"""
+import argparse
+import timeit
+from app.services.password_policy import PasswordPolicy
+
+SPECIAL_CHARS = '!@#$%^&*(),.?":{}|<>'
+
+PASSWORDS = {
+    "valid": "TestPass123@",
+    "short": "short",
+    "passphrase": "correct horse battery staple " * 4 + "Z9!",
+}
+
+
+def legacy(value):
+    """The validator the schemas used to carry a copy of"""
+    errors = []
+    if len(value) < 8:
+        errors.append("Password must be at least 8 characters long")
+    if not any(char.isdigit() for char in value):
+        errors.append("Password must contain at least one number")
+    if not any(char.isupper() for char in value):
+        errors.append("Password must contain at least one uppercase letter")
+    if not any(char.islower() for char in value):
+        errors.append("Password must contain at least one lowercase letter")
+    if not any(char in SPECIAL_CHARS for char in value):
+        errors.append(
+            f"Password must contain at least one special character ({SPECIAL_CHARS})"
+        )
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200_000)
+    args = parser.parse_args()
+
+    policy = PasswordPolicy()
+    print(f"{'password':<12}{'legacy us':>11}{'policy us':>11}{'speedup':>9}")
+    for name, password in PASSWORDS.items():
+        assert legacy(password) == policy.violations(password), name
+        old = timeit.timeit(lambda: legacy(password), number=args.number)
+        new = timeit.timeit(lambda: policy.violations(password), number=args.number)
+        print(
+            f"{name:<12}{old / args.number * 1e6:>11.2f}"
+            f"{new / args.number * 1e6:>11.2f}{old / new:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
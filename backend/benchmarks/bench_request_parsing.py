@@ -0,0 +1,102 @@
+"""
+Per-request cost of parsing auth request bodies: per-request vs. shared schemas.
+
+The views used to build a new schema for every request and load
+``request.get_json()`` with it; they now load through ``load_json`` with
+a schema built once. For each endpoint's body this reports the time and
+the peak memory allocated (tracemalloc) per parse, both ways.
+
+Usage (from backend/):
+    DATABASE_URL=sqlite:// python -m benchmarks.bench_request_parsing
+"""
+import argparse
+import time
+import tracemalloc
+from flask import request
+from app import create_app
+from app.schemas.auth import (
+    LoginSchema,
+    PasswordChangeSchema,
+    ProfileUpdateSchema,
+    RegisterSchema,
+)
+from app.views.parsing import load_json
+
+PASSWORD = "BenchPass123@"
+
+CASES = {
+    "register": (
+        RegisterSchema,
+        {
+            "username": "bench_user",
+            "email": "bench_user@example.com",
+            "password": PASSWORD,
+            "confirm_password": PASSWORD,
+        },
+    ),
+    "login": (LoginSchema, {"username": "bench_user", "password": PASSWORD}),
+    "change_password": (
+        PasswordChangeSchema,
+        {
+            "current_password": PASSWORD,
+            "new_password": "NewBench456@",
+            "confirm_password": "NewBench456@",
+        },
+    ),
+    "profile_put": (ProfileUpdateSchema, {"email": "renamed@example.com"}),
+}
+
+
+def per_request(schema_class):
+    schema = schema_class()
+    return schema.load(request.get_json())
+
+
+def shared(schema):
+    data, response = load_json(schema)
+    assert response is None
+    return data
+
+
+def measure(app, payload, parse, number):
+    """``(microseconds, peak KiB)`` per parse"""
+    elapsed, peak = 0.0, 0
+    tracemalloc.start()
+    for _ in range(number):
+        with app.test_request_context(method="POST", json=payload):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            parse()
+            peak += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    for _ in range(number):
+        with app.test_request_context(method="POST", json=payload):
+            started = time.perf_counter()
+            parse()
+            elapsed += time.perf_counter() - started
+    return elapsed / number * 1e6, peak / number / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    print(
+        f"{'endpoint':<17}{'before us':>11}{'after us':>10}"
+        f"{'before KiB':>12}{'after KiB':>11}"
+    )
+    for name, (schema_class, payload) in CASES.items():
+        schema = schema_class()
+        before = measure(app, payload, lambda: per_request(schema_class), args.number)
+        after = measure(app, payload, lambda: shared(schema), args.number)
+        print(
+            f"{name:<17}{before[0]:>11.1f}{after[0]:>10.1f}"
+            f"{before[1]:>12.1f}{after[1]:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
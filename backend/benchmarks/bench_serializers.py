@@ -0,0 +1,61 @@
+"""
+Dumps per second of the auth response schemas: marshmallow vs. compiled.
+
+Times AuthSuccessSchema (a login response with its token and nested user)
+and UserSchema (the GET /profile body) through ``schema.dump`` and
+through the function ``compile_dump`` generates for the schema, after
+checking both produce the same JSON.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serializers --number 100000
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timezone
+from app.models.user import User
+from app.schemas.auth import AuthSuccessSchema
+from app.schemas.compiled import compile_dump
+from app.schemas.user import UserSchema
+
+
+def make_user():
+    user = User(username="bench_user", email="bench_user@example.com")
+    user.created_at = datetime.now(timezone.utc)
+    user.is_active = True
+    user.role = "user"
+    return user
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    user = make_user()
+    cases = {
+        "auth_success": (
+            AuthSuccessSchema(),
+            {
+                "message": "Login successful",
+                "token": {"access_token": "x" * 300, "token_type": "bearer"},
+                "user": user,
+            },
+        ),
+        "user": (UserSchema(), user),
+    }
+
+    print(f"{'schema':<14}{'marshmallow/s':>15}{'compiled/s':>13}{'speedup':>9}")
+    for name, (schema, obj) in cases.items():
+        dump = compile_dump(schema)
+        assert json.dumps(dump(obj)) == json.dumps(schema.dump(obj)), name
+        generic = timeit.timeit(lambda: schema.dump(obj), number=args.number)
+        compiled = timeit.timeit(lambda: dump(obj), number=args.number)
+        print(
+            f"{name:<14}{args.number / generic:>15,.0f}"
+            f"{args.number / compiled:>13,.0f}{generic / compiled:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
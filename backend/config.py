@@ -2,23 +2,182 @@ import os
 from datetime import timedelta
 
 
+def engine_options(database_uri, pool_size, max_overflow):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS, overridable with DB_POOL_* env vars. Pool
+    sizing applies per worker process and only to server databases.
+    """
+    options = {
+        # Test each connection on checkout and replace ones MySQL dropped
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true") == "true",
+        # Retire connections before MySQL's wait_timeout or an idle proxy
+        # closes them
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    if database_uri and not database_uri.startswith("sqlite"):
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", pool_size)),
+            max_overflow=int(os.getenv("DB_POOL_MAX_OVERFLOW", max_overflow)),
+            # Fail a request rather than hold a worker thread indefinitely
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+        )
+    return options
+
+
 class BaseConfig:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-key")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    # Embed a versioned profile snapshot in access tokens so GET /profile
+    # can answer from the token while its version is current. Each
+    # process learns versions from USER_CACHE_INVALIDATION_URL broadcasts
+    # or reads them from the database for USER_CACHE_TTL seconds; tokens
+    # minted before a profile change fall back to the database. The URL
+    # is required, so profile claims need a Redis server (docker-compose
+    # and the k8s manifests run one).
+    JWT_PROFILE_CLAIMS = os.getenv("JWT_PROFILE_CLAIMS", "false") == "true"
+    JWT_PROFILE_VERSION_TTL = int(os.getenv("JWT_PROFILE_VERSION_TTL", "86400"))
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+    # Sized for a gunicorn worker's threads (GUNICORN_THREADS)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        SQLALCHEMY_DATABASE_URI, pool_size=4, max_overflow=4
+    )
+
+    # Read replicas, as comma-separated URLs. Lookups that tolerate
+    # replication lag (login, profile) go to a replica at most
+    # REPLICA_MAX_LAG seconds behind, checked every
+    # REPLICA_LAG_CHECK_INTERVAL seconds; a request stays on the primary
+    # after its first write.
+    SQLALCHEMY_REPLICA_URIS = [
+        url for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url
+    ]
+    REPLICA_MAX_LAG = float(os.getenv("REPLICA_MAX_LAG", "5"))
+    REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "5"))
+
+    # Shards for the users table, as comma-separated URLs. Users are placed
+    # by hash bucket; the primary keeps the bucket map (re-read every
+    # SHARD_MAP_TTL seconds) and the global username/email lookups. See
+    # `flask shards --help` for setting up and moving buckets.
+    SQLALCHEMY_SHARD_URIS = [
+        url for url in os.getenv("DATABASE_SHARD_URLS", "").split(",") if url
+    ]
+    SHARD_MAP_TTL = float(os.getenv("SHARD_MAP_TTL", "5"))
+
+    # JSON for responses and request bodies: orjson, stdlib, or auto for
+    # orjson when installed. Output is the same either way.
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto")
+
+    # Prometheus metrics on /metrics. Under a prefork server, point
+    # PROMETHEUS_MULTIPROC_DIR at a directory shared by the workers (the
+    # gunicorn config does) so a scrape adds up every worker's numbers.
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true") == "true"
+    METRICS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+    # Report per-request SQL statement count and time in a Server-Timing
+    # response header; off in production, where it would leak internals
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "true") == "true"
+
+    # The schema is only created by migrations (`flask db upgrade`). At
+    # boot the server checks the database is at the migrations' head and
+    # either fails fast or waits up to SCHEMA_CHECK_TIMEOUT seconds for
+    # the migrations to run elsewhere: fail, wait or off.
+    SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "fail")
+    SCHEMA_CHECK_TIMEOUT = float(os.getenv("SCHEMA_CHECK_TIMEOUT", "120"))
+    SCHEMA_CHECK_INTERVAL = float(os.getenv("SCHEMA_CHECK_INTERVAL", "2"))
+    # /readyz answers from a check of the database and its schema revision
+    # run in the background every READINESS_CHECK_INTERVAL seconds
+    READINESS_CHECK_INTERVAL = float(os.getenv("READINESS_CHECK_INTERVAL", "5"))
+
+    # Password strength rules for new passwords. An empty
+    # PASSWORD_SPECIAL_CHARACTERS drops the special character rule.
+    PASSWORD_MIN_LENGTH = int(os.getenv("PASSWORD_MIN_LENGTH", "8"))
+    PASSWORD_REQUIRE_DIGIT = os.getenv("PASSWORD_REQUIRE_DIGIT", "true") == "true"
+    PASSWORD_REQUIRE_UPPERCASE = (
+        os.getenv("PASSWORD_REQUIRE_UPPERCASE", "true") == "true"
+    )
+    PASSWORD_REQUIRE_LOWERCASE = (
+        os.getenv("PASSWORD_REQUIRE_LOWERCASE", "true") == "true"
+    )
+    PASSWORD_SPECIAL_CHARACTERS = os.getenv(
+        "PASSWORD_SPECIAL_CHARACTERS", '!@#$%^&*(),.?":{}|<>'
+    )
+    # Bloom filter of breached passwords built by `flask auth
+    # build-breach-filter`; new passwords found in it are refused
+    PASSWORD_BREACH_FILTER = os.getenv("PASSWORD_BREACH_FILTER")
+
+    # Password hashing runs in a process pool so it does not hold the GIL
+    # of the web worker. 0 workers means "size from the container CPU quota".
+    PASSWORD_HASH_POOL_ENABLED = os.getenv("PASSWORD_HASH_POOL", "true") == "true"
+    PASSWORD_HASH_POOL_WORKERS = int(os.getenv("PASSWORD_HASH_POOL_WORKERS", "0"))
+    PASSWORD_HASH_POOL_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "5"))
+
+    # Password hashing policy: pbkdf2, scrypt or argon2id (argon2-cffi).
+    # Use `flask auth calibrate-hash` to pick costs for a target verify time;
+    # stored hashes made with other settings are upgraded on login.
+    PASSWORD_HASH_ALGORITHM = os.getenv("PASSWORD_HASH_ALGORITHM", "scrypt")
+    PASSWORD_HASH_PBKDF2_ITERATIONS = int(
+        os.getenv("PASSWORD_HASH_PBKDF2_ITERATIONS", "600000")
+    )
+    PASSWORD_HASH_SCRYPT_N = int(os.getenv("PASSWORD_HASH_SCRYPT_N", "32768"))
+    PASSWORD_HASH_SCRYPT_R = int(os.getenv("PASSWORD_HASH_SCRYPT_R", "8"))
+    PASSWORD_HASH_SCRYPT_P = int(os.getenv("PASSWORD_HASH_SCRYPT_P", "1"))
+    PASSWORD_HASH_ARGON2_TIME_COST = int(
+        os.getenv("PASSWORD_HASH_ARGON2_TIME_COST", "3")
+    )
+    # Memory cost in KiB
+    PASSWORD_HASH_ARGON2_MEMORY_COST = int(
+        os.getenv("PASSWORD_HASH_ARGON2_MEMORY_COST", "65536")
+    )
+    PASSWORD_HASH_ARGON2_PARALLELISM = int(
+        os.getenv("PASSWORD_HASH_ARGON2_PARALLELISM", "4")
+    )
+
+    # Admission control for auth_bp. Hash-heavy routes (login, register,
+    # password reset/change) get their own budget; 0 means one per CPU.
+    # Requests beyond limit + queue fail fast with 503 and Retry-After.
+    AUTH_HASH_CONCURRENCY = int(os.getenv("AUTH_HASH_CONCURRENCY", "0"))
+    AUTH_HASH_QUEUE_SIZE = int(os.getenv("AUTH_HASH_QUEUE_SIZE", "16"))
+    AUTH_CONCURRENCY = int(os.getenv("AUTH_CONCURRENCY", "64"))
+    AUTH_QUEUE_SIZE = int(os.getenv("AUTH_QUEUE_SIZE", "64"))
+    AUTH_QUEUE_TIMEOUT = float(os.getenv("AUTH_QUEUE_TIMEOUT", "1"))
+    AUTH_RETRY_AFTER = int(os.getenv("AUTH_RETRY_AFTER", "1"))
+    # Larger request bodies are refused with 413 before they are parsed
+    AUTH_MAX_BODY_SIZE = int(os.getenv("AUTH_MAX_BODY_SIZE", "4096"))
+
+    # Per-process LRU cache of user profile snapshots. Set a redis:// URL
+    # (the redis service in docker-compose and k8s) to broadcast
+    # invalidations between processes and replicas; without it,
+    # USER_CACHE_TTL (seconds) bounds staleness across processes.
+    USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "true") == "true"
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+    USER_CACHE_INVALIDATION_URL = os.getenv("USER_CACHE_INVALIDATION_URL")
 
 
 class DevelopmentConfig(BaseConfig):
     DEBUG = True
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        BaseConfig.SQLALCHEMY_DATABASE_URI, pool_size=2, max_overflow=2
+    )
 
 
 class TestingConfig(BaseConfig):
     TESTING = True
+    # Tests create their tables through the db_session fixture
+    SCHEMA_CHECK = "off"
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        BaseConfig.SQLALCHEMY_DATABASE_URI, pool_size=2, max_overflow=2
+    )
+    PASSWORD_HASH_POOL_ENABLED = False
+    # Cheap hashes keep the suite fast
+    PASSWORD_HASH_ALGORITHM = "pbkdf2"
+    PASSWORD_HASH_PBKDF2_ITERATIONS = 1000
 
 
 class ProductionConfig(BaseConfig):
     DEBUG = False
+    SERVER_TIMING = False
 
 class StagingConfig(BaseConfig):
     DEBUG = False
@@ -0,0 +1,110 @@
+"""
+Gunicorn settings for serving the API in containers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Workers and threads are sized from the container's CPU quota rather than
+the host's core count. Every setting can be overridden with a GUNICORN_*
+environment variable.
+"""
+import gc
+import os
+import tempfile
+
+# Workers share metrics through this directory. Set before the app (and
+# with it the config) is imported below.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="cloudstore-metrics-")
+)
+
+from app.services.system import available_cpus  # noqa: E402
+
+cpus = available_cpus()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# One process per CPU runs Python code; threads cover requests waiting on
+# MySQL. Password hashing runs in a separate process pool (see post_fork).
+workers = int(os.getenv("GUNICORN_WORKERS", 0)) or cpus
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+# Import and warm the app once in the master so workers fork with it
+# loaded and share its memory copy-on-write (see when_ready)
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+gc_freeze = os.getenv("GUNICORN_GC_FREEZE", "true").lower() == "true"
+
+# Recycle workers to bound memory growth; jitter keeps them from all
+# restarting at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+# Kubernetes sends SIGTERM and waits terminationGracePeriodSeconds (30s)
+# before SIGKILL, so in-flight requests must finish well within that.
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 25))
+# Longer than any probe or request we expect to serve, including a
+# queued password hash (PASSWORD_HASH_TIMEOUT)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+# Kept short: kubelet probes and the service proxy reconnect anyway, and
+# idle connections hold a worker thread
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    from app.services.metrics import MultiprocessStore
+
+    # Counts left over from an earlier run would be added to this one's
+    MultiprocessStore(os.environ["PROMETHEUS_MULTIPROC_DIR"]).clear()
+
+
+def when_ready(server):
+    if preload_app:
+        from app.services.preload import warm_up
+        from app.services.schema import check_schema
+
+        app = server.app.wsgi()
+        check_schema(app)
+        warm_up(app, freeze=gc_freeze)
+
+
+def pre_fork(server, worker):
+    # Workers recycled later fork from a master that has allocated since
+    if preload_app and gc_freeze:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import password_hasher
+
+    # Split the CPU quota between the workers' hashing pools unless the
+    # pool size was set explicitly
+    if not int(os.getenv("PASSWORD_HASH_POOL_WORKERS", 0)):
+        password_hasher.resize(cpus // server.cfg.workers)
+
+
+def post_worker_init(worker):
+    # Without preloading each worker checks the schema for itself
+    if not preload_app:
+        from app.services.schema import check_schema
+
+        check_schema(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    from app import metrics, password_hasher
+
+    password_hasher.shutdown(wait=True)
+    metrics.flush()
+
+
+def child_exit(server, worker):
+    from app.services.metrics import MultiprocessStore
+
+    # Keep the exited worker's counts; drop its gauges
+    MultiprocessStore(os.environ["PROMETHEUS_MULTIPROC_DIR"]).mark_process_dead(
+        worker.pid
+    )
@@ -0,0 +1,27 @@
+"""Add users.profile_version
+
+Revision ID: 3c5e8f2a1b7d
+Revises: e1ed0a6a32b5
+Create Date: 2026-10-18 09:12:41.204318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5e8f2a1b7d'
+down_revision = 'e1ed0a6a32b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'users',
+        sa.Column('profile_version', sa.Integer(), server_default='1', nullable=False)
+    )
+
+
+def downgrade():
+    op.drop_column('users', 'profile_version')
@@ -0,0 +1,118 @@
+"""Store reset and verification tokens as SHA-256 digests
+
+Revision ID: a9d4e6f1c2b3
+Revises: 3c5e8f2a1b7d
+Create Date: 2026-10-18 10:41:07.518290
+
+"""
+import hashlib
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d4e6f1c2b3'
+down_revision = '3c5e8f2a1b7d'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+users = sa.table(
+    'users',
+    sa.column('id', sa.String(32)),
+    sa.column('reset_token', sa.String(100)),
+    sa.column('email_verification_token', sa.String(100)),
+    sa.column('reset_token_digest', sa.BINARY(32)),
+    sa.column('email_verification_token_digest', sa.BINARY(32)),
+)
+
+
+def _digest(token):
+    return hashlib.sha256(token.encode()).digest() if token else None
+
+
+def _backfill_digests(connection):
+    """Hash outstanding tokens in primary-key order, BATCH_SIZE rows at a time"""
+    update = (
+        users.update()
+        .where(users.c.id == sa.bindparam('row_id'))
+        .values(
+            reset_token_digest=sa.bindparam('reset_digest'),
+            email_verification_token_digest=sa.bindparam('verification_digest'),
+        )
+    )
+    last_id = ''
+    while True:
+        rows = connection.execute(
+            sa.select(
+                users.c.id, users.c.reset_token, users.c.email_verification_token
+            )
+            .where(
+                users.c.id > last_id,
+                sa.or_(
+                    users.c.reset_token.isnot(None),
+                    users.c.email_verification_token.isnot(None),
+                ),
+            )
+            .order_by(users.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        connection.execute(update, [
+            {
+                'row_id': row.id,
+                'reset_digest': _digest(row.reset_token),
+                'verification_digest': _digest(row.email_verification_token),
+            }
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def upgrade():
+    op.add_column('users', sa.Column('reset_token_digest', sa.BINARY(32), nullable=True))
+    op.add_column(
+        'users',
+        sa.Column('email_verification_token_digest', sa.BINARY(32), nullable=True)
+    )
+
+    _backfill_digests(op.get_bind())
+
+    # Dropping the columns also drops their single-column unique indexes
+    op.drop_column('users', 'reset_token')
+    op.drop_column('users', 'email_verification_token')
+    op.alter_column(
+        'users', 'reset_token_digest',
+        new_column_name='reset_token',
+        existing_type=sa.BINARY(32),
+        existing_nullable=True,
+    )
+    op.alter_column(
+        'users', 'email_verification_token_digest',
+        new_column_name='email_verification_token',
+        existing_type=sa.BINARY(32),
+        existing_nullable=True,
+    )
+    op.create_unique_constraint('reset_token', 'users', ['reset_token'])
+    op.create_unique_constraint(
+        'email_verification_token', 'users', ['email_verification_token']
+    )
+
+
+def downgrade():
+    # Digests cannot be turned back into tokens: outstanding reset and
+    # verification links stop working after a downgrade.
+    op.drop_column('users', 'reset_token')
+    op.drop_column('users', 'email_verification_token')
+    op.add_column('users', sa.Column('reset_token', sa.String(length=100), nullable=True))
+    op.add_column(
+        'users',
+        sa.Column('email_verification_token', sa.String(length=100), nullable=True)
+    )
+    op.create_unique_constraint('reset_token', 'users', ['reset_token'])
+    op.create_unique_constraint(
+        'email_verification_token', 'users', ['email_verification_token']
+    )
@@ -0,0 +1,89 @@
+"""Store users.id as BINARY(16)
+
+Existing ids keep their value: the 32-character hex string is stored as
+its 16 raw bytes, so ids seen by clients and in issued JWTs are
+unchanged. New ids are time-ordered UUIDv7 values generated by the app.
+
+Revision ID: c7b1e5d3a8f2
+Revises: a9d4e6f1c2b3
+Create Date: 2026-10-18 11:58:22.930114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7b1e5d3a8f2'
+down_revision = 'a9d4e6f1c2b3'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+users = sa.table(
+    'users',
+    sa.column('id', sa.String(32)),
+    sa.column('id_bin', sa.BINARY(16)),
+)
+
+
+def _backfill(connection, source, target, convert):
+    """
+    Copy primary key ``source`` into ``target`` through ``convert``, walking
+    the primary key in BATCH_SIZE chunks so each batch is an index range.
+    """
+    update = (
+        users.update()
+        .where(source == sa.bindparam('key'))
+        .values({target.name: sa.bindparam('value')})
+    )
+    last_key = None
+    while True:
+        query = sa.select(source).order_by(source).limit(BATCH_SIZE)
+        if last_key is not None:
+            query = query.where(source > last_key)
+        keys = connection.execute(query).scalars().all()
+        if not keys:
+            break
+        connection.execute(
+            update, [{'key': key, 'value': convert(key)} for key in keys]
+        )
+        last_key = keys[-1]
+
+
+def upgrade():
+    op.add_column('users', sa.Column('id_bin', sa.BINARY(16), nullable=True))
+    _backfill(op.get_bind(), users.c.id, users.c.id_bin, bytes.fromhex)
+
+    op.drop_constraint('PRIMARY', 'users', type_='primary')
+    op.drop_column('users', 'id')
+    op.alter_column(
+        'users', 'id_bin',
+        new_column_name='id',
+        existing_type=sa.BINARY(16),
+        nullable=False,
+    )
+    op.create_primary_key('PRIMARY', 'users', ['id'])
+
+
+def downgrade():
+    op.alter_column(
+        'users', 'id',
+        new_column_name='id_bin',
+        existing_type=sa.BINARY(16),
+        existing_nullable=False,
+    )
+    op.add_column('users', sa.Column('id', sa.String(length=32), nullable=True))
+    _backfill(
+        op.get_bind(), users.c.id_bin, users.c.id, lambda raw: bytes(raw).hex()
+    )
+
+    op.drop_constraint('PRIMARY', 'users', type_='primary')
+    op.drop_column('users', 'id_bin')
+    op.alter_column(
+        'users', 'id',
+        existing_type=sa.String(length=32),
+        nullable=False,
+    )
+    op.create_primary_key('PRIMARY', 'users', ['id'])
@@ -0,0 +1,91 @@
+"""Add users.shard_bucket, the shard bucket map and username/email lookups
+
+users.shard_bucket is CRC32(id) % 1024, filled in for existing rows. The
+new tables stay empty until `flask shards init` runs on a deployment with
+DATABASE_SHARD_URLS set.
+
+Revision ID: f3a8c2d6e9b4
+Revises: c7b1e5d3a8f2
+Create Date: 2026-10-18 14:36:05.518227
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8c2d6e9b4'
+down_revision = 'c7b1e5d3a8f2'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+SHARD_BUCKETS = 1024
+
+users = sa.table(
+    'users',
+    sa.column('id', sa.BINARY(16)),
+    sa.column('shard_bucket', sa.SmallInteger),
+)
+
+
+def _backfill(connection):
+    """Set shard_bucket walking the primary key in BATCH_SIZE chunks"""
+    update = (
+        users.update()
+        .where(users.c.id == sa.bindparam('key'))
+        .values(shard_bucket=sa.bindparam('bucket'))
+    )
+    last_key = None
+    while True:
+        query = sa.select(users.c.id).order_by(users.c.id).limit(BATCH_SIZE)
+        if last_key is not None:
+            query = query.where(users.c.id > last_key)
+        keys = connection.execute(query).scalars().all()
+        if not keys:
+            break
+        connection.execute(
+            update,
+            [
+                {'key': key, 'bucket': zlib.crc32(bytes(key)) % SHARD_BUCKETS}
+                for key in keys
+            ],
+        )
+        last_key = keys[-1]
+
+
+def upgrade():
+    op.add_column('users', sa.Column('shard_bucket', sa.SmallInteger(), nullable=True))
+    _backfill(op.get_bind())
+    op.create_index(op.f('ix_users_shard_bucket'), 'users', ['shard_bucket'], unique=False)
+
+    op.create_table('shard_buckets',
+    sa.Column('bucket', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('placement', sa.String(length=32), nullable=False),
+    sa.Column('moving', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('bucket')
+    )
+    op.create_table('username_lookups',
+    sa.Column('username', sa.String(length=80, collation='utf8mb4_unicode_ci'), nullable=False),
+    sa.Column('user_id', sa.BINARY(length=16), nullable=False),
+    sa.PrimaryKeyConstraint('username')
+    )
+    op.create_index(op.f('ix_username_lookups_user_id'), 'username_lookups', ['user_id'], unique=False)
+    op.create_table('email_lookups',
+    sa.Column('email', sa.String(length=120, collation='utf8mb4_unicode_ci'), nullable=False),
+    sa.Column('user_id', sa.BINARY(length=16), nullable=False),
+    sa.PrimaryKeyConstraint('email')
+    )
+    op.create_index(op.f('ix_email_lookups_user_id'), 'email_lookups', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_email_lookups_user_id'), table_name='email_lookups')
+    op.drop_table('email_lookups')
+    op.drop_index(op.f('ix_username_lookups_user_id'), table_name='username_lookups')
+    op.drop_table('username_lookups')
+    op.drop_table('shard_buckets')
+    op.drop_index(op.f('ix_users_shard_bucket'), table_name='users')
+    op.drop_column('users', 'shard_bucket')
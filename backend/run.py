@@ -1,6 +1,7 @@
 from os import environ
 from dotenv import load_dotenv
 from app import create_app
+from app.services.schema import check_schema
 
 # Load environment variables
 load_dotenv(".env.development")
@@ -12,4 +13,11 @@ env = environ.get("FLASK_ENV", "development")
 app = create_app(env)
 
 if __name__ == "__main__":
+    # Flask's built-in server is single-process and meant for local work only
+    if env != "development":
+        raise SystemExit(
+            f"run.py serves only the development config, not {env!r}; "
+            "use gunicorn -c gunicorn.conf.py wsgi:app"
+        )
+    check_schema(app)
     app.run()
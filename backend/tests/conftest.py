@@ -1,4 +1,7 @@
+import contextlib
 import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from app import create_app, db
 
 
@@ -20,3 +23,31 @@ def db_session(app):
         yield db.session
         db.session.remove()
         db.drop_all()
+
+
+@pytest.fixture
+def max_statements():
+    """
+    Fail the test if a block issues more than ``limit`` SQL statements on
+    any engine::
+
+        with max_statements(2):
+            client.post(...)
+    """
+
+    @contextlib.contextmanager
+    def guard(limit):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+        message = f"{len(statements)} statements, expected at most {limit}:\n"
+        assert len(statements) <= limit, message + "\n".join(statements)
+
+    return guard
@@ -0,0 +1,90 @@
+import threading
+import pytest
+from app import admission
+from app.services.admission import Budget
+
+
+class TestBudget:
+    def test_admits_up_to_limit(self):
+        budget = Budget("test", limit=2, queue_size=0, queue_timeout=0)
+        assert budget.acquire()
+        assert budget.acquire()
+        assert not budget.acquire()
+        assert budget.stats()["rejected"] == 1
+
+        budget.release()
+        assert budget.acquire()
+        assert budget.stats()["admitted"] == 3
+
+    def test_queued_request_gets_released_slot(self):
+        budget = Budget("test", limit=1, queue_size=1, queue_timeout=5)
+        assert budget.acquire()
+
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(budget.acquire()))
+        waiter.start()
+        while budget.stats()["queue_depth"] == 0:
+            pass
+
+        # The queue is full, so a third caller is shed without waiting
+        assert not budget.acquire()
+
+        budget.release()
+        waiter.join()
+        assert result == [True]
+        assert budget.stats()["in_flight"] == 1
+
+    def test_queue_timeout_rejects(self):
+        budget = Budget("test", limit=1, queue_size=1, queue_timeout=0.01)
+        assert budget.acquire()
+        assert not budget.acquire()
+        assert budget.stats() == {
+            "limit": 1,
+            "in_flight": 1,
+            "queue_depth": 0,
+            "queue_size": 1,
+            "admitted": 1,
+            "rejected": 1,
+        }
+
+
+class TestAdmissionRoutes:
+    @pytest.fixture
+    def saturated(self, app):
+        """Hold every slot of the hash budget with an empty queue"""
+        budget = admission.budgets["hash"]
+        budget.queue_size = 0
+        held = 0
+        while budget.acquire():
+            held += 1
+        yield budget
+        for _ in range(held):
+            budget.release()
+
+    def test_hash_route_shed_with_retry_after(self, client, saturated):
+        response = client.post(
+            "/api/v1/auth/login",
+            json={"username": "testuser", "password": "TestPass123@"},
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert saturated.stats()["rejected"] >= 1
+
+    def test_cheap_routes_unaffected(self, client, saturated):
+        response = client.get("/health")
+        assert response.status_code == 200
+        hash_budget = response.json["admission"]["hash"]
+        assert hash_budget["in_flight"] == hash_budget["limit"]
+
+        # /profile uses the default budget and still reaches the handler
+        response = client.get("/api/v1/auth/profile")
+        assert response.status_code == 401
+
+    def test_slots_released_after_request(self, client, db_session):
+        client.post(
+            "/api/v1/auth/login",
+            json={"username": "nobody", "password": "TestPass123@"},
+        )
+        stats = client.get("/health").json["admission"]
+        assert stats["hash"]["in_flight"] == 0
+        assert stats["hash"]["admitted"] == 1
@@ -1,5 +1,7 @@
 import pytest, logging
 from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from app import db
 from app.controllers.auth import AuthController
 from app.models.user import User
 
@@ -52,6 +54,48 @@ class TestAuthController:
         assert 'errors' in response
         assert 'username' in response['errors']
 
+    def test_duplicate_email_registration(self, auth_controller, db_session):
+        """Test registration with existing email"""
+        user = User(username='existing', email='test@test.com')
+        user.set_password('TestPass123@')
+        db_session.add(user)
+        db_session.commit()
+
+        data = {
+            'username': 'testuser',
+            'email': 'test@test.com',
+            'password': 'TestPass123@',
+            'confirm_password': 'TestPass123@'
+        }
+
+        response, status_code = auth_controller.register(data)
+
+        assert status_code == 400
+        assert response['errors'] == {'email': ['Email already exists']}
+
+    def test_registration_statement_count(self, auth_controller, db_session):
+        """Test registration is a single INSERT with no reload after commit"""
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            response, status_code = auth_controller.register({
+                'username': 'testuser',
+                'email': 'test@test.com',
+                'password': 'TestPass123@',
+                'confirm_password': 'TestPass123@'
+            })
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+        assert status_code == 201
+        assert response['user']['id']
+        assert len(statements) == 1, statements
+        assert statements[0].startswith('INSERT INTO users')
+
     def test_successful_login(self, auth_controller, db_session):
         """Test successful login"""
         # Create user
@@ -126,6 +170,9 @@ class TestAuthController:
         user = User.query.filter_by(email='test@test.com').first()
         assert user.reset_token is not None
         assert user.reset_token_expires is not None
+        # Only the SHA-256 digest of the token is stored
+        assert isinstance(user.reset_token, bytes)
+        assert len(user.reset_token) == 32
 
     def test_reset_password(self, auth_controller, db_session):
         """Test password reset"""
@@ -137,7 +184,7 @@ class TestAuthController:
             user = User(
                 username='testuser',
                 email='test@test.com',
-                reset_token='valid-token',
+                reset_token=User.hash_token('valid-token'),
                 reset_token_expires=expiry
             )
             user.set_password('TestPass123@')
@@ -147,7 +194,7 @@ class TestAuthController:
             # Verify user was created properly
             created_user = User.query.filter_by(username='testuser').first()
             assert created_user is not None, "User was not created"
-            assert created_user.reset_token == 'valid-token', "Reset token not set"
+            assert created_user.reset_token == User.hash_token('valid-token'), "Reset token not set"
             assert created_user.reset_token_expires is not None, "Reset token expiry not set"
             
             # Log timezone information
@@ -175,6 +222,56 @@ class TestAuthController:
             logging.error(f"Test failed with error: {str(e)}")
             raise
 
+    def test_reset_password_expired_token(self, auth_controller, db_session):
+        """Test expired reset tokens are rejected and left untouched"""
+        user = User(
+            username='testuser',
+            email='test@test.com',
+            reset_token=User.hash_token('expired-token'),
+            reset_token_expires=datetime.now(timezone.utc) - timedelta(minutes=1)
+        )
+        user.set_password('TestPass123@')
+        db_session.add(user)
+        db_session.commit()
+
+        response, status_code = auth_controller.reset_password(
+            'expired-token',
+            'NewPass123@'
+        )
+
+        assert status_code == 400
+        user = User.query.filter_by(username='testuser').first()
+        assert user.check_password('TestPass123@')
+        assert user.reset_token == User.hash_token('expired-token')
+
+    def test_reset_token_single_use(self, auth_controller, db_session):
+        """Test a reset token is consumed by one UPDATE and cannot be reused"""
+        user = User(
+            username='testuser',
+            email='test@test.com',
+            reset_token=User.hash_token('valid-token'),
+            reset_token_expires=datetime.now(timezone.utc) + timedelta(hours=1)
+        )
+        user.set_password('TestPass123@')
+        db_session.add(user)
+        db_session.commit()
+
+        statements = []
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            _, first = auth_controller.reset_password('valid-token', 'NewPass123@')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        _, second = auth_controller.reset_password('valid-token', 'OtherPass123@')
+
+        assert (first, second) == (200, 400)
+        assert len(statements) == 1, statements
+        assert statements[0].startswith('UPDATE users')
+
     @pytest.fixture(autouse=True)
     def setup_logging(self):
         logging.basicConfig(level=logging.DEBUG)
@@ -204,7 +301,7 @@ class TestAuthController:
         user = User(
             username='testuser',
             email='test@test.com',
-            email_verification_token='verify-token',
+            email_verification_token=User.hash_token('verify-token'),
             email_verified=False
         )
         user.set_password('TestPass123@')
@@ -11,7 +11,7 @@ def test_user(db_session):
     return user
 
 class TestAuthRoutes:
-    def test_register(self, client):
+    def test_register(self, client, db_session):
         data = {
             'username': 'newuser',
             'email': 'new@test.com',
@@ -26,6 +26,23 @@ class TestAuthRoutes:
         assert 'token' in response.json
         assert response.json['user']['username'] == 'newuser'
 
+    def test_register_user_matches_login(self, client, db_session):
+        # register dumps the user before the row is reloaded
+        response = client.post(
+            '/api/v1/auth/register',
+            json={
+                'username': 'newuser',
+                'email': 'new@test.com',
+                'password': 'TestPass123@',
+                'confirm_password': 'TestPass123@'
+            }
+        )
+        login_response = client.post(
+            '/api/v1/auth/login',
+            json={'username': 'newuser', 'password': 'TestPass123@'}
+        )
+        assert response.json['user'] == login_response.json['user']
+
     def test_login(self, client, test_user):
         data = {
             'username': 'testuser',
@@ -0,0 +1,91 @@
+import hashlib
+import pytest
+from app import create_app
+from app.services.breach_filter import BreachFilter, sha1_digest
+from config import TestingConfig
+
+BREACHED = ["Password123!", "Summer2024@", "Qwerty123$"]
+
+
+@pytest.fixture
+def filter_path(tmp_path):
+    path = str(tmp_path / "breached.bloom")
+    digests = [sha1_digest(password) for password in BREACHED]
+    BreachFilter.build(path, digests, len(digests))
+    return path
+
+
+def test_lookup(filter_path):
+    breach_filter = BreachFilter(filter_path)
+    assert all(password in breach_filter for password in BREACHED)
+    assert "Unbreached@Pass9" not in breach_filter
+    assert breach_filter.items == len(BREACHED)
+
+
+def test_false_positive_rate(tmp_path):
+    path = str(tmp_path / "bloom")
+    digests = [sha1_digest(f"breached-{i}") for i in range(5000)]
+    BreachFilter.build(path, digests, len(digests), false_positive_rate=0.01)
+    breach_filter = BreachFilter(path)
+
+    assert all(breach_filter.contains_digest(digest) for digest in digests)
+    false_positives = sum(f"clean-{i}" in breach_filter for i in range(5000))
+    assert false_positives < 5000 * 0.02
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-filter"
+    path.write_bytes(b"x" * 100)
+    with pytest.raises(ValueError):
+        BreachFilter(str(path))
+
+
+def test_build_command(app, tmp_path):
+    source = tmp_path / "pwned.txt"
+    lines = [
+        hashlib.sha1(password.encode()).hexdigest().upper() + ":42"
+        for password in BREACHED
+    ]
+    source.write_text("\n".join(lines + ["not a hash"]) + "\n")
+    output = str(tmp_path / "breached.bloom")
+
+    result = app.test_cli_runner().invoke(
+        args=["auth", "build-breach-filter", str(source), output]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Wrote 3 entries" in result.output
+    assert "Skipped 1 lines" in result.output
+    assert "Password123!" in BreachFilter(output)
+
+
+def test_registration_refuses_breached_password(filter_path, monkeypatch):
+    monkeypatch.setattr(TestingConfig, "PASSWORD_BREACH_FILTER", filter_path)
+    app = create_app("testing")
+    client = app.test_client()
+    with app.app_context():
+        from app import db
+
+        db.create_all()
+        response = client.post(
+            "/api/v1/auth/register",
+            json={
+                "username": "alice",
+                "email": "alice@test.com",
+                "password": "Password123!",
+                "confirm_password": "Password123!",
+            },
+        )
+        assert response.status_code == 400
+        assert "data breach" in str(response.json["errors"]["password"])
+
+        response = client.post(
+            "/api/v1/auth/register",
+            json={
+                "username": "alice",
+                "email": "alice@test.com",
+                "password": "Unbreached@Pass9",
+                "confirm_password": "Unbreached@Pass9",
+            },
+        )
+        assert response.status_code == 201
+        db.drop_all()
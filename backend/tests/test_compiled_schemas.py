@@ -0,0 +1,76 @@
+import json
+from datetime import datetime, timezone
+from marshmallow import Schema, fields, post_dump
+from app.models.user import User
+from app.schemas.auth import AuthErrorSchema, AuthSuccessSchema
+from app.schemas.compiled import compile_dump
+from app.schemas.user import UserSchema
+
+
+def make_user():
+    user = User(username="alice", email="alice@test.com")
+    user.created_at = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    user.is_active = True
+    user.role = "user"
+    return user
+
+
+def assert_same(schema, obj):
+    expected = schema.dump(obj)
+    actual = compile_dump(schema)(obj)
+    assert json.dumps(actual) == json.dumps(expected)
+    return actual
+
+
+def test_auth_success_matches_marshmallow():
+    user = make_user()
+    result = assert_same(
+        AuthSuccessSchema(),
+        {
+            "message": "Login successful",
+            "token": {"access_token": "abc", "token_type": "bearer"},
+            "user": user,
+        },
+    )
+    assert result["user"]["created_at"] == "2026-01-02T03:04:05+00:00"
+    assert "password" not in result["user"]
+
+
+def test_missing_keys_and_defaults():
+    # token_type has a dump_default; absent keys are left out
+    assert_same(AuthSuccessSchema(), {"message": "Done"})
+    assert_same(AuthSuccessSchema(), {"token": {"access_token": "abc"}})
+    assert_same(AuthSuccessSchema(), {"message": None, "user": None})
+
+
+def test_values_needing_conversion():
+    user = make_user()
+    user.username = 42
+    user.is_active = 1
+    user.created_at = None
+    assert_same(UserSchema(), user)
+    assert_same(AuthSuccessSchema(), {"token": {"expires_in": "3600"}})
+
+
+def test_other_fields_use_marshmallow():
+    assert_same(
+        AuthErrorSchema(), {"message": "Failed", "errors": {"field": ["Invalid"]}}
+    )
+
+    class Renamed(Schema):
+        name = fields.String(data_key="full_name", attribute="username")
+        created = fields.DateTime(format="%Y", attribute="created_at")
+
+    assert_same(Renamed(), make_user())
+
+
+def test_schema_with_hooks_falls_back():
+    class Hooked(Schema):
+        name = fields.String()
+
+        @post_dump
+        def upper(self, data, **kwargs):
+            return {"name": data["name"].upper()}
+
+    schema = Hooked()
+    assert compile_dump(schema)({"name": "x"}) == {"name": "X"}
@@ -0,0 +1,81 @@
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, exc, text
+from app.services.db_pool import PoolMonitor, TimedQueuePool
+from app.services.metrics import Histogram
+from config import engine_options
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_checkout_counts_and_wait(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        assert engine.pool.stats()["in_use"] == 1
+
+    stats = engine.pool.stats()
+    assert stats["in_use"] == 0
+    assert stats["connects"] == 1
+    assert stats["checkouts"] == 1
+    assert stats["checkout_wait_seconds"]["count"] == 1
+
+
+def test_timeout_counted(engine):
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    assert engine.pool.stats()["timeouts"] == 1
+    assert engine.pool.stats()["checkout_wait_seconds"]["count"] == 2
+
+
+def test_metrics_survive_dispose(engine):
+    engine.connect().close()
+    engine.dispose()
+    engine.connect().close()
+
+    stats = engine.pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["connects"] == 2
+
+
+def test_monitor_selects_pool_for_server_databases():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "mysql+pymysql://u:p@db/cloud_store"
+    PoolMonitor(app)
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["poolclass"] is TimedQueuePool
+
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite://", SQLALCHEMY_ENGINE_OPTIONS={})
+    PoolMonitor(app)
+    assert "poolclass" not in app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+
+
+def test_engine_options_from_env(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "10")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+    options = engine_options("mysql+pymysql://db/x", pool_size=4, max_overflow=4)
+    assert options["pool_size"] == 10
+    assert options["max_overflow"] == 4
+    assert options["pool_pre_ping"] is False
+    assert "pool_size" not in engine_options("sqlite://", 4, 4)
+
+
+def test_histogram_is_cumulative():
+    histogram = Histogram(buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value)
+    assert histogram.snapshot() == {
+        "buckets": {"0.1": 1, "1": 3, "+Inf": 4},
+        "count": 4,
+        "sum": 6.05,
+    }
@@ -0,0 +1,128 @@
+import pytest
+from app import create_app, db, db_router
+from app.controllers.auth import AuthController
+from app.models.user import User
+from config import TestingConfig
+
+
+@pytest.fixture
+def routed_app(tmp_path, monkeypatch):
+    """A primary and two replicas, each a SQLite file with its own rows"""
+    monkeypatch.setattr(
+        TestingConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'primary'}"
+    )
+    monkeypatch.setattr(
+        TestingConfig,
+        "SQLALCHEMY_REPLICA_URIS",
+        [f"sqlite:///{tmp_path / 'replica_0'}", f"sqlite:///{tmp_path / 'replica_1'}"],
+    )
+    app = create_app("testing")
+
+    with app.app_context():
+        for key, email in [
+            (None, "primary@test.com"),
+            ("replica_0", "replica0@test.com"),
+            ("replica_1", "replica1@test.com"),
+        ]:
+            engine = db.engines[key]
+            db.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(
+                    User.__table__.insert(),
+                    {
+                        "id": "0" * 32,
+                        "username": "alice",
+                        "email": email,
+                        "password_hash": "x",
+                    },
+                )
+        with db.engines[None].begin() as connection:
+            connection.execute(
+                User.__table__.insert(),
+                {
+                    "id": "1" * 32,
+                    "username": "bob",
+                    "email": "bob@test.com",
+                    "password_hash": "x",
+                },
+            )
+    yield app
+
+    # db is global and keeps a MetaData per bind key it has seen; drop the
+    # replica ones so later apps without those binds can create_all()
+    for key in db_router.replicas:
+        db.metadatas.pop(key, None)
+
+
+def lookup(app, username="alice", **kwargs):
+    """Find a user the way the controller does, in a fresh session"""
+    with app.app_context():
+        user = AuthController().find_user(username=username, **kwargs)
+        return user.email if user else None
+
+
+def test_reads_round_robin_over_replicas(routed_app):
+    emails = {lookup(routed_app), lookup(routed_app)}
+    assert emails == {"replica0@test.com", "replica1@test.com"}
+    assert db_router.stats()["replica_reads"] == 2
+
+
+def test_reads_outside_replica_scope_use_primary(routed_app):
+    with routed_app.app_context():
+        user = User.query.filter_by(username="alice").first()
+        assert user.email == "primary@test.com"
+
+
+def test_sticks_to_primary_after_write(routed_app):
+    with routed_app.app_context():
+        user = User(username="carol", email="carol@test.com")
+        user.password_hash = "x"
+        db.session.add(user)
+        db.session.flush()
+
+        with db_router.replica_reads():
+            alice = User.query.filter_by(username="alice").first()
+        assert alice.email == "primary@test.com"
+
+
+def test_missing_on_replica_falls_back_to_primary(routed_app):
+    assert lookup(routed_app, username="bob") == "bob@test.com"
+
+
+def test_lagging_replicas_skipped(routed_app, monkeypatch):
+    monkeypatch.setattr(db_router, "measure_lag", lambda engine: 60.0)
+    assert lookup(routed_app) == "primary@test.com"
+
+    stats = db_router.stats()
+    assert stats["primary_fallbacks"] == 1
+    assert stats["replicas"]["replica_0"] == {"lag": 60.0, "usable": False}
+
+
+def test_unknown_lag_skipped(routed_app, monkeypatch):
+    monkeypatch.setattr(db_router, "measure_lag", lambda engine: None)
+    assert lookup(routed_app) == "primary@test.com"
+
+
+def test_login_reads_from_replica(routed_app):
+    """A user only the replicas know about can log in"""
+    user = User(username="dave", email="dave@test.com")
+    with routed_app.app_context():
+        user.set_password("TestPass123@")
+        for key in db_router.replicas:
+            with db.engines[key].begin() as connection:
+                connection.execute(
+                    User.__table__.insert(),
+                    {
+                        "id": "2" * 32,
+                        "username": "dave",
+                        "email": "dave@test.com",
+                        "password_hash": user.password_hash,
+                    },
+                )
+
+    response = routed_app.test_client().post(
+        "/api/v1/auth/login",
+        json={"username": "dave", "password": "TestPass123@"},
+    )
+    assert response.status_code == 200
+    assert response.json["user"]["email"] == "dave@test.com"
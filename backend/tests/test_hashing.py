@@ -0,0 +1,180 @@
+import os
+import signal
+import pytest
+from app import create_app, password_hasher
+from app.controllers.auth import AuthController
+from app.models.user import User
+from app.services import system
+from app.services.hashing import (
+    HashingPolicy,
+    HashingUnavailableError,
+    PasswordHasher,
+    hash_password,
+    verify_password,
+)
+
+
+@pytest.fixture
+def pooled_hasher():
+    app = create_app("testing")
+    app.config.update(
+        PASSWORD_HASH_POOL_ENABLED=True,
+        PASSWORD_HASH_POOL_WORKERS=1,
+        PASSWORD_HASH_POOL_QUEUE_SIZE=0,
+    )
+    hasher = PasswordHasher(app)
+    yield hasher
+    hasher.shutdown(wait=True)
+
+
+def test_inline_when_disabled(app):
+    """Hashing runs on the calling thread when the pool is disabled"""
+    assert password_hasher.enabled is False
+    pwhash = password_hasher.generate("TestPass123@")
+    assert password_hasher.check(pwhash, "TestPass123@")
+    assert not password_hasher.check(pwhash, "WrongPass123@")
+
+
+def test_pool_round_trip(pooled_hasher):
+    """Hashes produced in the pool verify like inline ones"""
+    pwhash = pooled_hasher.generate("TestPass123@")
+    assert pwhash != "TestPass123@"
+    assert pooled_hasher.check(pwhash, "TestPass123@")
+    assert not pooled_hasher.check(pwhash, "WrongPass123@")
+
+
+def test_pool_rejects_when_full(pooled_hasher):
+    """Submissions beyond workers + queue size fail fast"""
+    assert pooled_hasher._slots.acquire(blocking=False)
+    try:
+        with pytest.raises(HashingUnavailableError):
+            pooled_hasher.generate("TestPass123@")
+    finally:
+        pooled_hasher._slots.release()
+
+
+def test_pool_resize(pooled_hasher):
+    """Resizing never drops below one worker and resizes the queue bound"""
+    pooled_hasher.resize(0)
+    assert pooled_hasher.max_workers == 1
+    assert pooled_hasher._slots.acquire(blocking=False)
+    assert not pooled_hasher._slots.acquire(blocking=False)
+
+
+def test_pool_timeout(pooled_hasher):
+    """Jobs exceeding the timeout raise and keep their slot until done"""
+    pooled_hasher.timeout = 0.0001
+    with pytest.raises(HashingUnavailableError):
+        pooled_hasher.generate("TestPass123@")
+
+
+def test_pool_recovers_from_dead_child(pooled_hasher):
+    """A pool whose child was killed is replaced instead of failing forever"""
+    pwhash = pooled_hasher.generate("TestPass123@")
+    broken = pooled_hasher._executor
+    for process in list(broken._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+
+    with pytest.raises(HashingUnavailableError):
+        pooled_hasher.check(pwhash, "TestPass123@")
+    assert pooled_hasher.check(pwhash, "TestPass123@")
+    assert pooled_hasher._executor is not broken
+
+
+def test_login_returns_503_when_saturated(db_session, monkeypatch):
+    """The controller sheds load instead of failing with a 500"""
+    user = User(username="testuser", email="test@test.com")
+    user.set_password("TestPass123@")
+    db_session.add(user)
+    db_session.commit()
+
+    def saturated(*args):
+        raise HashingUnavailableError("Password hashing queue is full")
+
+    monkeypatch.setattr(password_hasher, "_run", saturated)
+    response, status_code = AuthController().login(
+        {"username": "testuser", "password": "TestPass123@"}
+    )
+    assert status_code == 503
+    assert "queue is full" in response["errors"]["_error"][0]
+
+
+@pytest.mark.parametrize(
+    "cpu_max, expected",
+    [("max 100000", None), ("150000 100000", 1.5), ("200000 100000", 2.0)],
+)
+def test_cgroup_v2_quota(tmp_path, monkeypatch, cpu_max, expected):
+    cpu_max_file = tmp_path / "cpu.max"
+    cpu_max_file.write_text(cpu_max)
+    monkeypatch.setattr(system, "CGROUP_V2_CPU_MAX", str(cpu_max_file))
+    assert system.cgroup_cpu_quota() == expected
+
+
+def test_available_cpus_honours_quota(monkeypatch):
+    monkeypatch.setattr(system, "cgroup_cpu_quota", lambda: 0.5)
+    assert system.available_cpus() == 1
+
+
+def test_policy_method_strings():
+    assert HashingPolicy("pbkdf2", pbkdf2_iterations=1000).method == (
+        "pbkdf2:sha256:1000"
+    )
+    assert HashingPolicy("scrypt", scrypt_n=1024).method == "scrypt:1024:8:1"
+    with pytest.raises(ValueError):
+        HashingPolicy("md5")
+
+
+def test_policy_needs_rehash():
+    """Hashes made with other algorithms or costs are flagged"""
+    policy = HashingPolicy("pbkdf2", pbkdf2_iterations=1000)
+    pwhash = hash_password("TestPass123@", policy)
+
+    assert not policy.needs_rehash(pwhash)
+    assert HashingPolicy("pbkdf2", pbkdf2_iterations=2000).needs_rehash(pwhash)
+    assert HashingPolicy("scrypt").needs_rehash(pwhash)
+
+
+def test_argon2id_round_trip():
+    pytest.importorskip("argon2")
+    policy = HashingPolicy(
+        "argon2id", argon2_time_cost=1, argon2_memory_cost=8192, argon2_parallelism=1
+    )
+    pwhash = hash_password("TestPass123@", policy)
+
+    assert pwhash.startswith("$argon2id$")
+    assert verify_password(pwhash, "TestPass123@")
+    assert not verify_password(pwhash, "WrongPass123@")
+    assert not policy.needs_rehash(pwhash)
+    assert HashingPolicy("argon2id", argon2_time_cost=2).needs_rehash(pwhash)
+    assert HashingPolicy("pbkdf2").needs_rehash(pwhash)
+
+
+def test_login_rehashes_outdated_hash(app, db_session):
+    """A successful login upgrades a hash made under an old policy"""
+    user = User(
+        username="testuser",
+        email="test@test.com",
+        password_hash=hash_password("TestPass123@", HashingPolicy("scrypt", 1024)),
+    )
+    db_session.add(user)
+    db_session.commit()
+
+    response, status_code = AuthController().login(
+        {"username": "testuser", "password": "TestPass123@"}
+    )
+    assert status_code == 200
+
+    user = User.query.filter_by(username="testuser").first()
+    assert user.password_hash.startswith("pbkdf2:sha256:1000$")
+    assert user.check_password("TestPass123@")
+
+
+def test_calibrate_hash_command(app):
+    runner = app.test_cli_runner()
+    result = runner.invoke(
+        args=["auth", "calibrate-hash", "--algorithm", "pbkdf2", "--target-ms", "2"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "PASSWORD_HASH_ALGORITHM=pbkdf2" in result.output
+    assert "PASSWORD_HASH_PBKDF2_ITERATIONS=" in result.output
@@ -0,0 +1,62 @@
+import dataclasses
+import uuid
+from datetime import date, datetime, timezone
+import pytest
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from app.services.json_provider import OrjsonProvider
+from config import TestingConfig
+
+
+@dataclasses.dataclass
+class Point:
+    y: int
+    x: int
+
+
+PAYLOADS = [
+    {"message": "Login successful", "token": {"access_token": "a.b.c"}, "n": 1},
+    {"user": {"username": "zoë", "email": "zoe@test.com"}},
+    {"id": uuid.UUID("0190a1b2-c3d4-7e5f-8a9b-0c1d2e3f4a5b")},
+    {"at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc), "on": date(2026, 1, 2)},
+    {"point": Point(1, 2), "ratio": 0.25, "tiny": 5e-05, "huge": 1e16},
+    {"big": 2**70, "negative": -1, "none": None, "flags": [True, False]},
+    {1: "int key"},
+    ["a", 1, 2.5],
+]
+
+
+@pytest.fixture
+def providers(app):
+    assert isinstance(app.json, OrjsonProvider)
+    return app.json, DefaultJSONProvider(app)
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_response_matches_stdlib(app, providers, payload):
+    fast, stdlib = providers
+    with app.app_context():
+        assert fast.response(payload).data == stdlib.response(payload).data
+    assert fast.dumps(payload) == stdlib.dumps(payload)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['{"username": "alice", "n": [1, 2.5, null]}', '{"big": 1180591620717411303424}'],
+)
+def test_loads_matches_stdlib(providers, text):
+    fast, stdlib = providers
+    assert fast.loads(text) == stdlib.loads(text)
+    assert fast.loads(text.encode()) == stdlib.loads(text)
+
+
+def test_invalid_json_raises_stdlib_error(providers):
+    fast, _ = providers
+    with pytest.raises(ValueError):
+        fast.loads("{not json")
+
+
+def test_stdlib_provider_configured(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "JSON_PROVIDER", "stdlib", raising=False)
+    app = create_app("testing")
+    assert type(app.json) is DefaultJSONProvider
@@ -0,0 +1,115 @@
+import os
+import pytest
+from app import create_app
+from app.services.metrics import (
+    Counter,
+    LabelledHistogram,
+    MultiprocessStore,
+    family,
+    merge,
+    render,
+)
+from config import TestingConfig
+
+PASSWORD = "TestPass123@"
+
+
+@pytest.fixture
+def metrics_client(db_session, client):
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "alice",
+            "email": "alice@test.com",
+            "password": PASSWORD,
+            "confirm_password": PASSWORD,
+        },
+    )
+    client.post("/api/v1/auth/login", json={"username": "alice", "password": "x"})
+    return client
+
+
+def test_request_metrics(metrics_client):
+    response = metrics_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+
+    text = response.get_data(as_text=True)
+    assert (
+        'http_requests_total{method="POST",route="/api/v1/auth/register",'
+        'status="201"} ' in text
+    )
+    assert (
+        'http_requests_total{method="POST",route="/api/v1/auth/login",'
+        'status="401"} ' in text
+    )
+    assert (
+        'http_request_duration_seconds_bucket{method="POST",'
+        'route="/api/v1/auth/login",le="+Inf"} ' in text
+    )
+    assert (
+        'db_statement_duration_seconds_count{bind="default",operation="insert"}' in text
+    )
+    assert 'password_hash_duration_seconds_count{operation="check"}' in text
+    # The scrape itself is not counted
+    assert 'route="/metrics"' not in text
+
+
+def test_render_escapes_labels():
+    counter = Counter("things_total", "Things.", ("name",))
+    counter.inc('a"b\\c')
+    counter.inc('a"b\\c', amount=2)
+    assert 'things_total{name="a\\"b\\\\c"} 3.0' in render([counter.collect()])
+
+
+def test_merge_sums_processes():
+    histogram = LabelledHistogram("latency_seconds", "Latency.", ("route",), (0.1, 1))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    counter = Counter("requests_total", "Requests.", ("route",))
+    counter.inc("/a")
+    gauge = family("in_use", "gauge", "In use.", (), [((), 2)])
+
+    snapshot = [histogram.collect(), counter.collect(), gauge]
+    merged = {item["name"]: item["samples"] for item in merge([snapshot, snapshot])}
+
+    assert merged["requests_total"] == [[["/a"], 2]]
+    assert merged["in_use"] == [[[], 4]]
+    assert merged["latency_seconds"] == [
+        [["/a"], {"buckets": {"0.1": 2, "1": 4, "+Inf": 4}, "count": 4, "sum": 1.1}]
+    ]
+
+
+def test_multiprocess_store_keeps_dead_worker_counts(tmp_path):
+    store = MultiprocessStore(str(tmp_path))
+    counter = Counter("requests_total", "Requests.")
+    counter.inc(amount=3)
+    gauge = family("in_use", "gauge", "In use.", (), [((), 2)])
+
+    store.write([counter.collect(), gauge])
+    dead_pid = 2**22 + 1  # above the default pid_max, so never running
+    store.write([counter.collect(), gauge], pid=dead_pid)
+    totals = {item["name"]: item["samples"] for item in store.read()}
+    assert totals == {"requests_total": [[[], 6]], "in_use": [[[], 2]]}
+
+    store.mark_process_dead(dead_pid)
+    assert not os.path.exists(tmp_path / f"{dead_pid}.json")
+    totals = {item["name"]: item["samples"] for item in store.read()}
+    assert totals == {"requests_total": [[[], 6]], "in_use": [[[], 2]]}
+
+
+def test_scrape_aggregates_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestingConfig, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    app = create_app("testing")
+    # An exited worker that served five health checks
+    other = Counter("http_requests_total", "", ("method", "route", "status"))
+    other.inc("GET", "/health", "200", amount=5)
+    MultiprocessStore(str(tmp_path)).write([other.collect()], pid=2**22 + 1)
+
+    client = app.test_client()
+    client.get("/health")
+    text = client.get("/metrics").get_data(as_text=True)
+    count = text.split('{method="GET",route="/health",status="200"} ')[1]
+    # Counters are per process, so earlier tests' health checks add up too
+    assert float(count.split("\n")[0]) >= 6
+    assert os.path.exists(tmp_path / f"{os.getpid()}.json")
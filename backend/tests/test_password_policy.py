@@ -0,0 +1,58 @@
+import pytest
+from marshmallow import ValidationError
+from app.schemas.auth import PasswordChangeSchema, PasswordResetSchema, RegisterSchema
+from app.schemas.user import UserSchema
+from app.services.password_policy import PasswordPolicy
+
+
+def test_reports_every_violation():
+    errors = PasswordPolicy().violations("abc")
+    assert errors == [
+        "Password must be at least 8 characters long",
+        "Password must contain at least one number",
+        "Password must contain at least one uppercase letter",
+        'Password must contain at least one special character (!@#$%^&*(),.?":{}|<>)',
+    ]
+
+
+def test_valid_password():
+    assert PasswordPolicy().violations("TestPass123@") == []
+
+
+def test_non_ascii_characters():
+    policy = PasswordPolicy()
+    assert policy.violations("Ünïcödé1@") == []
+    assert policy.violations("ÉCOLE123@") == [
+        "Password must contain at least one lowercase letter"
+    ]
+
+
+def test_rules_from_config(app):
+    app.config.update(
+        PASSWORD_MIN_LENGTH=12,
+        PASSWORD_REQUIRE_UPPERCASE=False,
+        PASSWORD_SPECIAL_CHARACTERS="",
+    )
+    policy = PasswordPolicy(app)
+    assert policy.violations("lowercase1") == [
+        "Password must be at least 12 characters long"
+    ]
+    assert app.extensions["password_policy"] is policy
+
+
+@pytest.mark.parametrize(
+    "schema, field, data",
+    [
+        (RegisterSchema(), "password", {"username": "user", "email": "u@x.com"}),
+        (PasswordResetSchema(), "new_password", {"token": "t"}),
+        (PasswordChangeSchema(), "new_password", {"current_password": "x"}),
+        (UserSchema(), "password", {"username": "user", "email": "u@x.com"}),
+    ],
+)
+def test_schemas_share_policy(app, schema, field, data):
+    data = {**data, field: "weak", "confirm_password": "weak"}
+    if isinstance(schema, UserSchema):
+        del data["confirm_password"]
+    with app.app_context(), pytest.raises(ValidationError) as err:
+        schema.load(data)
+    assert len(err.value.messages[field]) == 4
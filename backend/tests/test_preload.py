@@ -0,0 +1,16 @@
+import gc
+from app.services.preload import warm_up
+
+
+def test_warm_up_leaves_app_serving(app, client):
+    warm_up(app, freeze=False)
+    response = client.get("/health")
+    assert response.status_code == 200
+
+
+def test_warm_up_freezes_heap(app):
+    try:
+        warm_up(app)
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
@@ -0,0 +1,105 @@
+import pytest
+from flask_jwt_extended import decode_token
+from app import create_app, user_cache
+from app.models.user import User
+
+
+@pytest.fixture
+def claims_app(app):
+    app.config["JWT_PROFILE_CLAIMS"] = True
+    return app
+
+
+@pytest.fixture
+def token(claims_app, client, db_session):
+    user = User(username="testuser", email="test@test.com")
+    user.set_password("TestPass123@")
+    db_session.add(user)
+    db_session.commit()
+
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"username": "testuser", "password": "TestPass123@"},
+    )
+    return response.json["token"]["access_token"]
+
+
+def test_token_carries_profile_snapshot(claims_app, token):
+    with claims_app.app_context():
+        claims = decode_token(token)
+    created_at = claims["profile"].pop("created_at")
+    assert created_at.startswith("20")
+    assert claims["profile"] == {
+        "username": "testuser",
+        "email": "test@test.com",
+        "role": "user",
+        "is_active": True,
+        "v": 1,
+    }
+
+
+def test_profile_from_claims_matches_database(client, db_session, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    from_claims = client.get("/api/v1/auth/profile", headers=headers).data
+
+    client.application.config["JWT_PROFILE_CLAIMS"] = False
+    from_database = client.get("/api/v1/auth/profile", headers=headers).data
+    assert from_claims == from_database
+
+
+def test_profile_served_from_claims(client, db_session, token):
+    """
+    Once the profile version is known, GET /profile answers from the token
+    without touching the users table
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/v1/auth/profile", headers=headers).status_code == 200
+    db_session.query(User).delete()
+    db_session.commit()
+
+    response = client.get("/api/v1/auth/profile", headers=headers)
+    assert response.status_code == 200
+    assert response.json["username"] == "testuser"
+    assert user_cache.stats()["misses"] == 0
+
+
+def test_unknown_version_read_from_database(client, db_session, token):
+    """A profile change this process never heard of still retires the token"""
+    user = db_session.query(User).one()
+    user.username = "renamed"
+    user.bump_profile_version()
+    db_session.commit()
+
+    response = client.get(
+        "/api/v1/auth/profile", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.json["username"] == "renamed"
+
+
+def test_stale_token_falls_back_to_database(client, token):
+    headers = {"Authorization": f"Bearer {token}"}
+    response = client.put(
+        "/api/v1/auth/profile", headers=headers, json={"username": "renamed"}
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/v1/auth/profile", headers=headers)
+    assert response.json["username"] == "renamed"
+
+
+def test_claims_ignored_when_disabled(app, client, token):
+    app.config["JWT_PROFILE_CLAIMS"] = False
+    response = client.get(
+        "/api/v1/auth/profile", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert user_cache.stats()["misses"] == 1
+
+
+def test_claims_require_invalidation_channel(monkeypatch):
+    from config import TestingConfig
+
+    monkeypatch.setattr(TestingConfig, "JWT_PROFILE_CLAIMS", True)
+    monkeypatch.setattr(TestingConfig, "USER_CACHE_INVALIDATION_URL", None)
+    with pytest.raises(RuntimeError, match="USER_CACHE_INVALIDATION_URL"):
+        create_app("testing")
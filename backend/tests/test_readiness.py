@@ -0,0 +1,65 @@
+import time
+import pytest
+from flask_migrate import stamp
+from app import create_app, init_migrate, readiness
+from config import TestingConfig
+
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        TestingConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'db'}"
+    )
+    return create_app("testing")
+
+
+def test_livez(client):
+    response = client.get("/livez")
+    assert response.status_code == 200
+    assert response.json == {"status": "alive"}
+
+
+def test_readyz_answers_from_cache(client, max_statements):
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json["ready"] is True
+    assert response.json["database"]["ok"] is True
+
+    with max_statements(0):
+        response = client.get("/readyz")
+    assert response.status_code == 200
+
+
+def test_unreachable_database_not_ready(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        TestingConfig,
+        "SQLALCHEMY_DATABASE_URI",
+        f"sqlite:///{tmp_path / 'missing' / 'db'}",
+    )
+    response = create_app("testing").test_client().get("/readyz")
+    assert response.status_code == 503
+    assert response.json["database"]["ok"] is False
+
+
+def test_schema_behind_head_not_ready(file_app):
+    file_app.config["SCHEMA_CHECK"] = "fail"
+    response = file_app.test_client().get("/readyz")
+    assert response.status_code == 503
+    assert response.json["schema"]["current"] == []
+
+    init_migrate(file_app)
+    with file_app.app_context():
+        stamp()
+    readiness.check()
+    response = file_app.test_client().get("/readyz")
+    assert response.status_code == 200
+    assert response.json["schema"]["ok"] is True
+
+
+def test_stale_check_not_ready(client):
+    client.get("/readyz")
+    readiness._result["checked_at"] = time.monotonic() - 4 * readiness.interval
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json["error"] == "readiness check is stale"
@@ -0,0 +1,83 @@
+import pytest
+from app.models.user import User
+
+PASSWORD = "TestPass123@"
+
+
+@pytest.fixture
+def token(client, db_session):
+    user = User(username="alice", email="alice@test.com")
+    user.set_password(PASSWORD)
+    db_session.add(user)
+    db_session.commit()
+    response = client.post(
+        "/api/v1/auth/login", json={"username": "alice", "password": PASSWORD}
+    )
+    return response.json["token"]["access_token"]
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_oversized_body(app, client):
+    app.config["AUTH_MAX_BODY_SIZE"] = 100
+    response = client.post(
+        "/api/v1/auth/login", json={"username": "a" * 200, "password": PASSWORD}
+    )
+    assert response.status_code == 413
+    assert response.json["message"] == "Request body too large"
+
+
+def test_not_json(client):
+    response = client.post("/api/v1/auth/login", data="username=alice")
+    assert response.status_code == 415
+
+
+def test_malformed_json(client):
+    response = client.post(
+        "/api/v1/auth/login", data="{not json", content_type="application/json"
+    )
+    assert response.status_code == 400
+    assert response.json["errors"] == {"_error": ["Invalid JSON"]}
+
+
+def test_not_an_object(client):
+    response = client.post("/api/v1/auth/login", json=["alice", PASSWORD])
+    assert response.status_code == 400
+    assert response.json["errors"] == {"_error": ["Expected a JSON object"]}
+
+
+def test_validation_error(client):
+    response = client.post("/api/v1/auth/login", json={"username": "alice"})
+    assert response.status_code == 400
+    assert response.json["message"] == "Validation error"
+    assert "password" in response.json["errors"]
+
+
+def test_partial_profile_update(client, token):
+    response = client.put(
+        "/api/v1/auth/profile", json={"email": "new@test.com"}, headers=auth(token)
+    )
+    assert response.status_code == 200
+    assert response.json["user"]["email"] == "new@test.com"
+    assert response.json["user"]["username"] == "alice"
+
+
+@pytest.mark.parametrize(
+    "body, field",
+    [
+        ({"username": "al"}, "username"),
+        ({"email": "not-an-email"}, "email"),
+        ({"role": "admin"}, "role"),
+    ],
+)
+def test_invalid_profile_update(client, token, body, field):
+    response = client.put("/api/v1/auth/profile", json=body, headers=auth(token))
+    assert response.status_code == 400
+    assert field in response.json["errors"]
+
+
+def test_authentication_checked_before_body(client):
+    response = client.put("/api/v1/auth/profile", data="{not json")
+    assert response.status_code == 401
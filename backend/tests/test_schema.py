@@ -0,0 +1,49 @@
+import pytest
+from flask_migrate import stamp
+from app import create_app, db, init_migrate
+from config import TestingConfig
+from app.services.schema import SchemaVersionError, check_schema, expected_heads
+
+
+@pytest.fixture
+def checked_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        TestingConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'db'}"
+    )
+    app = create_app("testing")
+    app.config.update(
+        SCHEMA_CHECK="fail", SCHEMA_CHECK_TIMEOUT=0.05, SCHEMA_CHECK_INTERVAL=0.01
+    )
+    return app
+
+
+def test_create_app_does_not_create_tables(app):
+    with app.app_context():
+        assert db.inspect(db.engine).get_table_names() == []
+
+
+def test_fails_fast_on_unmigrated_database(checked_app):
+    with pytest.raises(SchemaVersionError, match="flask db upgrade"):
+        check_schema(checked_app)
+
+
+def test_passes_at_head(checked_app):
+    init_migrate(checked_app)
+    with checked_app.app_context():
+        stamp()
+    check_schema(checked_app)
+
+
+def test_wait_times_out(checked_app):
+    checked_app.config["SCHEMA_CHECK"] = "wait"
+    with pytest.raises(SchemaVersionError):
+        check_schema(checked_app)
+
+
+def test_off_skips_check(checked_app):
+    checked_app.config["SCHEMA_CHECK"] = "off"
+    check_schema(checked_app)
+
+
+def test_single_head():
+    assert len(expected_heads()) == 1
@@ -0,0 +1,252 @@
+import zlib
+import pytest
+from sqlalchemy import event, func, select
+from app import create_app, db, shard_router
+from app.controllers.auth import AuthController
+from app.models.shard import EmailLookup, ShardBucket, UsernameLookup
+from app.models.user import User
+from app.services.sharding import (
+    SHARD_BUCKETS,
+    ShardMaintenance,
+    ShardRoutingError,
+    shard_bucket,
+)
+from config import TestingConfig
+
+PASSWORD = "TestPass123@"
+
+
+@pytest.fixture
+def sharded_app(tmp_path, monkeypatch):
+    """A primary and two shards, each a SQLite file"""
+    monkeypatch.setattr(
+        TestingConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'primary'}"
+    )
+    monkeypatch.setattr(
+        TestingConfig,
+        "SQLALCHEMY_SHARD_URIS",
+        [f"sqlite:///{tmp_path / 'shard_0'}", f"sqlite:///{tmp_path / 'shard_1'}"],
+        raising=False,
+    )
+    monkeypatch.setattr(TestingConfig, "SHARD_MAP_TTL", 0, raising=False)
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+    yield app
+
+    # db is global and keeps a MetaData per bind key it has seen
+    for key in shard_router.shards:
+        db.metadatas.pop(key, None)
+
+
+def register(client, name, email=None):
+    return client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": name,
+            "email": email or f"{name}@test.com",
+            "password": PASSWORD,
+            "confirm_password": PASSWORD,
+        },
+    )
+
+
+def login(client, name):
+    return client.post(
+        "/api/v1/auth/login", json={"username": name, "password": PASSWORD}
+    )
+
+
+def count_users(app, key):
+    with app.app_context():
+        engine = db.engines[key]
+        with engine.connect() as connection:
+            return connection.execute(
+                select(func.count()).select_from(User.__table__)
+            ).scalar()
+
+
+def rebalance(app):
+    result = app.test_cli_runner().invoke(
+        args=["shards", "rebalance", "--settle", "0", "--batch-size", "2"]
+    )
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def test_bucket_matches_mysql_crc32():
+    user_id = "0192f3c4a5b67c8d9e0f1a2b3c4d5e6f"
+    assert shard_bucket(user_id) == zlib.crc32(bytes.fromhex(user_id)) % 1024
+    assert User(username="a", email="a@test.com").shard_bucket in range(SHARD_BUCKETS)
+
+
+def test_users_stay_on_primary_until_rebalanced(sharded_app):
+    client = sharded_app.test_client()
+    assert register(client, "alice").status_code == 201
+    assert login(client, "alice").status_code == 200
+    assert count_users(sharded_app, None) == 1
+
+
+def test_rebalance_moves_users_online(sharded_app):
+    client = sharded_app.test_client()
+    for name in ["alice", "bob", "carol", "dave", "erin"]:
+        assert register(client, name).status_code == 201
+
+    result = rebalance(sharded_app)
+    assert f"{SHARD_BUCKETS} buckets moved" in result.output
+
+    assert count_users(sharded_app, None) == 0
+    assert (
+        count_users(sharded_app, "shard_0") + count_users(sharded_app, "shard_1") == 5
+    )
+    for name in ["alice", "bob", "carol", "dave", "erin"]:
+        response = login(client, name)
+        assert response.status_code == 200
+        token = response.json["token"]["access_token"]
+        profile = client.get(
+            "/api/v1/auth/profile", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert profile.json["username"] == name
+
+
+def test_register_after_rebalance_uses_bucket_shard(sharded_app):
+    rebalance(sharded_app)
+    client = sharded_app.test_client()
+    user_id = register(client, "alice").json["user"]["id"]
+
+    expected = shard_router.target(shard_bucket(user_id))
+    assert count_users(sharded_app, expected) == 1
+    assert count_users(sharded_app, None) == 0
+
+
+def test_uniqueness_across_shards(sharded_app):
+    rebalance(sharded_app)
+    client = sharded_app.test_client()
+    assert register(client, "alice").status_code == 201
+
+    # Another id lands in another bucket, most likely on the other shard
+    response = register(client, "alice", "other@test.com")
+    assert response.status_code == 400
+    assert "username" in response.json["errors"]
+
+    response = register(client, "other", "alice@test.com")
+    assert response.status_code == 400
+    assert "email" in response.json["errors"]
+
+
+def test_failed_shard_commit_releases_lookups(sharded_app):
+    rebalance(sharded_app)
+    client = sharded_app.test_client()
+
+    reserved = []
+
+    def fail(connection):
+        # The lookups must already be committed on the primary
+        with db.engines[None].connect() as primary:
+            reserved.append(primary.execute(select(UsernameLookup.user_id)).scalar())
+        raise RuntimeError("shard unavailable")
+
+    with sharded_app.app_context():
+        for key in shard_router.shards:
+            event.listen(db.engines[key], "commit", fail)
+    try:
+        assert register(client, "alice").status_code == 500
+    finally:
+        with sharded_app.app_context():
+            for key in shard_router.shards:
+                event.remove(db.engines[key], "commit", fail)
+
+    assert reserved[0] is not None
+    with sharded_app.app_context():
+        assert db.session.get(UsernameLookup, "alice") is None
+        assert db.session.get(EmailLookup, "alice@test.com") is None
+    assert sum(count_users(sharded_app, key) for key in shard_router.shards) == 0
+    assert register(client, "alice").status_code == 201
+
+
+def test_token_consume_and_profile_update_on_shard(sharded_app):
+    rebalance(sharded_app)
+    client = sharded_app.test_client()
+    user_id = register(client, "alice").json["user"]["id"]
+    controller = AuthController()
+
+    with sharded_app.app_context():
+        controller.request_password_reset("alice@test.com")
+        shard_router.pin(user_id)
+        db.session.get(User, user_id).reset_token = User.hash_token("reset-me")
+        db.session.commit()
+
+    with sharded_app.app_context():
+        response, status = controller.reset_password("reset-me", "NewPass123@")
+        assert status == 200
+    with sharded_app.app_context():
+        _, status = controller.reset_password("reset-me", "NewPass123@")
+        assert status == 400
+
+    with sharded_app.app_context():
+        _, status = controller.update_profile(user_id, {"username": "alicia"})
+        assert status == 200
+        assert db.session.get(UsernameLookup, "alice") is None
+        assert db.session.get(UsernameLookup, "alicia").user_id == user_id
+        assert controller.find_user(username="alicia").id == user_id
+
+
+def test_writes_to_moving_bucket_refused(sharded_app):
+    client = sharded_app.test_client()
+    user_id = register(client, "alice").json["user"]["id"]
+    token = login(client, "alice").json["token"]["access_token"]
+
+    with sharded_app.app_context():
+        ShardMaintenance(db, shard_router).init_buckets()
+        db.session.execute(
+            ShardBucket.__table__.update()
+            .where(ShardBucket.bucket == shard_bucket(user_id))
+            .values(moving=True)
+        )
+        db.session.commit()
+
+    response = client.post(
+        "/api/v1/auth/change-password",
+        json={
+            "current_password": PASSWORD,
+            "new_password": "NewPass123@",
+            "confirm_password": "NewPass123@",
+        },
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 503
+    # Reads keep working during the move
+    assert login(client, "alice").status_code == 200
+
+
+def test_unpinned_statement_raises(sharded_app):
+    with sharded_app.app_context():
+        with pytest.raises(ShardRoutingError):
+            User.query.filter_by(username="alice").first()
+
+
+def test_status_command(sharded_app):
+    # Registered before sharding was enabled, so without lookup rows
+    with sharded_app.app_context():
+        with db.engines[None].begin() as connection:
+            connection.execute(
+                User.__table__.insert(),
+                {
+                    "id": "0" * 32,
+                    "username": "alice",
+                    "email": "alice@test.com",
+                    "password_hash": "x",
+                    "shard_bucket": shard_bucket("0" * 32),
+                },
+            )
+        assert AuthController().find_user(username="alice").id == "0" * 32
+
+    runner = sharded_app.test_cli_runner()
+    result = runner.invoke(args=["shards", "init"])
+    assert "1024 buckets added" in result.output
+    assert "2 lookup rows added" in result.output
+
+    rebalance(sharded_app)
+    result = runner.invoke(args=["shards", "status"])
+    assert "default: 0 buckets, 0 users" in result.output
+    assert "shard_0: 512 buckets" in result.output
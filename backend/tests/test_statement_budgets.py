@@ -0,0 +1,124 @@
+"""
+SQL statement budgets for the auth_bp endpoints. A budget going up is a
+regression (e.g. an N+1 or a reload after commit) unless the change
+really needs the extra statement; raise it deliberately.
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from app import create_app, db, user_cache
+from app.models.user import User
+
+PASSWORD = "TestPass123@"
+NEW_PASSWORD = "NewPass123@"
+
+
+@pytest.fixture
+def token(client, db_session):
+    response = client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": "alice",
+            "email": "alice@test.com",
+            "password": PASSWORD,
+            "confirm_password": PASSWORD,
+        },
+    )
+    return response.json["token"]["access_token"]
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_register(client, db_session, max_statements):
+    # One INSERT; the response is built before commit expires the row
+    with max_statements(1):
+        response = client.post(
+            "/api/v1/auth/register",
+            json={
+                "username": "bob",
+                "email": "bob@test.com",
+                "password": PASSWORD,
+                "confirm_password": PASSWORD,
+            },
+        )
+    assert response.status_code == 201
+
+
+def test_login(client, token, max_statements):
+    with max_statements(1):
+        response = client.post(
+            "/api/v1/auth/login", json={"username": "alice", "password": PASSWORD}
+        )
+    assert response.status_code == 200
+
+
+def test_reset_password(client, token, db_session, max_statements):
+    user = User.query.filter_by(username="alice").first()
+    user.reset_token = User.hash_token("reset-me")
+    user.reset_token_expires = datetime.now(timezone.utc) + timedelta(hours=1)
+    db.session.commit()
+
+    # The token is checked and consumed by a single conditional UPDATE
+    with max_statements(1):
+        response = client.post(
+            "/api/v1/auth/reset-password",
+            json={
+                "token": "reset-me",
+                "new_password": NEW_PASSWORD,
+                "confirm_password": NEW_PASSWORD,
+            },
+        )
+    assert response.status_code == 200
+
+
+def test_change_password(client, token, max_statements):
+    with max_statements(2):
+        response = client.post(
+            "/api/v1/auth/change-password",
+            json={
+                "current_password": PASSWORD,
+                "new_password": NEW_PASSWORD,
+                "confirm_password": NEW_PASSWORD,
+            },
+            headers=auth(token),
+        )
+    assert response.status_code == 200
+
+
+def test_get_profile(client, token, max_statements):
+    user_cache.clear()
+    with max_statements(1):
+        response = client.get("/api/v1/auth/profile", headers=auth(token))
+    assert response.status_code == 200
+
+    # Served from the user cache
+    with max_statements(0):
+        response = client.get("/api/v1/auth/profile", headers=auth(token))
+    assert response.status_code == 200
+
+
+def test_update_profile(client, token, max_statements):
+    # SELECT and UPDATE; the response is built before commit expires the row
+    with max_statements(2):
+        response = client.put(
+            "/api/v1/auth/profile",
+            json={"username": "alicia"},
+            headers=auth(token),
+        )
+    assert response.status_code == 200
+
+
+def test_server_timing_header(client, token):
+    response = client.post(
+        "/api/v1/auth/login", json={"username": "alice", "password": PASSWORD}
+    )
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert 'desc="1 statements"' in timing
+
+
+def test_no_server_timing_in_production():
+    response = create_app("production").test_client().get("/livez")
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
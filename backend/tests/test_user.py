@@ -1,4 +1,5 @@
 import pytest
+from sqlalchemy import text
 from app.models.user import User
 
 
@@ -78,3 +79,37 @@ def test_unique_email(db_session):
         user2.set_password("testpass123")
         db_session.add(user2)
         db_session.commit()
+
+
+def test_ids_are_time_ordered_uuid7(monkeypatch):
+    """
+    GIVEN ids generated at increasing timestamps
+    WHEN comparing them
+    THEN check they are version 7 UUIDs that sort by creation time
+    """
+    from app.models import types
+
+    ids = []
+    for ms in (1_700_000_000_000, 1_700_000_000_001, 1_700_000_005_000):
+        monkeypatch.setattr(types.time, "time_ns", lambda ms=ms: ms * 1_000_000)
+        ids.append(types.uuid7())
+
+    assert all(value.version == 7 for value in ids)
+    assert all(value.variant == "specified in RFC 4122" for value in ids)
+    assert [value.hex for value in ids] == sorted(value.hex for value in ids)
+
+
+def test_id_stored_as_binary(db_session):
+    """
+    GIVEN a saved user
+    WHEN reading the raw id column
+    THEN check it holds 16 bytes while the model exposes the hex string
+    """
+    user = User(username="testuser", email="test@test.com")
+    user.set_password("testpass123")
+    db_session.add(user)
+    db_session.commit()
+
+    raw_id = db_session.execute(text("SELECT id FROM users")).scalar()
+    assert bytes(raw_id) == bytes.fromhex(user.id)
+    assert db_session.get(User, user.id).username == "testuser"
@@ -0,0 +1,138 @@
+import pytest
+from app import user_cache
+from app.controllers.auth import AuthController
+from app.models.user import User
+from app.services.user_cache import UserCache, RedisInvalidationChannel
+
+
+@pytest.fixture
+def cache(app):
+    cache = UserCache()
+    cache.init_app(app)
+    cache.max_size = 2
+    return cache
+
+
+@pytest.fixture
+def test_user(db_session):
+    user = User(username="testuser", email="test@test.com")
+    user.set_password("TestPass123@")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+class TestUserCache:
+    def test_hit_and_miss_counters(self, cache):
+        assert cache.get("a") is None
+        cache.put("a", {"id": "a"})
+        assert cache.get("a") == {"id": "a"}
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_returns_copies(self, cache):
+        cache.put("a", {"id": "a"})
+        cache.get("a")["id"] = "changed"
+        assert cache.get("a") == {"id": "a"}
+
+    def test_lru_eviction(self, cache):
+        cache.put("a", {"id": "a"})
+        cache.put("b", {"id": "b"})
+        cache.get("a")
+        cache.put("c", {"id": "c"})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, cache):
+        cache.ttl = 0
+        cache.put("a", {"id": "a"})
+        assert cache.get("a") is None
+        assert cache.stats()["size"] == 0
+
+    def test_invalidate(self, cache):
+        cache.put("a", {"id": "a"})
+        cache.invalidate("a")
+        assert cache.get("a") is None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_profile_version_recorded_on_invalidate(self, cache):
+        assert cache.profile_version("a") is None
+        cache.invalidate("a", profile_version=3)
+        assert cache.profile_version("a") == 3
+
+    def test_remembered_version_yields_to_announced(self, cache):
+        cache.invalidate("a", profile_version=3)
+        cache.remember_version("a", 2)
+        assert cache.profile_version("a") == 3
+
+        cache.ttl = 0
+        cache.remember_version("b", 1)
+        assert cache.profile_version("b") is None
+
+    def test_profile_version_listens(self, cache):
+        class Channel:
+            subscribed = False
+
+            def subscribe(self, callback):
+                self.subscribed = True
+
+        cache.channel = Channel()
+        cache.profile_version("a")
+        assert cache.channel.subscribed
+
+    def test_disabled(self, cache):
+        cache.enabled = False
+        cache.put("a", {"id": "a"})
+        assert cache.get("a") is None
+
+
+class TestControllerCaching:
+    def test_get_profile_served_from_cache(self, test_user):
+        controller = AuthController()
+        first, _ = controller.get_profile(test_user.id)
+        second, status_code = controller.get_profile(test_user.id)
+
+        assert status_code == 200
+        assert first == second
+        assert user_cache.stats()["hits"] == 1
+
+    def test_update_profile_invalidates(self, test_user):
+        controller = AuthController()
+        controller.get_profile(test_user.id)
+        controller.update_profile(test_user.id, {"username": "renamed"})
+
+        response, _ = controller.get_profile(test_user.id)
+        assert response["username"] == "renamed"
+
+    def test_change_password_keeps_snapshot(self, test_user):
+        # Credentials are not part of the snapshot
+        controller = AuthController()
+        controller.get_profile(test_user.id)
+        controller.change_password(test_user.id, "TestPass123@", "NewPass123@")
+        assert user_cache.stats()["size"] == 1
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = messages
+
+    def listen(self):
+        for message in self.messages:
+            yield {"type": "message", "data": message.encode()}
+
+
+def test_channel_ignores_own_messages():
+    channel = RedisInvalidationChannel.__new__(RedisInvalidationChannel)
+    channel._origin = "me"
+    channel._listener_pid = None
+    received = []
+
+    channel._run(
+        FakePubSub(["me:1:", "other:2:", "other:3:7"]),
+        lambda user_id, version: received.append((user_id, version)),
+    )
+    assert received == [("2", None), ("3", 7)]
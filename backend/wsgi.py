@@ -0,0 +1,5 @@
+from os import environ
+from app import create_app
+
+# Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+app = create_app(environ.get("FLASK_ENV", "production"))